@@ -0,0 +1,240 @@
+from benchmark_transfers import start_moto_server
+import argparse
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+RAW_FOLDER = 'RawImages'
+PROCESSED_FOLDER = 'ProcessedImages'
+RESULTS_FOLDER = 'benchmark_results'
+
+
+def parse_list(value):
+    """Parse a comma-separated list of non-empty strings"""
+    items = [item.strip() for item in value.split(',') if item.strip()]
+    if not items:
+        raise argparse.ArgumentTypeError("Expected a comma-separated list")
+    return items
+
+
+def parse_resolutions_arg(value):
+    from image_processing.synthetic import parse_resolutions
+    try:
+        return parse_resolutions(value)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(f"Resolutions must look like 640x480,1920x1080 ({e})")
+
+
+def parse_formats_arg(value):
+    from image_processing.synthetic import FORMATS
+    from s3_operations.s3_operations import IMAGE_EXTENSIONS
+    # Only formats the pipeline lists as input images
+    supported = [image_format for image_format, (extension, _) in FORMATS.items() if extension in IMAGE_EXTENSIONS]
+    formats = ['JPEG' if image_format.upper() == 'JPG' else image_format.upper() for image_format in parse_list(value)]
+    unknown = [image_format for image_format in formats if image_format not in supported]
+    if unknown:
+        raise argparse.ArgumentTypeError(f"Unsupported formats {', '.join(unknown)}; use {', '.join(supported)}")
+    return formats
+
+
+def configure_storage(args):
+    """
+    Point the benchmark's storage settings at a hermetic backend
+    Returns:
+        Tuple of (moto server or None, local root or None, whether the root is temporary)
+    """
+    # A node-local cache would serve the dataset from an earlier benchmark
+    os.environ.pop('CACHE_DIR', None)
+    if args.backend == 'moto':
+        server, credentials = start_moto_server(args.moto_port)
+        os.environ.update({
+            'STORAGE_BACKEND': 's3',
+            'S3_ENDPOINT_URL': credentials['aws_endpoint_url'],
+            'AWS_ACCESS_KEY_ID': credentials['aws_access_key_id'],
+            'AWS_SECRET_ACCESS_KEY': credentials['aws_secret_access_key'],
+            'AWS_DEFAULT_REGION': os.getenv('AWS_DEFAULT_REGION', 'us-east-1'),
+            'S3_BUCKET': 'e2e-benchmark'
+        })
+        return server, None, False
+
+    root = args.root or tempfile.mkdtemp(prefix='e2e_benchmark_')
+    os.environ.update({'STORAGE_BACKEND': 'local', 'LOCAL_STORAGE_ROOT': root})
+    return None, root, args.root is None
+
+
+def upload_dataset(s3_ops, args):
+    """Generate the synthetic dataset into the raw images folder"""
+    from image_processing.synthetic import generate_dataset
+
+    start_time = time.perf_counter()
+    images = ((f"{RAW_FOLDER}/{name}", data) for name, data in
+              generate_dataset(args.count, args.resolutions, args.formats, args.seed))
+    uploads = list(s3_ops.upload_objects(images))
+    errors = [upload for upload in uploads if upload['error']]
+    if errors:
+        print(f"Failed to store {len(errors)} generated images, e.g. {errors[0]['key']}: {errors[0]['error']}")
+        sys.exit(1)
+    total_bytes = sum(upload['bytes'] for upload in uploads)
+    print(f"Generated {len(uploads)} images ({total_bytes / 1024**2:.1f} MB, "
+          f"{', '.join(f'{w}x{h}' for w, h in args.resolutions)}; {', '.join(args.formats)}; seed {args.seed}) "
+          f"in {time.perf_counter() - start_time:.1f} s")
+    return total_bytes
+
+
+def run_image_benchmark(main, s3_ops, cli_ops, runs, dataset_bytes):
+    """Run main.process_images `runs` times over the dataset"""
+    # Every run processes every image, so runs are comparable
+    os.environ['INCREMENTAL_PROCESSING'] = 'false'
+    rows = []
+    for run in range(runs):
+        start_time = time.perf_counter()
+        summary = main.process_images(s3_ops, cli_ops, RAW_FOLDER, PROCESSED_FOLDER, RESULTS_FOLDER)
+        wall_time = time.perf_counter() - start_time
+        if summary is None:
+            print("Image run produced no results")
+            sys.exit(1)
+        rows.append({
+            'run': run + 1,
+            'images': summary['images'],
+            'failures': summary['failures'],
+            'wall_time': wall_time,
+            'pipeline_time': summary['pipeline_wall_time'],
+            'images_per_s': summary['pipeline_images_per_s'],
+            'input_mb_per_s': dataset_bytes / 1024**2 / summary['pipeline_wall_time'],
+            'latency_p50': summary.get('latency_p50'),
+            'latency_p95': summary.get('latency_p95')
+        })
+    return rows
+
+
+def run_matrix_benchmark(main, s3_ops, cli_ops, runs):
+    """Run main.process_matrices `runs` times"""
+    rows = []
+    for run in range(runs):
+        start_time = time.perf_counter()
+        results = main.process_matrices(s3_ops, cli_ops, RESULTS_FOLDER)
+        rows.append({'run': run + 1, 'wall_time': time.perf_counter() - start_time, 'results': results})
+    return rows
+
+
+def print_image_report(rows):
+    print(f"\n{'Run':^5} | {'Images':^6} | {'Failed':^6} | {'Wall (s)':^9} | {'Pipeline (s)':^12} | "
+          f"{'Images/s':^9} | {'In MB/s':^8} | {'p50 (ms)':^9} | {'p95 (ms)':^9}")
+    print("-" * 98)
+    for row in rows:
+        print(f"{row['run']:^5} | {row['images']:^6} | {row['failures']:^6} | {row['wall_time']:^9.2f} | "
+              f"{row['pipeline_time']:^12.2f} | {row['images_per_s']:^9.2f} | {row['input_mb_per_s']:^8.2f} | "
+              f"{row['latency_p50'] * 1000:^9.1f} | {row['latency_p95'] * 1000:^9.1f}")
+    if len(rows) > 1:
+        median = lambda key: statistics.median(row[key] for row in rows)
+        print(f"{'med':^5} | {'':^6} | {'':^6} | {median('wall_time'):^9.2f} | {median('pipeline_time'):^12.2f} | "
+              f"{median('images_per_s'):^9.2f} | {median('input_mb_per_s'):^8.2f} | "
+              f"{median('latency_p50') * 1000:^9.1f} | {median('latency_p95') * 1000:^9.1f}")
+
+
+def print_matrix_report(rows):
+    print(f"\n{'Run':^5} | {'Wall (s)':^9} | {'Size':^6} | {'CPU GFLOPS':^10} | {'GPU GFLOPS':^10} | {'Speedup':^8}")
+    print("-" * 62)
+    for row in rows:
+        for result in row['results']:
+            gpu_gflops = f"{result['gpu_gflops']:.1f}" if result['gpu_gflops'] else "N/A"
+            speedup = f"{result['speedup']:.2f}x" if result['speedup'] else "N/A"
+            cpu_gflops = f"{result['cpu_gflops']:.1f}" if result['cpu_gflops'] else "N/A"
+            print(f"{row['run']:^5} | {row['wall_time']:^9.2f} | {result['size']:^6} | {cpu_gflops:^10} | "
+                  f"{gpu_gflops:^10} | {speedup:^8}")
+
+
+def save_records(s3_ops, args, image_rows, matrix_rows):
+    """Store the end-to-end timings as 'e2e' result records next to the runs' own records"""
+    from benchmark_operations.timing import summarize
+    from results_operations.results_operations import ResultsOperations
+
+    dataset = {'count': args.count, 'resolutions': [f"{w}x{h}" for w, h in args.resolutions],
+               'formats': args.formats, 'seed': args.seed, 'backend': args.backend}
+    records = []
+    if image_rows:
+        records.append(ResultsOperations._record(
+            'e2e_image', 'pipeline', dataset, summarize([row['pipeline_time'] for row in image_rows]),
+            extra={'images_per_s': statistics.median(row['images_per_s'] for row in image_rows),
+                   'latency_p50': statistics.median(row['latency_p50'] for row in image_rows),
+                   'latency_p95': statistics.median(row['latency_p95'] for row in image_rows)}
+        ))
+        records.append(ResultsOperations._record(
+            'e2e_image_latency_p95', 'pipeline', dataset, summarize([row['latency_p95'] for row in image_rows])
+        ))
+    if matrix_rows:
+        records.append(ResultsOperations._record(
+            'e2e_matrix', 'host', {'sizes': os.getenv('MATRIX_SIZES'), 'backend': args.backend},
+            summarize([row['wall_time'] for row in matrix_rows])
+        ))
+    uri = ResultsOperations(s3_ops, RESULTS_FOLDER).save_run('e2e', records, {}, {'runs': args.runs})
+    if uri:
+        print(f"\nEnd-to-end records saved to: {uri}")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Hermetic end-to-end benchmark: synthetic images through main.py on local or moto storage'
+    )
+    parser.add_argument('--backend', choices=['local', 'moto'], default='local',
+                        help='Filesystem storage or an in-process moto S3 server')
+    parser.add_argument('--root', type=str, help='Directory for the local backend (default: a temporary one)')
+    parser.add_argument('--keep', action='store_true', help='Keep the temporary local directory')
+    parser.add_argument('--moto-port', type=int, default=5000, help='Port for the moto server')
+    parser.add_argument('--modes', type=parse_list, default=['image'], help='Comma-separated: image, matrix')
+    parser.add_argument('--count', type=int, default=32, help='Number of synthetic images')
+    parser.add_argument('--resolutions', type=parse_resolutions_arg, default=[(640, 480), (1920, 1080)],
+                        help='Comma-separated WIDTHxHEIGHT resolutions, cycled through')
+    parser.add_argument('--formats', type=parse_formats_arg, default=['JPEG', 'PNG'],
+                        help='Comma-separated formats: png, jpeg')
+    parser.add_argument('--seed', type=int, default=0, help='Dataset seed')
+    parser.add_argument('--runs', type=int, default=3, help='Runs per mode')
+    parser.add_argument('--matrix-sizes', type=str, default='512,1024', help='MATRIX_SIZES for the matrix mode')
+    args = parser.parse_args()
+    unknown = set(args.modes) - {'image', 'matrix'}
+    if unknown:
+        parser.error(f"Unknown modes: {', '.join(sorted(unknown))}")
+
+    # main.py's CLI getters parse sys.argv themselves; they read everything from the environment instead
+    sys.argv = sys.argv[:1]
+    server, root, temporary = configure_storage(args)
+    os.environ['MATRIX_SIZES'] = args.matrix_sizes
+    try:
+        # Imported after the storage settings so nothing reads the real ones
+        import main as benchmark_main
+        from cli_operations.cli_operations import CLIOperations
+
+        cli_ops = CLIOperations()
+        s3_ops = benchmark_main.create_s3_operations(cli_ops)
+        if server is not None:
+            s3_ops.s3_client.create_bucket(Bucket=os.environ['S3_BUCKET'])
+
+        image_rows, matrix_rows = [], []
+        if 'image' in args.modes:
+            dataset_bytes = upload_dataset(s3_ops, args)
+            image_rows = run_image_benchmark(benchmark_main, s3_ops, cli_ops, args.runs, dataset_bytes)
+        if 'matrix' in args.modes:
+            matrix_rows = run_matrix_benchmark(benchmark_main, s3_ops, cli_ops, args.runs)
+
+        print("\nEnd-to-end benchmark")
+        print("=" * 20)
+        if image_rows:
+            print_image_report(image_rows)
+        if matrix_rows:
+            print_matrix_report(matrix_rows)
+        save_records(s3_ops, args, image_rows, matrix_rows)
+    finally:
+        if server is not None:
+            server.stop()
+        if root is not None:
+            if temporary and not args.keep:
+                shutil.rmtree(root, ignore_errors=True)
+            else:
+                print(f"Storage kept in {root} (STORAGE_BACKEND=local LOCAL_STORAGE_ROOT={root})")
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
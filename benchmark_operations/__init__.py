@@ -1 +1,6 @@
-from .benchmark_operations import BenchmarkOperations
\ No newline at end of file
+def __getattr__(name):
+    # Loaded on first use so that benchmark_operations.timing does not pull in torch
+    if name == 'BenchmarkOperations':
+        from .benchmark_operations import BenchmarkOperations
+        return BenchmarkOperations
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
\ No newline at end of file
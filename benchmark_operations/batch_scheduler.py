@@ -0,0 +1,150 @@
+import gc
+import os
+import torch
+from rich.console import Console
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+console = Console()
+
+# Share of the free memory an automatic budget may use; the rest is headroom
+# for allocator fragmentation and memory outside the scheduler's view
+AUTO_BUDGET_FRACTION = 0.8
+
+
+def is_out_of_memory(error: BaseException) -> bool:
+    """Whether an exception is a CUDA or host out-of-memory error"""
+    if isinstance(error, MemoryError):
+        return True
+    if isinstance(error, getattr(torch.cuda, 'OutOfMemoryError', ())):
+        return True
+    message = str(error)
+    # Older torch raises plain RuntimeErrors; the CPU allocator reports failures this way too
+    return isinstance(error, RuntimeError) and (
+        'out of memory' in message or "can't allocate memory" in message
+    )
+
+
+def _cgroup_memory_limit() -> Optional[int]:
+    """Memory limit of the container (cgroup v2 or v1), if any"""
+    for path in ('/sys/fs/cgroup/memory.max', '/sys/fs/cgroup/memory/memory.limit_in_bytes'):
+        try:
+            with open(path) as f:
+                value = f.read().strip()
+        except OSError:
+            continue
+        if value.isdigit():
+            return int(value)
+    return None
+
+
+def device_memory_budget(device: torch.device, fraction: float = AUTO_BUDGET_FRACTION) -> int:
+    """
+    Memory the transforms may use on a device, in bytes
+
+    On CUDA this is a share of the currently free device memory. On the CPU
+    it is a share of the available RAM, capped by the pod's memory limit,
+    which the kernel's figures do not reflect.
+    """
+    if device.type == 'cuda':
+        free, _ = torch.cuda.mem_get_info(device)
+        return int(free * fraction)
+    available = os.sysconf('SC_AVPHYS_PAGES') * os.sysconf('SC_PAGE_SIZE')
+    limit = _cgroup_memory_limit()
+    if limit is not None:
+        available = min(available, limit)
+    return int(available * fraction)
+
+
+class AdaptiveBatchScheduler:
+    """
+    Batch sizes packed to a memory budget, backing off on out-of-memory errors
+
+    The memory of an item is estimated from its tensor shape and dtype times
+    the number of same-sized working buffers the work needs (inputs,
+    intermediates and outputs); a batch holds as many items as fit in the
+    budget, up to the caller's maximum. When a batch still runs out of
+    memory, it is halved and retried, and the reduced size becomes the
+    ceiling for that kind of work. Ceilings confirmed by a successful batch
+    are the sustainable batch sizes, which can be stored and loaded as the
+    starting ceilings of later runs.
+    """
+
+    def __init__(self, budget_bytes: int, device: torch.device, limits: Optional[Dict[str, int]] = None):
+        """
+        Args:
+            budget_bytes: Memory a batch may use
+            device: Device the batches run on (its cache is emptied on backoff)
+            limits: Sustainable batch sizes recorded by earlier runs, by work key
+        """
+        self.budget_bytes = max(1, budget_bytes)
+        self.device = device
+        self.limits: Dict[str, int] = dict(limits or {})
+        self._loaded = dict(self.limits)
+        self.sustainable: Dict[str, int] = {}
+        self.backoffs = 0
+
+    def sustainable_limits(self) -> Dict[str, int]:
+        """Ceilings to store for later runs: the loaded ones, updated by those confirmed in this run"""
+        limits = {key: size for key, size in self._loaded.items() if self.limits.get(key) == size}
+        limits.update(self.sustainable)
+        return limits
+
+    @staticmethod
+    def item_bytes(shape: Sequence[int], dtype: torch.dtype, working_copies: int = 1) -> int:
+        """Estimated memory of one item of the given shape and dtype"""
+        elements = 1
+        for dim in shape:
+            elements *= dim
+        return elements * torch.empty((), dtype=dtype).element_size() * working_copies
+
+    def batch_size(self, key: str, item_bytes: int, max_batch: int) -> int:
+        """Largest batch of items within the budget, the ceiling for key and max_batch"""
+        size = min(max_batch, self.budget_bytes // max(1, item_bytes), self.limits.get(key, max_batch))
+        return max(1, size)
+
+    def _free_memory(self):
+        gc.collect()
+        if self.device.type == 'cuda':
+            torch.cuda.empty_cache()
+
+    def run(self, key: str, items: List, work: Callable[[List], Tuple[List, List]],
+            item_bytes: int, max_batch: int) -> Tuple[List, List]:
+        """
+        Run work over items in budget-sized batches, halving batches that run out of memory
+        Args:
+            key: Identifies the kind of work (e.g. device, shape and dtype)
+            items: Items to process, in order
+            work: Processes a batch, returning two lists aligned with it
+                (e.g. processed tensors and timings)
+            item_bytes: Estimated memory of one item
+            max_batch: Largest batch wanted
+        Returns:
+            The two lists of every batch, concatenated in item order
+        Raises:
+            The out-of-memory error when a single item does not fit
+        """
+        outputs, extras = [], []
+        size = self.batch_size(key, item_bytes, max_batch)
+        start = 0
+        while start < len(items):
+            batch = items[start:start + size]
+            try:
+                batch_outputs, batch_extras = work(batch)
+            except Exception as e:
+                if not is_out_of_memory(e) or len(batch) == 1:
+                    raise
+                batch_outputs = None
+            if batch_outputs is None:
+                # Out of the except block, the error's traceback no longer keeps the batch's tensors alive
+                self._free_memory()
+                size = len(batch) // 2
+                self.limits[key] = size
+                self.backoffs += 1
+                console.print(f"[yellow]Out of memory for a batch of {len(batch)} ({key}), retrying with {size}[/]")
+                continue
+            if key in self.limits and len(batch) == self.limits[key]:
+                self.sustainable[key] = len(batch)
+            outputs.extend(batch_outputs)
+            extras.extend(batch_extras)
+            start += len(batch)
+        return outputs, extras
\ No newline at end of file
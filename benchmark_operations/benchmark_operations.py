@@ -1,17 +1,58 @@
 import torch
-import numpy as np
-import time
+from contextlib import contextmanager
 from rich.console import Console
+from typing import Dict, List, Optional
+from .batch_scheduler import AdaptiveBatchScheduler, device_memory_budget, is_out_of_memory
+from .cpu_threads import best_threads, thread_sweep
+from .kernels import build_kernels, roofline
+from .out_of_core import TiledMatmul
+from .timing import TimingHarness, format_stats
 
 console = Console()
 
+# Precision name -> (tensor dtype, allow TF32 tensor cores for float32 matmul)
+PRECISIONS = {
+    'fp32': (torch.float32, False),
+    'tf32': (torch.float32, True),
+    'fp16': (torch.float16, False),
+    'bf16': (torch.bfloat16, False),
+}
+
 
 class BenchmarkOperations:
-    def __init__(self):
-        """Initialize benchmark operations with CUDA availability check"""
+    def __init__(self, warmup: int = 1, repeats: int = 5, memory_budget_mb: int = 0):
+        """
+        Initialize benchmark operations with CUDA availability check
+        Args:
+            warmup: Untimed runs before measurement
+            repeats: Timed runs per measurement
+            memory_budget_mb: Memory a matmul may use per device (0 = a share
+                of the device's free memory when the matmul starts)
+        """
         self.cuda_available = torch.cuda.is_available()
         self.gpu_device = torch.device("cuda" if self.cuda_available else "cpu")
         self.cpu_device = torch.device("cpu")
+        self.timer = TimingHarness(warmup=warmup, repeats=repeats)
+        self.memory_budget_bytes = memory_budget_mb * 1024**2
+
+    def check_matmul_fits(self, size: int, device: torch.device, dtype: torch.dtype = torch.float32) -> Optional[str]:
+        """
+        Check a size x size matmul (both operands and the product) against the device's memory budget
+        Returns:
+            Why it does not fit, or None when it does
+        """
+        return self.check_fits(AdaptiveBatchScheduler.item_bytes((size, size), dtype, working_copies=3), device)
+
+    def check_fits(self, needed: int, device: torch.device) -> Optional[str]:
+        """
+        Check a number of bytes against the device's memory budget
+        Returns:
+            Why it does not fit, or None when it does
+        """
+        budget = self.memory_budget_bytes or device_memory_budget(device)
+        if needed <= budget:
+            return None
+        return f"needs {needed / 1024**2:.0f} MB, memory budget is {budget / 1024**2:.0f} MB"
 
     def get_device_info(self):
         """
@@ -26,43 +67,147 @@ class BenchmarkOperations:
             }
         return {"device_name": "CPU only - No CUDA device available"}
 
+    @staticmethod
+    def matmul_gflops(size: int, seconds: Optional[float]) -> Optional[float]:
+        """Achieved GFLOPS of a size x size matmul (2 * n^3 floating point operations)"""
+        if not seconds or seconds <= 0:
+            return None
+        return 2 * size ** 3 / seconds / 1e9
+
+    @staticmethod
+    def generate_matrices(size: int, device: torch.device, dtype: torch.dtype = torch.float32,
+                          seed: Optional[int] = None):
+        """
+        Generate two random size x size matrices in the target dtype on the target device
+
+        CPU and CUDA generators seeded alike produce different streams, so
+        seeded matrices are drawn on the CPU and copied to the device; every
+        device then multiplies the same values. Unseeded ones are drawn on
+        the device directly.
+        Args:
+            size: Matrix side
+            device: Device to allocate on
+            dtype: Element type
+            seed: Optional seed, so every device multiplies the same values
+        Returns:
+            Tuple of (matrix_a, matrix_b) tensors
+        """
+        if seed is None:
+            return (torch.rand(size, size, device=device, dtype=dtype),
+                    torch.rand(size, size, device=device, dtype=dtype))
+        generator = torch.Generator().manual_seed(seed)
+        matrix_a = torch.rand(size, size, dtype=dtype, generator=generator).to(device)
+        matrix_b = torch.rand(size, size, dtype=dtype, generator=generator).to(device)
+        return matrix_a, matrix_b
+
+    @staticmethod
+    @contextmanager
+    def tf32_enabled(enabled: bool):
+        """Temporarily allow or forbid TF32 tensor cores for float32 matmul and cuDNN convolutions"""
+        previous = torch.backends.cuda.matmul.allow_tf32, torch.backends.cudnn.allow_tf32
+        torch.backends.cuda.matmul.allow_tf32 = enabled
+        torch.backends.cudnn.allow_tf32 = enabled
+        try:
+            yield
+        finally:
+            torch.backends.cuda.matmul.allow_tf32, torch.backends.cudnn.allow_tf32 = previous
+
+    @staticmethod
+    def _as_device_tensor(matrix, device: torch.device) -> torch.Tensor:
+        """Use a tensor as-is on its device; convert arrays to float32 like before"""
+        if isinstance(matrix, torch.Tensor):
+            return matrix.to(device)
+        return torch.as_tensor(matrix, dtype=torch.float32, device=device)
+
     def matrix_multiply_gpu(self, matrix_a, matrix_b):
         """
         Multiply two matrices using GPU
+        Args:
+            matrix_a, matrix_b: Tensors (moved to the GPU only if they are not there yet)
+                or arrays (converted to float32)
+        Returns:
+            Tuple of (result tensor on the GPU, timing stats)
         """
         if not self.cuda_available:
             raise RuntimeError("CUDA is not available on this system")
             
-        a_tensor = torch.tensor(matrix_a, dtype=torch.float32).to(self.gpu_device)
-        b_tensor = torch.tensor(matrix_b, dtype=torch.float32).to(self.gpu_device)
-        
-        torch.cuda.synchronize()
-        start_time = time.perf_counter()
-        
-        result = torch.mm(a_tensor, b_tensor)
-        
-        torch.cuda.synchronize()
-        end_time = time.perf_counter()
+        a_tensor = self._as_device_tensor(matrix_a, self.gpu_device)
+        b_tensor = self._as_device_tensor(matrix_b, self.gpu_device)
         
-        result = result.cpu().numpy()
-        return result, end_time - start_time
+        return self.timer.run(lambda: torch.mm(a_tensor, b_tensor), 'cuda')
 
     def matrix_multiply_cpu(self, matrix_a, matrix_b):
         """
         Multiply two matrices using CPU
+        Args:
+            matrix_a, matrix_b: Tensors (moved to the CPU only if they are not there yet)
+                or arrays (converted to float32)
+        Returns:
+            Tuple of (result tensor, timing stats)
         """
-        a_tensor = torch.tensor(matrix_a, dtype=torch.float32)
-        b_tensor = torch.tensor(matrix_b, dtype=torch.float32)
+        a_tensor = self._as_device_tensor(matrix_a, self.cpu_device)
+        b_tensor = self._as_device_tensor(matrix_b, self.cpu_device)
         
-        start_time = time.perf_counter()
-        result = torch.mm(a_tensor, b_tensor)
-        end_time = time.perf_counter()
-        
-        return result.numpy(), end_time - start_time
+        return self.timer.run(lambda: torch.mm(a_tensor, b_tensor), 'cpu')
+
+    def run_thread_sweep(self, sizes: List[int], thread_counts: List[int], pin: bool = False) -> List[Dict]:
+        """
+        Time the float32 CPU matmul per intra-op thread count
+        Args:
+            sizes: Matrix sizes to test
+            thread_counts: Intra-op thread counts to try
+            pin: Pin the process to as many CPUs as threads
+        Returns:
+            List of dictionaries with size, threads, pinned, time, gflops, stats,
+            and speedup and scaling efficiency relative to the fewest threads
+        """
+        results = []
+        for size in sizes:
+            reason = self.check_matmul_fits(size, self.cpu_device)
+            if reason:
+                console.print(f"[yellow]  Skipping {size}x{size} thread sweep: {reason}[/]")
+                continue
+            console.print(f"\nThread sweep {size}x{size} on CPU ({', '.join(map(str, thread_counts))} threads)...")
+            # The operands live only as long as the workload that binds them
+            with self.tf32_enabled(False):
+                sweep = thread_sweep(
+                    lambda operands=self.generate_matrices(size, self.cpu_device, seed=size): torch.mm(*operands),
+                    thread_counts, self.timer, pin
+                )
+            for result in sweep:
+                result.update({'size': size, 'gflops': self.matmul_gflops(size, result['time'])})
+                gflops = f"{result['gflops']:.1f}" if result['gflops'] is not None else "N/A"
+                efficiency = f"{result['efficiency']:.2f}" if result['efficiency'] is not None else "N/A"
+                console.print(
+                    f"  {result['threads']:>3} threads: {format_stats(result['stats'])} -> "
+                    f"{gflops} GFLOPS, efficiency {efficiency}"
+                )
+            results.extend(sweep)
+        return results
 
-    def run_comparison(self, sizes=[1000, 2000, 3000, 4000]):
+    @staticmethod
+    def best_thread_configs(sweep_results: List[Dict]) -> Dict[int, Dict]:
+        """Fastest thread sweep result per matrix size"""
+        by_size = {}
+        for result in sweep_results:
+            by_size.setdefault(result['size'], []).append(result)
+        return {size: best_threads(results) for size, results in by_size.items()}
+
+    def run_comparison(self, sizes=[1000, 2000, 3000, 4000], cpu_baseline: Optional[Dict[int, Dict]] = None):
         """
         Run comparison tests for different matrix sizes
+
+        Float32 matrices are generated from the same seed for every device (on
+        the host, then copied before timing), so no float64 copy is ever built
+        or transferred. Sizes that do not
+        fit the CPU memory budget are skipped (MATRIX_OOC_SIZES runs them out of
+        core); on the GPU, sizes over its budget or running out of memory get
+        no GPU time.
+        Args:
+            sizes: Matrix sizes to test
+            cpu_baseline: Best thread sweep result per size (best_thread_configs);
+                its timing is reported as the CPU time instead of a run with
+                torch's default thread count
         """
         results = []
         device_info = self.get_device_info()
@@ -70,23 +215,231 @@ class BenchmarkOperations:
         for size in sizes:
             console.print(f"\nTesting {size}x{size} matrices...")
             
-            matrix_a = np.random.rand(size, size)
-            matrix_b = np.random.rand(size, size)
+            reason = self.check_matmul_fits(size, self.cpu_device)
+            if reason:
+                console.print(f"[yellow]  Skipping {size}x{size}: {reason} (use MATRIX_OOC_SIZES)[/]")
+                continue
+            best = (cpu_baseline or {}).get(size)
+            if best is not None:
+                cpu_stats = best['stats']
+                cpu_threads = best['threads']
+                console.print(f"  CPU (best of thread sweep, {cpu_threads} threads): {format_stats(cpu_stats)}")
+            else:
+                cpu_stats = self.run_cpu_baseline(size)
+                if cpu_stats is None:
+                    continue
+                cpu_threads = torch.get_num_threads()
+                console.print(f"  CPU: {format_stats(cpu_stats)}")
             
-            console.print("Running CPU multiplication...")
-            _, cpu_time = self.matrix_multiply_cpu(matrix_a, matrix_b)
-            
-            gpu_time = None
+            gpu_stats = None
             if self.cuda_available:
-                console.print("Running GPU multiplication...")
-                _, gpu_time = self.matrix_multiply_gpu(matrix_a, matrix_b)
-                torch.cuda.empty_cache()
+                reason = self.check_matmul_fits(size, self.gpu_device)
+                if reason:
+                    console.print(f"[yellow]  Skipping GPU multiplication: {reason}[/]")
+                else:
+                    console.print("Running GPU multiplication...")
+                    try:
+                        matrix_a, matrix_b = self.generate_matrices(size, self.gpu_device, seed=size)
+                        with self.tf32_enabled(False):
+                            _, gpu_stats = self.matrix_multiply_gpu(matrix_a, matrix_b)
+                        del matrix_a, matrix_b
+                        console.print(f"  GPU: {format_stats(gpu_stats)}")
+                    except RuntimeError as e:
+                        if not is_out_of_memory(e):
+                            raise
+                        console.print("[red]  GPU out of memory[/]")
+                    torch.cuda.empty_cache()
             
+            cpu_time = cpu_stats['median']
+            gpu_time = gpu_stats['median'] if gpu_stats else None
             results.append({
                 'size': size,
                 'cpu_time': cpu_time,
                 'gpu_time': gpu_time,
-                'speedup': (cpu_time / gpu_time) if gpu_time and gpu_time > 0 else None
+                'speedup': (cpu_time / gpu_time) if gpu_time and gpu_time > 0 else None,
+                'cpu_threads': cpu_threads,
+                'cpu_gflops': self.matmul_gflops(size, cpu_time),
+                'gpu_gflops': self.matmul_gflops(size, gpu_time),
+                'cpu_stats': cpu_stats,
+                'gpu_stats': gpu_stats
             })
         
-        return results, device_info
\ No newline at end of file
+        return results, device_info
+
+    def run_cpu_baseline(self, size: int) -> Optional[Dict]:
+        """Time the float32 CPU matmul with the current thread settings, or None when out of memory"""
+        console.print("Running CPU multiplication...")
+        try:
+            matrix_a, matrix_b = self.generate_matrices(size, self.cpu_device, seed=size)
+            with self.tf32_enabled(False):
+                _, cpu_stats = self.matrix_multiply_cpu(matrix_a, matrix_b)
+            del matrix_a, matrix_b
+        except (RuntimeError, MemoryError) as e:
+            if not is_out_of_memory(e):
+                raise
+            console.print(f"[red]  Skipping {size}x{size}: CPU out of memory[/]")
+            return None
+        return cpu_stats
+
+    def run_precision_sweep(self, sizes: List[int], precisions: List[str]) -> List[Dict]:
+        """
+        Time matmul per precision on every available device
+        Args:
+            sizes: Matrix sizes to test
+            precisions: Names from PRECISIONS (fp32, tf32, fp16, bf16)
+        Returns:
+            List of dictionaries with size, precision, device, time, gflops and stats
+            (time and gflops are None when a device does not support the precision)
+        """
+        devices = [self.cpu_device] + ([self.gpu_device] if self.cuda_available else [])
+        results = []
+        
+        for size in sizes:
+            for device in devices:
+                for precision in precisions:
+                    dtype, allow_tf32 = PRECISIONS[precision]
+                    result = {'size': size, 'precision': precision, 'device': device.type,
+                              'time': None, 'gflops': None, 'stats': None, 'error': None}
+                    results.append(result)
+                    
+                    # TF32 only exists on CUDA tensor cores; on CPU it would just repeat fp32
+                    if allow_tf32 and device.type != 'cuda':
+                        result['error'] = "not supported on CPU"
+                        continue
+                    
+                    reason = self.check_matmul_fits(size, device, dtype)
+                    if reason:
+                        result['error'] = reason
+                        console.print(f"[yellow]  Skipping {size}x{size} {precision} on {device.type.upper()}: {reason}[/]")
+                        continue
+                    
+                    console.print(f"\nTesting {size}x{size} {precision} on {device.type.upper()}...")
+                    try:
+                        matrix_a, matrix_b = self.generate_matrices(size, device, dtype, seed=size)
+                        multiply = self.matrix_multiply_gpu if device.type == 'cuda' else self.matrix_multiply_cpu
+                        with self.tf32_enabled(allow_tf32):
+                            _, stats = multiply(matrix_a, matrix_b)
+                        del matrix_a, matrix_b
+                    except (RuntimeError, MemoryError) as e:
+                        result['error'] = str(e).splitlines()[0] if str(e) else type(e).__name__
+                        console.print(f"[red]  {precision} failed on {device.type.upper()}: {result['error']}[/]")
+                        continue
+                    finally:
+                        if device.type == 'cuda':
+                            torch.cuda.empty_cache()
+                    
+                    result.update({
+                        'time': stats['median'],
+                        'gflops': self.matmul_gflops(size, stats['median']),
+                        'stats': stats
+                    })
+                    console.print(f"  {format_stats(stats)} -> {result['gflops']:.1f} GFLOPS")
+        
+        return results
+
+    def run_microbenchmarks(self, names: List[str], elements: int, peaks: Dict) -> List[Dict]:
+        """
+        Time the float32 compute and bandwidth microbenchmarks on every available device
+
+        Each result is normalized to achieved GFLOPS and GB/s and compared
+        with the device's theoretical peaks, which tells compute-bound from
+        memory-bound kernels. Host/device transfers only run with CUDA.
+        Args:
+            names: Kernel names from kernels.build_kernels ('all' for every kernel)
+            elements: Operand length of the elementwise, reduction, copy and transfer kernels
+            peaks: Theoretical peaks, {'cpu': {'gflops', 'gbs'}, 'cuda': {'gflops', 'gbs'},
+                'link_gbs'} (0 = unknown)
+        Returns:
+            List of dictionaries with kernel, device, params, time, stats, error
+            and the roofline values (gflops, gbs, intensity, compute_fraction,
+            bandwidth_fraction, bound, peak_fraction)
+        """
+        kernels = build_kernels(elements)
+        if 'all' in names:
+            names = list(kernels)
+        for name in names:
+            if name not in kernels:
+                console.print(f"[yellow]Ignoring unknown microbenchmark:[/] {name}")
+        devices = [self.cpu_device] + ([self.gpu_device] if self.cuda_available else [])
+        results = []
+        
+        for kernel in (kernels[name] for name in names if name in kernels):
+            for device in devices:
+                if kernel.transfer and device.type != 'cuda':
+                    continue
+                result = {'kernel': kernel.name, 'device': device.type, 'params': kernel.params,
+                          'time': None, 'stats': None, 'error': None}
+                results.append(result)
+                
+                reason = self.check_fits(kernel.bytes, device)
+                if reason:
+                    result['error'] = reason
+                    console.print(f"[yellow]  Skipping {kernel.name} on {device.type.upper()}: {reason}[/]")
+                    continue
+                
+                console.print(f"\nMicrobenchmark {kernel.name} on {device.type.upper()}...")
+                try:
+                    generator = torch.Generator(device=device)
+                    generator.manual_seed(0)
+                    call = kernel.setup(device, generator)
+                    with self.tf32_enabled(False):
+                        _, stats = self.timer.run(call, device.type)
+                    del call
+                except (RuntimeError, MemoryError) as e:
+                    result['error'] = str(e).splitlines()[0] if str(e) else type(e).__name__
+                    console.print(f"[red]  {kernel.name} failed on {device.type.upper()}: {result['error']}[/]")
+                    continue
+                finally:
+                    if device.type == 'cuda':
+                        torch.cuda.empty_cache()
+                
+                device_peaks = peaks.get(device.type, {})
+                peak_gbs = peaks.get('link_gbs', 0) if kernel.transfer else device_peaks.get('gbs', 0)
+                result.update(roofline(kernel, stats['median'], device_peaks.get('gflops', 0), peak_gbs))
+                result.update({'time': stats['median'], 'stats': stats})
+                gflops = f"{result['gflops']:.1f} GFLOPS, " if result['gflops'] else ""
+                console.print(f"  {format_stats(stats)} -> {gflops}{result['gbs']:.1f} GB/s")
+        
+        return results
+
+    def run_out_of_core(self, sizes: List[int], memory_budget_mb: int,
+                        workdir: Optional[str] = None) -> List[Dict]:
+        """
+        Run tiled matmul over memory-mapped operands for sizes that do not fit in RAM
+
+        Runs once per size on the GPU when available, otherwise on the CPU;
+        operand files are removed afterwards.
+        Args:
+            sizes: Matrix sizes to test
+            memory_budget_mb: Host memory allowed for tiles
+            workdir: Directory for the operand files (system temp dir by default)
+        Returns:
+            List of dictionaries with timings, effective GFLOPS and I/O bandwidth
+        """
+        results = []
+        for size in sizes:
+            matmul = TiledMatmul(size, memory_budget_mb, self.gpu_device, workdir=workdir, seed=size)
+            console.print(
+                f"\nOut-of-core {size}x{size} on {self.gpu_device.type.upper()} "
+                f"({matmul.tile}x{matmul.tile} tiles, operands in {matmul.directory})..."
+            )
+            try:
+                console.print("Writing operands to disk...")
+                matmul.create_operands()
+                console.print("Multiplying...")
+                result = matmul.run()
+                result['error'] = None
+                console.print(
+                    f"  {result['total_time']:.2f} s, {result['gflops']:.1f} GFLOPS, "
+                    f"I/O {result['io_bandwidth_gbs']:.2f} GB/s, waited on I/O {result['io_wait_time']:.2f} s"
+                )
+            except (RuntimeError, OSError) as e:
+                result = {'size': size, 'device': self.gpu_device.type, 'error': str(e)}
+                console.print(f"[red]  Out-of-core matmul failed: {e}[/]")
+            finally:
+                matmul.cleanup()
+                if self.cuda_available:
+                    torch.cuda.empty_cache()
+            results.append(result)
+        
+        return results
\ No newline at end of file
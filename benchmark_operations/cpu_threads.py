@@ -0,0 +1,133 @@
+import os
+import torch
+from contextlib import contextmanager
+from rich.console import Console
+from typing import Any, Callable, Dict, Iterator, List, Optional
+from .timing import TimingHarness
+
+console = Console()
+
+
+def available_cpus() -> int:
+    """Number of CPUs this process may run on (respects affinity/cpusets)"""
+    if hasattr(os, 'sched_getaffinity'):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def cpu_quota() -> Optional[float]:
+    """CPUs' worth of time the container's cgroup allows (cgroup v2 or v1), or None when unlimited"""
+    try:
+        with open('/sys/fs/cgroup/cpu.max') as f:
+            quota, period = f.read().split()
+        return None if quota == 'max' else int(quota) / int(period)
+    except (OSError, ValueError):
+        pass
+    try:
+        with open('/sys/fs/cgroup/cpu/cpu.cfs_quota_us') as f:
+            quota = int(f.read())
+        with open('/sys/fs/cgroup/cpu/cpu.cfs_period_us') as f:
+            period = int(f.read())
+        return None if quota <= 0 else quota / period
+    except (OSError, ValueError):
+        return None
+
+
+def default_thread_counts() -> List[int]:
+    """Powers of two up to the available CPUs, plus the available CPUs themselves"""
+    cpus = available_cpus()
+    counts = []
+    threads = 1
+    while threads < cpus:
+        counts.append(threads)
+        threads *= 2
+    counts.append(cpus)
+    return counts
+
+
+def set_interop_threads(num_threads: int):
+    """
+    Set torch's inter-op thread count
+
+    Torch only accepts this before its first inter-op parallel work, so it is
+    set once per process rather than swept.
+    """
+    try:
+        torch.set_num_interop_threads(num_threads)
+    except RuntimeError as e:
+        console.print(f"[yellow]Could not set inter-op threads to {num_threads}: {e}[/]")
+
+
+def _set_process_affinity(cpus) -> bool:
+    """Restrict every thread of the process (including torch's pools) to cpus"""
+    if not hasattr(os, 'sched_setaffinity'):
+        return False
+    # sched_setaffinity(0) only moves the calling thread; existing OpenMP workers keep theirs
+    try:
+        tids = [int(tid) for tid in os.listdir('/proc/self/task')]
+    except OSError:
+        tids = [0]
+    for tid in tids:
+        try:
+            os.sched_setaffinity(tid, cpus)
+        except OSError:
+            # Threads can exit between the listing and the call
+            pass
+    return True
+
+
+@contextmanager
+def cpu_threads(num_threads: Optional[int], pin: bool = False) -> Iterator[None]:
+    """
+    Temporarily run torch CPU ops with num_threads intra-op threads
+    Args:
+        num_threads: Intra-op thread count (None keeps the current one)
+        pin: Also pin the process to the first num_threads allowed CPUs;
+            affinity applies to every thread, so only pin while nothing
+            else runs (e.g. a thread sweep)
+    """
+    if num_threads is None:
+        yield
+        return
+    previous_threads = torch.get_num_threads()
+    previous_cpus = os.sched_getaffinity(0) if hasattr(os, 'sched_getaffinity') else None
+    torch.set_num_threads(num_threads)
+    pinned = pin and previous_cpus is not None and _set_process_affinity(sorted(previous_cpus)[:num_threads])
+    try:
+        yield
+    finally:
+        torch.set_num_threads(previous_threads)
+        if pinned:
+            _set_process_affinity(previous_cpus)
+
+
+def thread_sweep(fn: Callable[[], Any], thread_counts: List[int], timer: TimingHarness,
+                 pin: bool = False) -> List[Dict]:
+    """
+    Time a CPU workload at several intra-op thread counts
+    Args:
+        fn: Zero-argument workload
+        thread_counts: Thread counts to try
+        timer: Harness timing each thread count
+        pin: Pin the process to as many CPUs as threads
+    Returns:
+        One dictionary per thread count with threads, pinned, time (median),
+        stats, and speedup and scaling efficiency relative to the smallest
+        thread count (efficiency 1.0 is linear scaling)
+    """
+    results = []
+    for num_threads in sorted(set(thread_counts)):
+        with cpu_threads(num_threads, pin):
+            _, stats = timer.run(fn, 'cpu')
+        results.append({'threads': num_threads, 'pinned': pin, 'time': stats['median'], 'stats': stats})
+    base = results[0]
+    for result in results:
+        result['speedup'] = base['time'] / result['time'] if result['time'] > 0 else None
+        result['efficiency'] = (result['speedup'] / (result['threads'] / base['threads'])
+                                if result['speedup'] else None)
+    return results
+
+
+def best_threads(results: List[Dict]) -> Dict:
+    """Sweep result with the lowest median time"""
+    return min(results, key=lambda result: result['time'])
\ No newline at end of file
@@ -0,0 +1,182 @@
+import torch
+import torch.nn.functional as F
+from typing import Callable, Dict, Optional
+
+ITEM_BYTES = torch.finfo(torch.float32).bits // 8
+
+
+class Kernel:
+    """
+    One float32 microbenchmark and the work a call does
+
+    flops counts a multiply-accumulate as two operations. bytes is the
+    compulsory memory traffic, every operand read once and the output
+    written once, which is also the memory the operands take; real traffic
+    can only be higher (e.g. matmul tiles read more than once), so achieved
+    GB/s is a lower bound. Transfer kernels copy between pinned host memory
+    and the GPU, and are compared against the host/device link's peak.
+    """
+
+    def __init__(self, name: str, params: Dict, flops: int, bytes_moved: int,
+                 setup: Callable[[torch.device, torch.Generator], Callable[[], torch.Tensor]],
+                 transfer: bool = False):
+        """
+        Args:
+            name: Kernel name
+            params: Shapes, for reports and result records
+            flops: Floating point operations per call
+            bytes_moved: Bytes read and written per call
+            setup: Allocates the operands on a device and returns the call to time
+            transfer: Host/device copy (CUDA only)
+        """
+        self.name = name
+        self.params = params
+        self.flops = flops
+        self.bytes = bytes_moved
+        self.setup = setup
+        self.transfer = transfer
+
+    @property
+    def intensity(self) -> Optional[float]:
+        """Arithmetic intensity in FLOPs per byte (None for pure data movement)"""
+        return self.flops / self.bytes if self.flops else None
+
+
+def _rand(generator: torch.Generator, *shape) -> torch.Tensor:
+    return torch.rand(*shape, device=generator.device, generator=generator)
+
+
+def _matmul(name: str, m: int, k: int, n: int, batch: int = 0) -> Kernel:
+    """(m x k) @ (k x n), or `batch` of them with bmm"""
+    leading = (batch,) if batch else ()
+
+    def setup(device, generator):
+        a, b = _rand(generator, *leading, m, k), _rand(generator, *leading, k, n)
+        out = torch.empty(*leading, m, n, device=device)
+        if batch:
+            return lambda: torch.bmm(a, b, out=out)
+        return lambda: torch.mm(a, b, out=out)
+
+    count = batch or 1
+    params = {'m': m, 'k': k, 'n': n, **({'batch': batch} if batch else {})}
+    return Kernel(name, params, 2 * count * m * k * n, ITEM_BYTES * count * (m * k + k * n + m * n), setup)
+
+
+def _conv2d(name: str, batch: int, channels: int, out_channels: int, size: int, kernel: int,
+            groups: int = 1) -> Kernel:
+    """Same-padded kernel x kernel conv2d over batch x channels x size x size inputs"""
+    def setup(device, generator):
+        x = _rand(generator, batch, channels, size, size)
+        weight = _rand(generator, out_channels, channels // groups, kernel, kernel)
+        return lambda: F.conv2d(x, weight, padding=kernel // 2, groups=groups)
+
+    params = {'batch': batch, 'channels': channels, 'out_channels': out_channels, 'size': size,
+              'kernel': kernel, 'groups': groups}
+    weights = out_channels * (channels // groups) * kernel * kernel
+    flops = 2 * batch * size * size * weights
+    bytes_moved = ITEM_BYTES * (batch * channels * size * size + weights + batch * out_channels * size * size)
+    return Kernel(name, params, flops, bytes_moved, setup)
+
+
+def _add(elements: int) -> Kernel:
+    def setup(device, generator):
+        a, b = _rand(generator, elements), _rand(generator, elements)
+        out = torch.empty(elements, device=device)
+        return lambda: torch.add(a, b, out=out)
+
+    return Kernel('add', {'elements': elements}, elements, 3 * ITEM_BYTES * elements, setup)
+
+
+def _sum(elements: int) -> Kernel:
+    def setup(device, generator):
+        a = _rand(generator, elements)
+        return lambda: a.sum()
+
+    return Kernel('sum', {'elements': elements}, elements, ITEM_BYTES * elements, setup)
+
+
+def _copy(elements: int) -> Kernel:
+    def setup(device, generator):
+        a = _rand(generator, elements)
+        out = torch.empty(elements, device=device)
+        return lambda: out.copy_(a)
+
+    # Read and write, as STREAM counts its copy kernel
+    return Kernel('copy', {'elements': elements}, 0, 2 * ITEM_BYTES * elements, setup)
+
+
+def _host_transfer(name: str, elements: int, to_device: bool) -> Kernel:
+    def setup(device, generator):
+        source = _rand(generator, elements)
+        if to_device:
+            source = source.cpu().pin_memory()
+            out = torch.empty(elements, device=device)
+        else:
+            out = torch.empty(elements, pin_memory=True)
+        return lambda: out.copy_(source, non_blocking=True)
+
+    return Kernel(name, {'elements': elements}, 0, ITEM_BYTES * elements, setup, transfer=True)
+
+
+def build_kernels(elements: int) -> Dict[str, Kernel]:
+    """
+    The microbenchmark suite, by name
+    Args:
+        elements: Operand length of the elementwise, reduction, copy and transfer kernels
+    """
+    kernels = [
+        # Rectangular matmuls: compute-bound, and memory-bound with a small inner dimension
+        _matmul('mm_wide', 2048, 512, 2048),
+        _matmul('mm_skinny', 65536, 64, 64),
+        _matmul('bmm', 128, 128, 128, batch=256),
+        _conv2d('conv2d', 16, 64, 64, 128, 3),
+        # The image pipeline's per-channel blur
+        _conv2d('conv2d_depthwise', 8, 3, 3, 1024, 7, groups=3),
+        _add(elements),
+        _sum(elements),
+        _copy(elements),
+        _host_transfer('h2d', elements, to_device=True),
+        _host_transfer('d2h', elements, to_device=False),
+    ]
+    return {kernel.name: kernel for kernel in kernels}
+
+
+def roofline(kernel: Kernel, seconds: float, peak_gflops: float = 0, peak_gbs: float = 0) -> Dict:
+    """
+    Achieved throughput of a kernel against theoretical peaks
+
+    With both peaks known, a kernel whose arithmetic intensity is below the
+    ridge point (peak GFLOPS / peak GB/s) is memory-bound, otherwise
+    compute-bound, and peak_fraction is the achieved share of the roofline
+    bound that applies. Data movement kernels are always memory-bound
+    (link-bound for host/device transfers).
+    Args:
+        kernel: Kernel that ran
+        seconds: Time of one call
+        peak_gflops: Theoretical compute peak (0 = unknown)
+        peak_gbs: Theoretical memory (or, for transfers, link) bandwidth (0 = unknown)
+    Returns:
+        Dictionary with gflops, gbs, intensity, compute_fraction,
+        bandwidth_fraction, bound and peak_fraction (None where unknown)
+    """
+    gflops = kernel.flops / seconds / 1e9 if kernel.flops else None
+    gbs = kernel.bytes / seconds / 1e9
+    compute_fraction = gflops / peak_gflops if gflops and peak_gflops else None
+    bandwidth_fraction = gbs / peak_gbs if peak_gbs else None
+    if kernel.transfer:
+        bound = 'link'
+    elif not kernel.flops:
+        bound = 'memory'
+    elif peak_gflops and peak_gbs:
+        bound = 'compute' if kernel.intensity >= peak_gflops / peak_gbs else 'memory'
+    else:
+        bound = None
+    return {
+        'gflops': gflops,
+        'gbs': gbs,
+        'intensity': kernel.intensity,
+        'compute_fraction': compute_fraction,
+        'bandwidth_fraction': bandwidth_fraction,
+        'bound': bound,
+        'peak_fraction': compute_fraction if bound == 'compute' else bandwidth_fraction if bound else None
+    }
\ No newline at end of file
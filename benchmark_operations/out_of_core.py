@@ -0,0 +1,163 @@
+import math
+import os
+import shutil
+import tempfile
+import time
+import numpy as np
+import torch
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional
+
+
+class TiledMatmul:
+    """
+    Out-of-core C = A @ B over float32 np.memmap operands
+
+    The product is computed tile by tile: for every output tile the
+    matching row of A tiles and column of B tiles is streamed from disk,
+    accumulated on the compute device and written back to C. While one
+    pair of tiles is multiplied, the next pair is read on a background
+    thread, so disk reads overlap with compute.
+
+    Per step at most five tiles live in host memory (current and prefetched
+    A/B tiles plus the accumulator), which sets the tile size for a budget.
+    """
+
+    ITEM_BYTES = np.dtype(np.float32).itemsize
+    RESIDENT_TILES = 5
+
+    def __init__(self, size: int, memory_budget_mb: int, device: torch.device,
+                 workdir: Optional[str] = None, seed: int = 0):
+        """
+        Args:
+            size: Matrix side
+            memory_budget_mb: Host memory allowed for tiles
+            device: Device the tile products run on
+            workdir: Directory for the memory-mapped operand files
+            seed: Seed for generating A and B
+        """
+        self.size = size
+        self.device = device
+        self.seed = seed
+        budget_bytes = memory_budget_mb * 1024**2
+        self.tile = max(1, min(size, math.isqrt(budget_bytes // (self.RESIDENT_TILES * self.ITEM_BYTES))))
+        self.directory = tempfile.mkdtemp(prefix='ooc_matmul_', dir=workdir)
+        self.paths = {name: os.path.join(self.directory, f"{name}.f32") for name in ('a', 'b', 'c')}
+
+    def _check_disk_space(self):
+        needed = 3 * self.size * self.size * self.ITEM_BYTES
+        free = shutil.disk_usage(self.directory).free
+        if free < needed:
+            raise RuntimeError(
+                f"Out-of-core matmul needs {needed / 1024**3:.1f} GB in {self.directory}, "
+                f"only {free / 1024**3:.1f} GB free"
+            )
+
+    def create_operands(self):
+        """Write random A and B to disk a block of rows at a time and allocate C"""
+        self._check_disk_space()
+        rng = np.random.default_rng(self.seed)
+        # Blocks of whole rows holding about one tile's worth of elements
+        block_rows = max(1, self.tile * self.tile // self.size)
+        for name in ('a', 'b'):
+            matrix = np.memmap(self.paths[name], dtype=np.float32, mode='w+', shape=(self.size, self.size))
+            for row in range(0, self.size, block_rows):
+                rows = min(block_rows, self.size - row)
+                matrix[row:row + rows] = rng.random((rows, self.size), dtype=np.float32)
+            matrix.flush()
+            del matrix
+        np.memmap(self.paths['c'], dtype=np.float32, mode='w+', shape=(self.size, self.size)).flush()
+
+    def _open(self, name: str, mode: str = 'r') -> np.memmap:
+        return np.memmap(self.paths[name], dtype=np.float32, mode=mode, shape=(self.size, self.size))
+
+    def _load_tiles(self, a: np.memmap, b: np.memmap, i: int, j: int, k: int):
+        """Read the A[i, k] and B[k, j] tiles into (pinned when on CUDA) host tensors"""
+        t = self.tile
+        start_time = time.perf_counter()
+        a_tile = torch.from_numpy(np.ascontiguousarray(a[i:i + t, k:k + t]))
+        b_tile = torch.from_numpy(np.ascontiguousarray(b[k:k + t, j:j + t]))
+        if self.device.type == 'cuda':
+            a_tile, b_tile = a_tile.pin_memory(), b_tile.pin_memory()
+        read_time = time.perf_counter() - start_time
+        return a_tile, b_tile, (a_tile.numel() + b_tile.numel()) * self.ITEM_BYTES, read_time
+
+    def run(self) -> Dict:
+        """
+        Multiply A and B into C
+        Returns:
+            Dictionary with timings, effective GFLOPS and I/O bandwidth
+        """
+        t = self.tile
+        a, b, c = self._open('a'), self._open('b'), self._open('c', 'r+')
+        steps = [(i, j, k)
+                 for i in range(0, self.size, t)
+                 for j in range(0, self.size, t)
+                 for k in range(0, self.size, t)]
+
+        bytes_read = 0
+        bytes_written = 0
+        read_time = 0.0
+        write_time = 0.0
+        io_wait = 0.0
+        accumulator = None
+
+        start_time = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=1) as prefetcher:
+            pending = prefetcher.submit(self._load_tiles, a, b, *steps[0])
+            for index, (i, j, k) in enumerate(steps):
+                wait_start = time.perf_counter()
+                a_tile, b_tile, nbytes, tile_read_time = pending.result()
+                io_wait += time.perf_counter() - wait_start
+                bytes_read += nbytes
+                read_time += tile_read_time
+
+                if index + 1 < len(steps):
+                    pending = prefetcher.submit(self._load_tiles, a, b, *steps[index + 1])
+
+                a_tile = a_tile.to(self.device, non_blocking=True)
+                b_tile = b_tile.to(self.device, non_blocking=True)
+                if k == 0:
+                    accumulator = torch.mm(a_tile, b_tile)
+                else:
+                    accumulator.addmm_(a_tile, b_tile)
+
+                if k + t >= self.size:
+                    write_start = time.perf_counter()
+                    c[i:i + t, j:j + t] = accumulator.cpu().numpy()
+                    write_time += time.perf_counter() - write_start
+                    bytes_written += accumulator.numel() * self.ITEM_BYTES
+        c.flush()
+        total_time = time.perf_counter() - start_time
+
+        max_error = self._spot_check(a, b, c)
+        del a, b, c
+
+        return {
+            'size': self.size,
+            'device': self.device.type,
+            'tile': t,
+            'total_time': total_time,
+            'io_wait_time': io_wait,
+            'read_time': read_time,
+            'write_time': write_time,
+            'bytes_read': bytes_read,
+            'bytes_written': bytes_written,
+            'gflops': 2 * self.size ** 3 / total_time / 1e9,
+            'read_bandwidth_gbs': bytes_read / read_time / 1e9 if read_time > 0 else None,
+            'io_bandwidth_gbs': (bytes_read + bytes_written) / total_time / 1e9,
+            'max_relative_error': max_error
+        }
+
+    def _spot_check(self, a: np.memmap, b: np.memmap, c: np.memmap, samples: int = 4) -> float:
+        """Compare a few entries of C against float64 dot products of A rows and B columns"""
+        rng = np.random.default_rng(self.seed + 1)
+        max_error = 0.0
+        for row, col in rng.integers(0, self.size, size=(samples, 2)):
+            expected = float(np.dot(a[row].astype(np.float64), b[:, col].astype(np.float64)))
+            max_error = max(max_error, abs(float(c[row, col]) - expected) / max(abs(expected), 1e-12))
+        return max_error
+
+    def cleanup(self):
+        """Remove the operand files"""
+        shutil.rmtree(self.directory, ignore_errors=True)
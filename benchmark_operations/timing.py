@@ -0,0 +1,94 @@
+import time
+import numpy as np
+from typing import Any, Callable, Dict, Tuple
+
+STAT_KEYS = ('min', 'median', 'mean', 'p95', 'stddev')
+
+
+def summarize(samples) -> Dict:
+    """Summary statistics (in seconds) for a list of timing samples"""
+    values = np.asarray(samples, dtype=np.float64)
+    return {
+        'min': float(values.min()),
+        'median': float(np.median(values)),
+        'mean': float(values.mean()),
+        'p95': float(np.percentile(values, 95)),
+        'stddev': float(values.std(ddof=1)) if len(values) > 1 else 0.0,
+        'samples': [float(v) for v in values]
+    }
+
+
+def scale_stats(stats: Dict, factor: float) -> Dict:
+    """Scale every timing in a stats dictionary, e.g. to split a batch time per item"""
+    scaled = dict(stats)
+    for key in STAT_KEYS:
+        scaled[key] = stats[key] * factor
+    scaled['samples'] = [sample * factor for sample in stats['samples']]
+    return scaled
+
+
+def format_stats(stats: Dict) -> str:
+    """One-line summary of a stats dictionary"""
+    return (
+        f"min {stats['min']:.6f} | median {stats['median']:.6f} | mean {stats['mean']:.6f} | "
+        f"p95 {stats['p95']:.6f} | std {stats['stddev']:.6f} "
+        f"(n={stats['repeats']}, warmup={stats['warmup']}, {stats['timer']})"
+    )
+
+
+class TimingHarness:
+    """
+    Repeated timing of a callable with warmup
+
+    Warmup runs absorb one-off costs (allocator growth, cuBLAS/MKL handle
+    creation, kernel selection) before measurement. On CUDA each repetition
+    is bracketed by CUDA events, which time the work on the device stream
+    rather than host-side launch; elsewhere time.perf_counter is used.
+    """
+
+    def __init__(self, warmup: int = 1, repeats: int = 5):
+        self.warmup = max(0, warmup)
+        self.repeats = max(1, repeats)
+
+    def run(self, fn: Callable[[], Any], device_type: str = 'cpu') -> Tuple[Any, Dict]:
+        """
+        Time fn() repeatedly
+        Args:
+            fn: Zero-argument callable to benchmark
+            device_type: 'cuda' to time with CUDA events, anything else for perf_counter
+        Returns:
+            Tuple of (result of the last call, stats dictionary in seconds)
+        """
+        # Imported here so summarize() and friends stay usable without torch
+        import torch
+
+        use_cuda_events = device_type == 'cuda' and torch.cuda.is_available()
+
+        result = None
+        for _ in range(self.warmup):
+            result = fn()
+        if use_cuda_events:
+            torch.cuda.synchronize()
+
+        samples = []
+        for _ in range(self.repeats):
+            if use_cuda_events:
+                start_event = torch.cuda.Event(enable_timing=True)
+                end_event = torch.cuda.Event(enable_timing=True)
+                start_event.record()
+                result = fn()
+                end_event.record()
+                end_event.synchronize()
+                samples.append(start_event.elapsed_time(end_event) / 1000.0)
+            else:
+                start_time = time.perf_counter()
+                result = fn()
+                samples.append(time.perf_counter() - start_time)
+
+        stats = summarize(samples)
+        stats.update({
+            'repeats': self.repeats,
+            'warmup': self.warmup,
+            'timer': 'cuda_event' if use_cuda_events else 'perf_counter'
+        })
+        return result, stats
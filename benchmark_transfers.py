@@ -0,0 +1,108 @@
+from s3_operations.s3_operations import S3Operations
+import argparse
+import os
+import sys
+import time
+
+
+def parse_workers(workers_str):
+    """Parse a comma-separated list of worker counts"""
+    try:
+        return [int(w.strip()) for w in workers_str.split(',')]
+    except ValueError:
+        raise argparse.ArgumentTypeError("Worker counts must be comma-separated integers")
+
+
+def start_moto_server(port):
+    """Start an in-process moto S3 server and return (server, credentials)"""
+    try:
+        from moto.server import ThreadedMotoServer
+    except ImportError:
+        print("moto is not installed. Install it with: pip install 'moto[server]'")
+        sys.exit(1)
+
+    server = ThreadedMotoServer(port=port)
+    server.start()
+    credentials = {
+        'aws_endpoint_url': f"http://127.0.0.1:{port}",
+        'aws_access_key_id': 'testing',
+        'aws_secret_access_key': 'testing'
+    }
+    return server, credentials
+
+
+def run_benchmark(s3_ops, prefix, count, size, worker_counts):
+    """Upload and download `count` objects of `size` bytes for each worker count"""
+    payload = os.urandom(size)
+    keys = [f"{prefix.rstrip('/')}/object_{i:06d}.bin" for i in range(count)]
+    total_mb = count * size / 1024**2
+
+    print(f"\n{'Workers':^10} | {'Op':^10} | {'Time (s)':^10} | {'Objects/s':^10} | {'MB/s':^10} | {'Errors':^8}")
+    print("-" * 72)
+    for workers in worker_counts:
+        for op in ('upload', 'download'):
+            start_time = time.perf_counter()
+            if op == 'upload':
+                transfers = s3_ops.upload_objects(((key, payload) for key in keys), max_workers=workers)
+            else:
+                transfers = s3_ops.download_images(keys, max_workers=workers)
+            errors = 0
+            for transfer in transfers:
+                errors += bool(transfer['error'])
+                s3_ops.release_image(transfer.get('data'))
+            elapsed = time.perf_counter() - start_time
+            print(f"{workers:^10} | {op:^10} | {elapsed:^10.3f} | {count / elapsed:^10.1f} | "
+                  f"{total_mb / elapsed:^10.2f} | {errors:^8}")
+
+    print(f"\n{'Operation':<24} | {'Calls':>6} | {'Retries':>7} | {'Mean (ms)':>9} | {'p95 (ms)':>8} | {'Max (ms)':>8}")
+    print("-" * 78)
+    for name, operation in s3_ops.metrics.summary().items():
+        print(f"{name:<24} | {operation['calls']:>6} | {operation['retries']:>7} | "
+              f"{operation['mean_time'] * 1000:>9.2f} | {operation['p95_time'] * 1000:>8.0f} | "
+              f"{operation['max_time'] * 1000:>8.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='S3 transfer engine throughput benchmark')
+    parser.add_argument('--moto', action='store_true', help='Run against an in-process moto S3 server')
+    parser.add_argument('--moto-port', type=int, default=5000, help='Port for the moto server')
+    parser.add_argument('--prefix', type=str, default='transfer_benchmark', help='Key prefix for test objects')
+    parser.add_argument('--count', type=int, default=200, help='Number of objects per run')
+    parser.add_argument('--size-kb', type=int, default=512, help='Object size in KB')
+    parser.add_argument('--workers', type=parse_workers, default=[1, 4, 16, 32],
+                        help='Comma-separated worker counts (e.g., 1,4,16,32)')
+    parser.add_argument('--multipart-threshold-mb', type=int, default=64,
+                        help='Objects above this size use ranged GETs / multipart uploads')
+    parser.add_argument('--part-size-mb', type=int, default=16, help='Part size in MB (min 5)')
+    parser.add_argument('--part-workers', type=int, default=8, help='Concurrent part transfers')
+    args = parser.parse_args()
+
+    server = None
+    if args.moto:
+        server, credentials = start_moto_server(args.moto_port)
+        bucket_name = 'transfer-benchmark'
+    else:
+        from config.s3_config_handler import ConfigHandler
+        config = ConfigHandler()
+        credentials = config.get_aws_credentials()
+        bucket_name = config.s3_bucket
+
+    try:
+        s3_ops = S3Operations(
+            credentials,
+            bucket_name,
+            max_workers=max(args.workers),
+            multipart_threshold=args.multipart_threshold_mb * 1024**2,
+            part_size=args.part_size_mb * 1024**2,
+            part_workers=args.part_workers
+        )
+        if args.moto:
+            s3_ops.s3_client.create_bucket(Bucket=bucket_name)
+        run_benchmark(s3_ops, args.prefix, args.count, args.size_kb * 1024, args.workers)
+    finally:
+        if server is not None:
+            server.stop()
+
+
+if __name__ == "__main__":
+    main()
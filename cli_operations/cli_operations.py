@@ -41,7 +41,27 @@ class CLIOperations:
         return "matrix", "default value"
     
     @staticmethod
-    def display_image_results(results):
+    def format_throughput(summary):
+        """Format an image throughput summary as a single line"""
+        cpu = f"{summary['cpu_images_per_s']:.2f} images/s" if summary['cpu_images_per_s'] else "N/A"
+        gpu = f"{summary['gpu_images_per_s']:.2f} images/s" if summary['gpu_images_per_s'] else "N/A"
+        speedup = f"{summary['throughput_speedup']:.2f}x" if summary['throughput_speedup'] else "N/A"
+        line = f"CPU ({summary['cpu_mode']}): {cpu} | GPU: {gpu} | Throughput speedup: {speedup}"
+        if summary.get('production_images_per_s'):
+            line += (f" | Production ({summary['production_device']}): "
+                     f"{summary['production_images_per_s']:.2f} images/s")
+        if summary.get('pipeline_images_per_s'):
+            line += f" | Pipeline: {summary['pipeline_images_per_s']:.2f} images/s end to end"
+        if summary.get('latency_p50') is not None:
+            line += (f" | Latency p50 {summary['latency_p50'] * 1000:.1f} ms, "
+                     f"p95 {summary['latency_p95'] * 1000:.1f} ms")
+        for prefix in ('cpu', 'gpu'):
+            if summary.get(f"{prefix}_compiled_images_per_s"):
+                line += f" | {prefix.upper()} compiled: {summary[f'{prefix}_compiled_images_per_s']:.2f} images/s"
+        return line
+
+    @staticmethod
+    def display_image_results(results, summary=None):
         """Display image processing benchmark results"""
         console.print("\n[bold]Image Processing Summary:[/]")
         console.print("─" * 55)
@@ -49,6 +69,7 @@ class CLIOperations:
         console.print("─" * 55)
         
         for result in results:
+            cpu_time = f"{result['cpu_time']:.6f}" if result['cpu_time'] is not None else "N/A"
             gpu_time = f"{result['gpu_time']:.6f}" if result['gpu_time'] is not None else "N/A"
             speedup = f"{result['speedup']:.2f}x" if result['speedup'] is not None else "N/A"
             
@@ -61,10 +82,80 @@ class CLIOperations:
             
             console.print(
                 f"{result['image_index']:^12} | "
-                f"{result['cpu_time']:^12.6f} | "
+                f"{cpu_time:^12} | "
                 f"{gpu_time:^12} | "
                 f"[{speedup_color}]{speedup:^12}[/]"
             )
+        
+        if summary:
+            console.print("─" * 55)
+            console.print(f"[bold]Aggregate throughput:[/] {CLIOperations.format_throughput(summary)}")
+
+    @staticmethod
+    def display_sampled_comparison(estimate):
+        """Display the CPU vs GPU comparison extrapolated from a sample of images"""
+        level = f"{estimate['confidence'] * 100:.0f}% CI"
+        console.print(
+            f"\n[bold]Sampled comparison:[/] {estimate['sample_size']} of {estimate['total_images']} images "
+            f"compared on CPU and GPU"
+        )
+        console.print(
+            f"  Speedup: [green]{estimate['speedup']:.2f}x[/] "
+            f"({level} {estimate['speedup_ci'][0]:.2f}x - {estimate['speedup_ci'][1]:.2f}x)"
+        )
+        for device in ('cpu', 'gpu'):
+            low, high = estimate[f"{device}_total_time_ci"]
+            console.print(
+                f"  Estimated {device.upper()} time for all images: {estimate[f'{device}_total_time']:.3f} s "
+                f"({level} {low:.3f} - {high:.3f} s)"
+            )
+
+    @staticmethod
+    def display_encoding_summary(encoding):
+        """Display output encoding cost against output size"""
+        ratio = f"{encoding['size_ratio']:.2f}x of input" if encoding['size_ratio'] else "N/A"
+        console.print(f"\n[bold]Output Encoding:[/] {encoding['encoding']} ({', '.join(encoding['formats'])})")
+        console.print(
+            f"  Encode time: {encoding['encode_time_total']:.3f} s total, "
+            f"{encoding['encode_time_median'] * 1000:.3f} ms median per image"
+        )
+        console.print(
+            f"  Output size: {encoding['output_bytes'] / 1024**2:.2f} MB total, "
+            f"{encoding['output_bytes_median'] / 1024:.1f} KB median per image ({ratio})"
+        )
+
+    @staticmethod
+    def display_compile_comparison(comparison):
+        """Display eager vs compiled transform times per device"""
+        console.print("\n[bold]Eager vs Compiled Transforms (per image):[/]")
+        console.print("─" * 66)
+        console.print(
+            f"{'Device':^8} | {'Images':^6} | {'Eager (s)':^10} | {'Compiled (s)':^12} | "
+            f"{'Speedup':^8} | {'Compile (s)':^11}"
+        )
+        console.print("─" * 66)
+        for row in comparison:
+            speedup = f"{row['speedup']:.2f}x" if row['speedup'] else "N/A"
+            color = "green" if row['speedup'] and row['speedup'] > 1 else "yellow"
+            console.print(
+                f"{row['label']:^8} | {row['images']:^6} | {row['eager_time']:^10.6f} | "
+                f"{row['compiled_time']:^12.6f} | [{color}]{speedup:^8}[/] | {row['compile_time']:^11.2f}"
+            )
+
+    @staticmethod
+    def display_stage_timings(stages):
+        """Display per-image timings of each image pipeline stage"""
+        total = sum(stats['median'] for stats in stages.values())
+        console.print("\n[bold]Pipeline Stages (per image):[/]")
+        console.print("─" * 66)
+        console.print(f"{'Stage':<14} | {'Median (ms)':>11} | {'p95 (ms)':>9} | {'Total (s)':>9} | {'Share':>6}")
+        console.print("─" * 66)
+        for stage, stats in stages.items():
+            share = stats['median'] / total * 100 if total > 0 else 0.0
+            console.print(
+                f"{stage:<14} | {stats['median'] * 1000:>11.3f} | {stats['p95'] * 1000:>9.3f} | "
+                f"{sum(stats['samples']):>9.3f} | {share:>5.1f}%"
+            )
     
     @staticmethod
     def parse_matrix_sizes(sizes_str):
@@ -102,6 +193,377 @@ class CLIOperations:
         default_sizes = [1000, 2000, 3000]
         return default_sizes, "default values"
 
+    @staticmethod
+    def get_int_env(name, default, minimum=1):
+        """
+        Read an integer of at least `minimum` from an environment variable
+        Returns:
+            Tuple of (value, source)
+        """
+        env_value = os.getenv(name)
+        if env_value:
+            try:
+                value = int(env_value)
+                if value >= minimum:
+                    return value, "environment variable"
+            except ValueError:
+                pass
+            console.print(f"[yellow]Ignoring invalid {name} value:[/] {env_value}")
+        
+        return default, "default value"
+
+    @staticmethod
+    def get_transfer_workers():
+        """
+        Get the number of concurrent S3 transfers from environment variable
+        Returns:
+            Tuple of (workers, source)
+        """
+        return CLIOperations.get_int_env('S3_MAX_WORKERS', 16)
+
+    @staticmethod
+    def get_storage_config():
+        """
+        Get the storage backend and disk cache settings from environment variables
+        Returns:
+            Tuple of (backend 's3' or 'local', local root directory, whether local
+            ETags hash the file contents, cache directory or None, cache size cap in MB)
+        """
+        backend = os.getenv('STORAGE_BACKEND', 's3').lower()
+        if backend not in ['s3', 'local']:
+            console.print(f"[yellow]Ignoring invalid STORAGE_BACKEND value:[/] {backend}")
+            backend = 's3'
+        local_root = os.getenv('LOCAL_STORAGE_ROOT', 'data')
+        content_etags, _ = CLIOperations.get_bool_env('LOCAL_CONTENT_ETAGS', False)
+        cache_dir = os.getenv('CACHE_DIR') or None
+        cache_max_mb, _ = CLIOperations.get_int_env('CACHE_MAX_MB', 10240)
+        return backend, local_root, content_etags, cache_dir, cache_max_mb
+
+    @staticmethod
+    def get_multipart_config():
+        """
+        Get multipart/ranged transfer settings from environment variables
+        Returns:
+            Tuple of (threshold in bytes, part size in bytes, concurrent part transfers)
+        """
+        threshold_mb, _ = CLIOperations.get_int_env('S3_MULTIPART_THRESHOLD_MB', 64)
+        part_size_mb, _ = CLIOperations.get_int_env('S3_PART_SIZE_MB', 16, minimum=5)
+        part_workers, _ = CLIOperations.get_int_env('S3_PART_WORKERS', 8)
+        return threshold_mb * 1024**2, part_size_mb * 1024**2, part_workers
+
+    @staticmethod
+    def get_pipeline_config():
+        """
+        Get streaming pipeline queue size, memory budget and encode threads from environment variables
+        Returns:
+            Tuple of (queue size, memory budget in MB, encode worker threads)
+        """
+        queue_size, _ = CLIOperations.get_int_env('PIPELINE_QUEUE_SIZE', 8)
+        memory_budget_mb, _ = CLIOperations.get_int_env('PIPELINE_MEMORY_BUDGET_MB', 2048)
+        encode_workers, _ = CLIOperations.get_int_env('PIPELINE_ENCODE_WORKERS', 2)
+        return queue_size, memory_budget_mb, encode_workers
+
+    @staticmethod
+    def get_transform_memory_budget():
+        """
+        Get the memory a transform batch may use from environment variable
+        Returns:
+            Tuple of (budget in MB, 0 meaning a share of the free device memory, source)
+        """
+        return CLIOperations.get_int_env('TRANSFORM_MEMORY_BUDGET_MB', 0, minimum=0)
+
+    @staticmethod
+    def get_image_max_side():
+        """
+        Get the longest side images are scaled down to when decoding from environment variable
+        Returns:
+            Tuple of (side in pixels, 0 meaning images keep their size, source)
+        """
+        return CLIOperations.get_int_env('IMAGE_MAX_SIDE', 0, minimum=0)
+
+    @staticmethod
+    def get_tiling_config():
+        """
+        Get the tiled processing settings for large images from environment variables
+        Returns:
+            Tuple of (size threshold in megapixels, 0 meaning never tile, tile side in pixels)
+        """
+        threshold_mp, _ = CLIOperations.get_int_env('TILE_THRESHOLD_MP', 64, minimum=0)
+        tile_size, _ = CLIOperations.get_int_env('TILE_SIZE', 2048, minimum=64)
+        return threshold_mp, tile_size
+
+    @staticmethod
+    def get_compile_config():
+        """
+        Get the compiled transform pipeline settings from environment variables
+        Returns:
+            Tuple of (whether to compile, artifact cache directory or None)
+        """
+        enabled, _ = CLIOperations.get_bool_env('COMPILE_TRANSFORMS', False)
+        cache_dir = os.getenv('COMPILE_CACHE_DIR', '').strip() or None
+        return enabled, cache_dir
+
+    @staticmethod
+    def get_image_batch_size():
+        """
+        Get the number of same-shape images transformed together from environment variable
+        Returns:
+            Tuple of (batch size, source)
+        """
+        return CLIOperations.get_int_env('IMAGE_BATCH_SIZE', 8)
+
+    @staticmethod
+    def get_output_encoding_config():
+        """
+        Get output image encoding settings from environment variables
+        Returns:
+            Tuple of (format: source, PNG, JPEG or WEBP; PNG compression level;
+            JPEG/WebP quality, 0 meaning Pillow's default; optimize)
+        """
+        image_format = os.getenv('OUTPUT_FORMAT', 'source').strip()
+        if image_format.lower() == 'jpg':
+            image_format = 'JPEG'
+        if image_format.lower() != 'source':
+            image_format = image_format.upper()
+        if image_format not in ['source', 'PNG', 'JPEG', 'WEBP']:
+            console.print(f"[yellow]Ignoring invalid OUTPUT_FORMAT value:[/] {image_format}")
+            image_format = 'source'
+        
+        compress_level, _ = CLIOperations.get_int_env('OUTPUT_PNG_COMPRESS_LEVEL', 6, minimum=0)
+        if compress_level > 9:
+            console.print("[yellow]OUTPUT_PNG_COMPRESS_LEVEL must be 0-9, using 9[/]")
+            compress_level = 9
+        quality, _ = CLIOperations.get_int_env('OUTPUT_QUALITY', 0, minimum=0)
+        if quality > 100:
+            console.print("[yellow]OUTPUT_QUALITY must be 1-100, using 100[/]")
+            quality = 100
+        optimize, _ = CLIOperations.get_bool_env('OUTPUT_OPTIMIZE', False)
+        return image_format, compress_level, quality, optimize
+
+    @staticmethod
+    def get_blur_config():
+        """
+        Get Gaussian blur backend, kernel size and sigma from environment variables
+        Returns:
+            Tuple of (backend, kernel size, sigma)
+        """
+        backend = os.getenv('BLUR_BACKEND', 'auto').lower()
+        if backend not in ['auto', 'direct', 'separable', 'fft']:
+            console.print(f"[yellow]Ignoring invalid BLUR_BACKEND value:[/] {backend}")
+            backend = 'auto'
+        
+        kernel_size, _ = CLIOperations.get_int_env('BLUR_KERNEL_SIZE', 31)
+        if kernel_size % 2 == 0:
+            console.print(f"[yellow]BLUR_KERNEL_SIZE must be odd, using {kernel_size + 1}[/]")
+            kernel_size += 1
+        
+        sigma = 5.0
+        env_sigma = os.getenv('BLUR_SIGMA')
+        if env_sigma:
+            try:
+                sigma = float(env_sigma)
+                if sigma <= 0:
+                    raise ValueError
+            except ValueError:
+                console.print(f"[yellow]Ignoring invalid BLUR_SIGMA value:[/] {env_sigma}")
+                sigma = 5.0
+        
+        return backend, kernel_size, sigma
+
+    @staticmethod
+    def get_cpu_workers():
+        """
+        Get the number of CPU baseline worker processes from environment variable
+        Returns:
+            Tuple of (workers, source); 0 runs the CPU baseline in-process
+        """
+        return CLIOperations.get_int_env('CPU_WORKERS', 0, minimum=0)
+
+    @staticmethod
+    def get_cpu_thread_config():
+        """
+        Get the CPU thread sweep settings from environment variables
+        Returns:
+            Tuple of (thread counts to sweep, empty when the sweep is disabled;
+            pin threads to CPUs; inter-op threads, 0 keeping torch's default)
+        """
+        env_counts = os.getenv('CPU_THREAD_SWEEP', '').strip().lower()
+        thread_counts = []
+        if env_counts == 'auto':
+            from benchmark_operations.cpu_threads import default_thread_counts
+            thread_counts = default_thread_counts()
+        elif env_counts:
+            try:
+                thread_counts = CLIOperations.parse_matrix_sizes(env_counts)
+                if min(thread_counts) < 1:
+                    raise argparse.ArgumentTypeError("Thread counts must be positive")
+            except argparse.ArgumentTypeError:
+                thread_counts = []
+                console.print(f"[yellow]Invalid CPU_THREAD_SWEEP, skipping the thread sweep:[/] {env_counts}")
+        pin, _ = CLIOperations.get_bool_env('CPU_PIN_THREADS', False)
+        interop_threads, _ = CLIOperations.get_int_env('CPU_INTEROP_THREADS', 0, minimum=0)
+        return thread_counts, pin, interop_threads
+
+    @staticmethod
+    def get_timing_config():
+        """
+        Get benchmark warmup and repetition counts from environment variables
+        Returns:
+            Tuple of (warmup runs, timed repetitions)
+        """
+        warmup, _ = CLIOperations.get_int_env('BENCHMARK_WARMUP', 1, minimum=0)
+        repeats, _ = CLIOperations.get_int_env('BENCHMARK_REPEATS', 5)
+        return warmup, repeats
+
+    @staticmethod
+    def get_matrix_precisions():
+        """
+        Get the precisions for the matrix dtype sweep from environment variable
+        Returns:
+            List of precision names (empty when the sweep is disabled)
+        """
+        env_precisions = os.getenv('MATRIX_PRECISIONS', '')
+        precisions = []
+        for precision in env_precisions.split(','):
+            precision = precision.strip().lower()
+            if not precision:
+                continue
+            if precision in ['fp32', 'tf32', 'fp16', 'bf16']:
+                precisions.append(precision)
+            else:
+                console.print(f"[yellow]Ignoring unknown MATRIX_PRECISIONS entry:[/] {precision}")
+        return precisions
+
+    @staticmethod
+    def get_float_env(name, default, minimum=0.0):
+        """
+        Read a number of at least `minimum` from an environment variable
+        Returns:
+            Tuple of (value, source)
+        """
+        env_value = os.getenv(name)
+        if env_value:
+            try:
+                value = float(env_value)
+                if value >= minimum:
+                    return value, "environment variable"
+            except ValueError:
+                pass
+            console.print(f"[yellow]Ignoring invalid {name} value:[/] {env_value}")
+        
+        return default, "default value"
+
+    @staticmethod
+    def get_microbenchmark_config():
+        """
+        Get the compute and bandwidth microbenchmark settings from environment variables
+        Returns:
+            Tuple of (kernel names, elements per operand of the elementwise,
+            reduction, copy and transfer kernels, theoretical peaks); the names
+            are empty when the microbenchmarks are disabled
+        """
+        names = [name.strip().lower() for name in os.getenv('MICROBENCHMARKS', '').split(',') if name.strip()]
+        elements, _ = CLIOperations.get_int_env('MICROBENCHMARK_ELEMENTS', 1 << 25)
+        peaks = {'link_gbs': CLIOperations.get_float_env('PEAK_LINK_GBS', 0.0)[0]}
+        for device, prefix in (('cpu', 'PEAK_CPU'), ('cuda', 'PEAK_GPU')):
+            peaks[device] = {
+                'gflops': CLIOperations.get_float_env(f"{prefix}_GFLOPS", 0.0)[0],
+                'gbs': CLIOperations.get_float_env(f"{prefix}_GBS", 0.0)[0]
+            }
+        return names, elements, peaks
+
+    @staticmethod
+    def get_incremental_mode():
+        """
+        Get whether image processing skips images already processed from environment variable
+        Returns:
+            Tuple of (enabled, source)
+        """
+        return CLIOperations.get_bool_env('INCREMENTAL_PROCESSING', False)
+
+    @staticmethod
+    def get_bool_env(name, default):
+        """
+        Get a boolean flag from an environment variable
+        Args:
+            name: Environment variable name
+            default: Value used when unset or invalid
+        Returns:
+            Tuple of (value, source)
+        """
+        env_value = os.getenv(name)
+        if env_value:
+            if env_value.lower() in ['true', '1', 'yes']:
+                return True, "environment variable"
+            if env_value.lower() in ['false', '0', 'no']:
+                return False, "environment variable"
+            console.print(f"[yellow]Ignoring invalid {name} value:[/] {env_value}")
+        return default, "default value"
+
+    @staticmethod
+    def get_image_run_mode():
+        """
+        Get how images are run on the devices from environment variable
+        Returns:
+            Tuple of (mode, source): 'compare' benchmarks every image on CPU and
+            GPU, 'production' runs every image once on the best device and
+            'sampled' benchmarks a random sample and runs the rest once
+        """
+        env_mode = os.getenv('IMAGE_RUN_MODE')
+        if env_mode:
+            if env_mode.lower() in ['compare', 'production', 'sampled']:
+                return env_mode.lower(), "environment variable"
+            console.print(f"[yellow]Ignoring invalid IMAGE_RUN_MODE value:[/] {env_mode}")
+        return "compare", "default value"
+
+    @staticmethod
+    def get_compare_sample_config():
+        """
+        Get the sampled comparison settings from environment variables
+        Returns:
+            Tuple of (number of images to compare, sampling seed)
+        """
+        sample_size, _ = CLIOperations.get_int_env('COMPARE_SAMPLE_SIZE', 16, minimum=2)
+        seed, _ = CLIOperations.get_int_env('COMPARE_SAMPLE_SEED', 0, minimum=0)
+        return sample_size, seed
+
+    @staticmethod
+    def get_startup_profile_mode():
+        """
+        Get whether to report the cost of imports and initialization from environment variable
+        Returns:
+            Tuple of (enabled, source)
+        """
+        return CLIOperations.get_bool_env('STARTUP_PROFILE', False)
+
+    @staticmethod
+    def get_trace_mode():
+        """
+        Get whether the image pipeline records a Chrome trace from environment variable
+        Returns:
+            Tuple of (enabled, source)
+        """
+        return CLIOperations.get_bool_env('TRACE_PIPELINE', False)
+
+    @staticmethod
+    def get_out_of_core_config():
+        """
+        Get the out-of-core matrix multiplication settings from environment variables
+        Returns:
+            Tuple of (sizes, host memory budget in MB, directory for operand files);
+            sizes is empty when the out-of-core run is disabled
+        """
+        env_sizes = os.getenv('MATRIX_OOC_SIZES', '').strip()
+        sizes = []
+        if env_sizes:
+            try:
+                sizes = CLIOperations.parse_matrix_sizes(env_sizes)
+            except argparse.ArgumentTypeError:
+                console.print(f"[yellow]Invalid MATRIX_OOC_SIZES, skipping out-of-core run:[/] {env_sizes}")
+        memory_budget_mb, _ = CLIOperations.get_int_env('OOC_MEMORY_BUDGET_MB', 1024)
+        workdir = os.getenv('OOC_DIR') or None
+        return sizes, memory_budget_mb, workdir
+
     @staticmethod
     def display_configuration(sizes, source):
         """Display benchmark configuration"""
@@ -137,4 +599,169 @@ class CLIOperations:
                 f"{result['cpu_time']:^12.6f} | "
                 f"{gpu_time:^12} | "
                 f"[{speedup_color}]{speedup:^12}[/]"
-            )
\ No newline at end of file
+            )
+
+    @staticmethod
+    def display_precision_results(results):
+        """Display matrix multiplication precision sweep results"""
+        console.print("\n[bold]Precision Sweep:[/]")
+        console.print("─" * 55)
+        console.print(f"{'Matrix Size':^12} | {'Device':^6} | {'Precision':^9} | {'Time (s)':^10} | {'GFLOPS':^10}")
+        console.print("─" * 55)
+        
+        for result in results:
+            if result['time'] is None:
+                console.print(
+                    f"{result['size']:^12} | {result['device'].upper():^6} | {result['precision']:^9} | "
+                    f"[yellow]{'N/A':^10}[/] | {result['error']}"
+                )
+                continue
+            console.print(
+                f"{result['size']:^12} | {result['device'].upper():^6} | {result['precision']:^9} | "
+                f"{result['time']:^10.6f} | {result['gflops']:^10.1f}"
+            )
+
+    @staticmethod
+    def display_microbenchmarks(results, peaks):
+        """
+        Display microbenchmark throughput against the theoretical peaks
+        Args:
+            results: Microbenchmark results
+            peaks: Theoretical peaks the results were compared with
+        """
+        describe = lambda value, unit: f"{value:g} {unit}" if value else "unknown"
+        console.print(
+            "\n[bold]Microbenchmarks:[/] peaks CPU "
+            f"{describe(peaks['cpu']['gflops'], 'GFLOPS')} / {describe(peaks['cpu']['gbs'], 'GB/s')}, GPU "
+            f"{describe(peaks['cuda']['gflops'], 'GFLOPS')} / {describe(peaks['cuda']['gbs'], 'GB/s')}, "
+            f"link {describe(peaks['link_gbs'], 'GB/s')}"
+        )
+        console.print("─" * 90)
+        console.print(
+            f"{'Kernel':^16} | {'Device':^6} | {'Time (s)':^10} | {'GFLOPS':^9} | {'GB/s':^8} | "
+            f"{'FLOP/B':^7} | {'Bound':^7} | {'Of peak':^7}"
+        )
+        console.print("─" * 90)
+        
+        for result in results:
+            if result['time'] is None:
+                console.print(
+                    f"{result['kernel']:^16} | {result['device'].upper():^6} | "
+                    f"[yellow]{'N/A':^10}[/] | {result['error']}"
+                )
+                continue
+            gflops = f"{result['gflops']:.1f}" if result['gflops'] else "-"
+            intensity = f"{result['intensity']:.2f}" if result['intensity'] else "-"
+            peak_fraction = f"{result['peak_fraction']:.0%}" if result['peak_fraction'] is not None else "N/A"
+            console.print(
+                f"{result['kernel']:^16} | {result['device'].upper():^6} | {result['time']:^10.6f} | "
+                f"{gflops:^9} | {result['gbs']:^8.1f} | {intensity:^7} | {result['bound'] or 'N/A':^7} | "
+                f"{peak_fraction:^7}"
+            )
+
+    @staticmethod
+    def display_thread_sweep(results, label, label_key):
+        """
+        Display CPU thread sweep results with scaling efficiency
+        Args:
+            results: Thread sweep results
+            label: Column title of the workload (e.g. Matrix Size)
+            label_key: Result key holding the workload
+        """
+        from benchmark_operations.cpu_threads import available_cpus, cpu_quota
+
+        quota = cpu_quota()
+        console.print(
+            f"\n[bold]CPU Thread Sweep:[/] {available_cpus()} CPUs allowed, "
+            f"cgroup quota {f'{quota:.1f} CPUs' if quota else 'unlimited'}"
+        )
+        console.print("─" * 68)
+        console.print(
+            f"{label:^12} | {'Threads':^7} | {'Pinned':^6} | {'Time (s)':^10} | {'Speedup':^8} | {'Efficiency':^10}"
+        )
+        console.print("─" * 68)
+        best = {}
+        for result in results:
+            if result[label_key] not in best or result['time'] < best[result[label_key]]['time']:
+                best[result[label_key]] = result
+        for result in results:
+            marker = " [green]best[/]" if best[result[label_key]] is result else ""
+            speedup = f"{result['speedup']:.2f}" if result['speedup'] is not None else "N/A"
+            efficiency = f"{result['efficiency']:.2f}" if result['efficiency'] is not None else "N/A"
+            console.print(
+                f"{result[label_key]:^12} | {result['threads']:^7} | {str(result['pinned']):^6} | "
+                f"{result['time']:^10.6f} | {speedup:^8} | {efficiency:^10}{marker}"
+            )
+
+    @staticmethod
+    def display_out_of_core_results(results):
+        """Display out-of-core matrix multiplication results"""
+        console.print("\n[bold]Out-of-Core Matmul:[/]")
+        console.print("─" * 75)
+        console.print(
+            f"{'Matrix Size':^12} | {'Device':^6} | {'Tile':^6} | {'Time (s)':^10} | "
+            f"{'GFLOPS':^8} | {'I/O (GB/s)':^10} | {'I/O Wait (s)':^12}"
+        )
+        console.print("─" * 75)
+        
+        for result in results:
+            if result['error']:
+                console.print(
+                    f"{result['size']:^12} | {result['device'].upper():^6} | [red]{result['error']}[/]"
+                )
+                continue
+            console.print(
+                f"{result['size']:^12} | {result['device'].upper():^6} | {result['tile']:^6} | "
+                f"{result['total_time']:^10.2f} | {result['gflops']:^8.1f} | "
+                f"{result['io_bandwidth_gbs']:^10.2f} | {result['io_wait_time']:^12.2f}"
+            )
+
+    @staticmethod
+    def display_s3_metrics(metrics):
+        """Display client-side S3 metrics per operation"""
+        if not metrics:
+            return
+        console.print("\n[bold]S3 Client Metrics:[/]")
+        console.print("─" * 76)
+        console.print(
+            f"{'Operation':<20} | {'Calls':>6} | {'Errors':>6} | {'Retries':>7} | "
+            f"{'MB':>8} | {'Mean (ms)':>9} | {'p95 (ms)':>8}"
+        )
+        console.print("─" * 76)
+        
+        for name, operation in metrics.items():
+            megabytes = (operation['bytes_sent'] + operation['bytes_received']) / 1024**2
+            error_color = "red" if operation['errors'] else "default"
+            console.print(
+                f"{name:<20} | {operation['calls']:>6} | [{error_color}]{operation['errors']:>6}[/] | "
+                f"{operation['retries']:>7} | {megabytes:>8.2f} | {operation['mean_time'] * 1000:>9.2f} | "
+                f"{operation['p95_time'] * 1000:>8.0f}"
+            )
+
+    @staticmethod
+    def display_startup_profile(phases):
+        """Display the time spent in each startup phase"""
+        total = sum(phase['seconds'] for phase in phases)
+        console.print("\n[bold]Startup Profile:[/]")
+        console.print("─" * 76)
+        console.print(f"{'Phase':<32} | {'Time (ms)':>9} | {'Share':>6} | New packages")
+        console.print("─" * 76)
+        for phase in phases:
+            share = phase['seconds'] / total * 100 if total > 0 else 0.0
+            packages = ', '.join(phase['packages'])
+            if len(packages) > 22:
+                packages = packages[:19] + '...'
+            console.print(f"{phase['name']:<32} | {phase['seconds'] * 1000:>9.1f} | {share:>5.1f}% | {packages}")
+        console.print("─" * 76)
+        console.print(f"{'Total':<32} | {total * 1000:>9.1f} |")
+
+    @staticmethod
+    def display_cache_stats(stats):
+        """Display read-through disk cache statistics"""
+        reads = stats['hits'] + stats['misses']
+        hit_rate = stats['hits'] / reads * 100 if reads else 0.0
+        console.print(
+            f"\n[bold]Disk Cache:[/] {stats['hits']}/{reads} hits ({hit_rate:.0f}%), "
+            f"{stats['bytes_from_cache'] / 1024**2:.1f} MB from cache, "
+            f"{stats['bytes_fetched'] / 1024**2:.1f} MB fetched, {stats['evictions']} evictions"
+        )
\ No newline at end of file
@@ -0,0 +1,92 @@
+from cli_operations.cli_operations import CLIOperations
+from results_operations.results_operations import ResultsOperations
+from main import create_s3_operations
+from rich.console import Console
+import argparse
+import json
+import os
+import sys
+
+console = Console()
+
+STATUS_COLORS = {'regression': 'red', 'improvement': 'green'}
+
+
+def format_params(params):
+    """Compact one-line form of a record's parameters"""
+    return ', '.join(f"{key}={json.dumps(value)}" for key, value in sorted(params.items()))
+
+
+def print_history(rows):
+    """Print pooled medians per benchmark series and image tag"""
+    console.print(f"\n{'Benchmark':<20} | {'Device':<6} | {'Image tag':<16} | {'Runs':>4} | {'Samples':>7} | {'Median (s)':>10} | Params")
+    console.print("─" * 100)
+    for row in sorted(rows, key=lambda row: (row['benchmark'], row['device'], format_params(row['params']))):
+        console.print(f"{row['benchmark']:<20} | {row['device']:<6} | {row['image_tag']:<16} | {row['runs']:>4} | "
+                      f"{row['samples']:>7} | {row['median']:>10.6f} | {format_params(row['params'])}")
+
+
+def print_comparisons(comparisons, baseline_tag, candidate_tag):
+    """Print the baseline/candidate comparison of every shared series"""
+    console.print(f"\n[bold]Baseline {baseline_tag} vs candidate {candidate_tag}[/]")
+    console.print(f"\n{'Benchmark':<20} | {'Device':<6} | {'Baseline (s)':>12} | {'Candidate (s)':>13} | "
+                  f"{'Ratio':>6} | {'p-value':>8} | {'Status':<11} | Params")
+    console.print("─" * 110)
+    for comparison in comparisons:
+        status_color = STATUS_COLORS.get(comparison['status'], 'white')
+        console.print(f"{comparison['benchmark']:<20} | {comparison['device']:<6} | "
+                      f"{comparison['baseline_median']:>12.6f} | {comparison['candidate_median']:>13.6f} | "
+                      f"{comparison['ratio']:>6.3f} | {comparison['p_value']:>8.4f} | "
+                      f"[{status_color}]{comparison['status']:<11}[/] | {format_params(comparison['params'])}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Query stored benchmark results and detect regressions')
+    parser.add_argument('--results-folder', type=str, default=os.getenv('RESULTS_FOLDER', 'benchmark_results'),
+                        help='Benchmark results folder holding the records/ subfolder')
+    parser.add_argument('--kind', choices=['matrix', 'image', 'startup', 'e2e'], help='Only load runs of this kind')
+    parser.add_argument('--baseline', type=str, help='Baseline image tag (default: the tag run before the candidate)')
+    parser.add_argument('--candidate', type=str, help='Candidate image tag (default: the most recent tag)')
+    parser.add_argument('--alpha', type=float, default=0.01, help='Significance level of the slowdown test')
+    parser.add_argument('--min-slowdown', type=float, default=0.05,
+                        help='Minimum relative median slowdown to flag (0.05 = 5%%)')
+    args = parser.parse_args()
+
+    s3_ops = create_s3_operations(CLIOperations())
+    results_ops = ResultsOperations(s3_ops, args.results_folder)
+    history = results_ops.load_history(args.kind)
+    if not history:
+        console.print(f"[red]No result records found in {results_ops.records_folder}[/]")
+        sys.exit(1)
+
+    print_history(ResultsOperations.aggregate(history))
+
+    tags = ResultsOperations.image_tags(history)
+    candidate_tag = args.candidate or tags[-1]
+    baseline_tag = args.baseline
+    if not baseline_tag:
+        earlier = tags[:tags.index(candidate_tag)] if candidate_tag in tags else []
+        if not earlier:
+            console.print(f"\n[yellow]No image tag recorded before {candidate_tag}; nothing to compare against[/]")
+            return
+        baseline_tag = earlier[-1]
+
+    comparisons = ResultsOperations.detect_regressions(
+        history, baseline_tag, candidate_tag, alpha=args.alpha, min_slowdown=args.min_slowdown
+    )
+    if not comparisons:
+        console.print(f"\n[yellow]No benchmark series measured under both {baseline_tag} and {candidate_tag}[/]")
+        return
+    print_comparisons(comparisons, baseline_tag, candidate_tag)
+
+    regressions = [comparison for comparison in comparisons if comparison['status'] == 'regression']
+    improvements = sum(1 for comparison in comparisons if comparison['status'] == 'improvement')
+    summary_color = "red" if regressions else "green"
+    console.print(f"\n[{summary_color}]{len(regressions)} regressions, {improvements} improvements "
+                  f"in {len(comparisons)} series[/]")
+    if regressions:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,266 @@
+import io
+import math
+import warnings
+import numpy as np
+import torch
+from PIL import Image
+from torchvision.io import ImageReadMode, decode_image
+from typing import Dict, Optional, Tuple, Union
+from tracing.tracer import tracer
+
+# Decoders only read the compressed bytes and the decoded PIL arrays
+warnings.filterwarnings('ignore', message='The given (buffer|NumPy array) is not writable')
+
+
+def to_float(batch: torch.Tensor, out: Optional[torch.Tensor] = None) -> torch.Tensor:
+    """
+    Scale a uint8 image batch to float32 in [0, 1], as ToTensor does
+
+    Float batches are returned as they are.
+    Args:
+        batch: uint8 or float image tensor
+        out: Optional float32 tensor of the same shape to write into
+    """
+    if batch.is_floating_point():
+        return batch
+    if out is None:
+        return batch.to(torch.float32).div_(255)
+    return out.copy_(batch).div_(255)
+
+
+def to_uint8(batch: torch.Tensor) -> torch.Tensor:
+    """Quantize a float image batch in [0, 1] to uint8, truncating like ToPILImage"""
+    return batch.mul(255).to(torch.uint8)
+
+
+class BufferPool:
+    """
+    Preallocated tensors reused across images
+
+    One flat buffer is kept per purpose, device and dtype. It only grows,
+    so a run over same-sized images allocates it once and smaller images
+    use a view of it.
+    """
+
+    def __init__(self):
+        self._buffers: Dict[Tuple[str, str, torch.dtype], torch.Tensor] = {}
+
+    def get(self, name: str, shape: Tuple[int, ...], dtype: torch.dtype, device: torch.device,
+            pin_memory: bool = False) -> torch.Tensor:
+        """
+        Buffer of a shape for a purpose; its contents are undefined
+        Args:
+            name: Purpose of the buffer; callers must be done with the previous
+                buffer of the same name before asking for it again
+            shape: Shape of the returned view
+            dtype: Element type
+            device: Device of the buffer
+            pin_memory: Allocate page-locked host memory (faster GPU copies)
+        """
+        numel = math.prod(shape)
+        key = (name, str(device), dtype)
+        buffer = self._buffers.get(key)
+        if buffer is None or buffer.numel() < numel:
+            # Freed before the larger one is allocated
+            self._buffers.pop(key, None)
+            buffer = torch.empty(numel, dtype=dtype, device=device, pin_memory=pin_memory)
+            self._buffers[key] = buffer
+        return buffer[:numel].view(shape)
+
+    def clear(self):
+        self._buffers.clear()
+
+
+class ImageCodec:
+    """
+    Decode images straight to uint8 CHW tensors and back to PIL for encoding
+
+    JPEGs and PNGs in L, RGB or RGBA are decoded by torchvision.io, with no
+    PIL image in between; other formats and modes go through PIL and are
+    wrapped as a tensor without another copy. Images stay uint8 (a quarter
+    of float32) until the transform converts them, so decoded images in
+    the pipeline queues and host/device copies are 4x smaller.
+
+    With max_side, larger images are scaled down to fit. JPEGs are then
+    decoded at a reduced scale (PIL draft mode, 1/2 to 1/8 in the DCT)
+    before the final resize, which skips most of the decode work.
+    """
+
+    IO_FORMATS = {'JPEG', 'PNG'}
+    IO_MODES = {'L': 1, 'RGB': 3, 'RGBA': 4}
+
+    def __init__(self, max_side: int = 0):
+        """
+        Args:
+            max_side: Longest output side in pixels (0 keeps the input size)
+        """
+        self.max_side = max_side
+
+    def output_size(self, width: int, height: int) -> Tuple[int, int]:
+        """(width, height) of the decoded image for an input size"""
+        if not self.max_side or max(width, height) <= self.max_side:
+            return width, height
+        scale = self.max_side / max(width, height)
+        return max(1, round(width * scale)), max(1, round(height * scale))
+
+    @staticmethod
+    def _channels(image: Image.Image) -> int:
+        # Modes that are not 8 bits per channel are converted to L or RGB
+        channels = len(image.getbands())
+        if image.mode in ('1', 'I', 'I;16', 'I;16B', 'I;16L', 'F'):
+            return 1
+        return channels
+
+    def shape(self, image_data: bytes) -> Tuple[int, int, int]:
+        """
+        CHW shape of an image once decoded, read from its header
+        Args:
+            image_data: Raw image bytes
+        """
+        image = Image.open(io.BytesIO(image_data))
+        width, height = self.output_size(*image.size)
+        return self._channels(image), height, width
+
+    def open(self, image_data: bytes) -> Image.Image:
+        """
+        Decode image bytes into an 8-bit PIL image, scaled to fit max_side
+        Args:
+            image_data: Raw image bytes
+        """
+        return self._load(Image.open(io.BytesIO(image_data)))
+
+    def _load(self, image: Image.Image) -> Image.Image:
+        """Load a lazily opened PIL image as open() returns it"""
+        image_format = image.format
+        size = self.output_size(*image.size)
+        if size != image.size:
+            # JPEG only: picks the smallest DCT scale still at least size
+            image.draft(image.mode, size)
+        image.load()
+        if image.mode not in ('L', 'P', 'RGB', 'RGBA', 'LA', 'CMYK', 'YCbCr'):
+            image = image.convert('RGB' if len(image.getbands()) >= 3 else 'L')
+        if image.size != size:
+            image = image.resize(size, Image.BILINEAR)
+        image.format = image_format
+        return image
+
+    def decode(self, image_data: bytes, timings: Optional[Dict] = None) -> Tuple[torch.Tensor, str]:
+        """
+        Decode image bytes into a uint8 CHW tensor
+        Args:
+            image_data: Raw image bytes
+            timings: Optional dictionary receiving decode_time and, for images
+                decoded by PIL, to_tensor_time
+        Returns:
+            Tuple of (uint8 image tensor, image format)
+        """
+        with tracer.span('decode', 'image') as decode_span:
+            header = Image.open(io.BytesIO(image_data))
+            image_format = header.format if header.format else 'PNG'
+            channels = self.IO_MODES.get(header.mode)
+            image_tensor = None
+            if (image_format in self.IO_FORMATS and channels is not None
+                    and self.output_size(*header.size) == header.size):
+                image_tensor = decode_image(torch.frombuffer(image_data, dtype=torch.uint8),
+                                            mode=ImageReadMode.UNCHANGED)
+                # e.g. a PNG transparency chunk PIL keeps as metadata
+                if image_tensor.shape[0] != channels:
+                    image_tensor = None
+            if image_tensor is None:
+                image = self._load(header)
+        if timings is not None:
+            timings['decode_time'] = decode_span.duration
+        if image_tensor is not None:
+            return image_tensor, image_format
+
+        with tracer.span('to_tensor', 'image') as to_tensor_span:
+            array = np.asarray(image)
+            image_tensor = torch.from_numpy(array).permute(2, 0, 1) if array.ndim == 3 else torch.from_numpy(array)[None]
+        if timings is not None:
+            timings['to_tensor_time'] = to_tensor_span.duration
+        return image_tensor, image_format
+
+    @staticmethod
+    def to_pil(image_tensor: torch.Tensor) -> Image.Image:
+        """PIL image of a uint8 (or float) CHW tensor, in the mode ToPILImage would pick"""
+        if image_tensor.is_floating_point():
+            image_tensor = to_uint8(image_tensor)
+        array = image_tensor.permute(1, 2, 0).contiguous().numpy()
+        return Image.fromarray(array[:, :, 0] if array.shape[2] == 1 else array)
+
+
+class OutputEncoder:
+    """
+    Encode processed images with a configurable format and settings
+
+    By default every image is saved in its source format with Pillow's
+    default settings. PNG at the default compression level can cost more
+    CPU than the transform itself, so the format, PNG compression level,
+    JPEG/WebP quality and the encoders' optimize passes are configurable
+    to trade encode time against output size (S3 egress).
+    """
+
+    FORMATS = ('source', 'PNG', 'JPEG', 'WEBP')
+    SUFFIXES = {'PNG': '.png', 'JPEG': '.jpg', 'WEBP': '.webp'}
+    DEFAULT_PNG_COMPRESS_LEVEL = 6
+
+    def __init__(self, image_format: str = 'source', png_compress_level: int = DEFAULT_PNG_COMPRESS_LEVEL,
+                 quality: int = 0, optimize: bool = False):
+        """
+        Args:
+            image_format: Output format (source keeps each image's own format)
+            png_compress_level: zlib level of PNG output, 0 (none) to 9
+            quality: JPEG and WebP quality, 1 to 100 (0 = Pillow's default)
+            optimize: Extra optimize pass of PNG and JPEG output (slowest WebP
+                method for WebP)
+        """
+        self.image_format = image_format if image_format == 'source' else image_format.upper()
+        self.png_compress_level = png_compress_level
+        self.quality = quality
+        self.optimize = optimize
+
+    @property
+    def suffix(self) -> Optional[str]:
+        """File extension of the output, or None when it keeps the source's"""
+        return self.SUFFIXES.get(self.image_format)
+
+    def output_format(self, source_format: str) -> str:
+        return source_format if self.image_format == 'source' else self.image_format
+
+    def save_options(self, image_format: str) -> Dict:
+        """Pillow save() keyword arguments for an output format"""
+        if image_format == 'PNG':
+            return {'compress_level': self.png_compress_level, 'optimize': self.optimize}
+        options = {}
+        if image_format in ('JPEG', 'WEBP') and self.quality:
+            options['quality'] = self.quality
+        if image_format == 'JPEG' and self.optimize:
+            options['optimize'] = True
+        if image_format == 'WEBP' and self.optimize:
+            options['method'] = 6
+        return options
+
+    def encode(self, image: Image.Image, source_format: str) -> Tuple[bytes, str]:
+        """
+        Encode a PIL image
+        Args:
+            image: Processed image
+            source_format: Format of the source image
+        Returns:
+            Tuple of (encoded bytes, output format)
+        """
+        image_format = self.output_format(source_format)
+        if image_format == 'JPEG' and image.mode not in ('L', 'RGB', 'CMYK'):
+            # JPEG has no alpha channel
+            image = image.convert('RGB')
+        buffer = io.BytesIO()
+        image.save(buffer, format=image_format, **self.save_options(image_format))
+        return buffer.getvalue(), image_format
+
+    def params(self) -> Union[str, Dict]:
+        """Encoding parameters for the incremental manifest and result records"""
+        if (self.image_format == 'source' and self.png_compress_level == self.DEFAULT_PNG_COMPRESS_LEVEL
+                and not self.quality and not self.optimize):
+            return 'source format'
+        return {'format': self.image_format, 'png_compress_level': self.png_compress_level,
+                'quality': self.quality, 'optimize': self.optimize}
\ No newline at end of file
@@ -0,0 +1,156 @@
+import hashlib
+import json
+import os
+import time
+import torch
+import torchvision.transforms as transforms
+import torchvision.transforms.functional as TF
+from rich.console import Console
+from typing import Dict, Optional
+from .codec import to_float, to_uint8
+from .gaussian_blur import GaussianBlurEngine
+
+console = Console()
+
+
+def _blend(image: torch.Tensor, other, ratio: torch.Tensor) -> torch.Tensor:
+    """torchvision's _blend for float images"""
+    return (ratio * image + (1.0 - ratio) * other).clamp(0, 1)
+
+
+class CompiledTransform:
+    """
+    Gaussian blur and ColorJitter as one torch.compile'd function
+
+    Eagerly, Compose runs the blur and each jitter op as separate kernels
+    with a full-size intermediate between them; compiled, the elementwise
+    jitter ops and the uint8 to float conversions on either side are fused
+    into as few kernels as possible. Inputs are converted to channels_last,
+    which the convolution backends prefer.
+
+    ColorJitter's factors are drawn outside the compiled function and
+    passed in as tensors, so new factors do not trigger recompilation.
+    Shapes are compiled as dynamic, so a graph is specialized only on its
+    shape bucket: single-image batch or not, channel count, input dtype,
+    blur backend and jitter op order.
+
+    With a cache directory, the compiled artifacts of every shape bucket are
+    saved there (torch.compiler.save_cache_artifacts, torch 2.7+) as one
+    bundle per device, torch version, pipeline parameters and bucket.
+    Bundles for the current device and parameters are loaded on start, so
+    later pods on the same volume skip recompiling.
+    """
+
+    def __init__(self, blur_engine: GaussianBlurEngine, color_jitter: transforms.ColorJitter,
+                 params: Dict, cache_dir: Optional[str] = None, channels_last: bool = True):
+        """
+        Args:
+            blur_engine: Blur to compile
+            color_jitter: ColorJitter whose factor ranges are used
+            params: Pipeline parameters, part of the artifact cache key
+            cache_dir: Directory for compiled artifact bundles (None only uses
+                torch's own per-process cache)
+            channels_last: Run on channels_last inputs
+        """
+        self.blur_engine = blur_engine
+        self.color_jitter = color_jitter
+        self.channels_last = channels_last
+        self.cache_dir = cache_dir
+        encoded = json.dumps({'params': params, 'channels_last': channels_last}, sort_keys=True).encode()
+        self.params_hash = hashlib.sha256(encoded).hexdigest()[:16]
+        # Seconds spent in the first (compiling) call, per device and shape bucket
+        self.compile_times: Dict[str, float] = {}
+        self.loaded_bundles = 0
+        if cache_dir:
+            if not hasattr(torch.compiler, 'save_cache_artifacts'):
+                console.print(f"[yellow]torch {torch.__version__} cannot save compiled artifacts; "
+                              f"compiling on every start[/]")
+            os.makedirs(cache_dir, exist_ok=True)
+        self._fn = torch.compile(self._transform, dynamic=True)
+
+    def _transform(self, x: torch.Tensor, brightness: Optional[torch.Tensor],
+                   contrast: Optional[torch.Tensor], brightness_first: bool) -> torch.Tensor:
+        x = self.blur_engine(to_float(x))
+        if brightness is not None and brightness_first:
+            x = _blend(x, 0.0, brightness)
+        if contrast is not None:
+            gray = TF.rgb_to_grayscale(x) if x.shape[-3] == 3 else x
+            x = _blend(x, gray.mean(dim=(-3, -2, -1), keepdim=True), contrast)
+        if brightness is not None and not brightness_first:
+            x = _blend(x, 0.0, brightness)
+        return to_uint8(x)
+
+    def _bundle_prefix(self, device: torch.device) -> str:
+        device_name = torch.cuda.get_device_name(device) if device.type == 'cuda' else 'cpu'
+        safe_name = ''.join(c if c.isalnum() else '_' for c in device_name)
+        return f"{safe_name}-torch{torch.__version__.replace('+', '_')}-{self.params_hash}"
+
+    def load_artifacts(self, device: torch.device) -> int:
+        """
+        Load the saved compiled artifacts for a device and the current parameters
+        Returns:
+            Number of bundles loaded
+        """
+        if not self.cache_dir or not hasattr(torch.compiler, 'load_cache_artifacts'):
+            return 0
+        prefix = self._bundle_prefix(device)
+        loaded = 0
+        for name in sorted(os.listdir(self.cache_dir)):
+            if name.startswith(prefix) and name.endswith('.bin'):
+                with open(os.path.join(self.cache_dir, name), 'rb') as f:
+                    try:
+                        torch.compiler.load_cache_artifacts(f.read())
+                        loaded += 1
+                    except Exception as e:
+                        console.print(f"[yellow]Ignoring unreadable compiled artifacts {name}: {e}[/]")
+        self.loaded_bundles += loaded
+        return loaded
+
+    def _save_artifacts(self, device: torch.device, bucket: str):
+        if not self.cache_dir or not hasattr(torch.compiler, 'save_cache_artifacts'):
+            return
+        artifacts = torch.compiler.save_cache_artifacts()
+        if artifacts is None:
+            return
+        path = os.path.join(self.cache_dir, f"{self._bundle_prefix(device)}-{bucket}.bin")
+        # Written under a temporary name so concurrent pods never read half a bundle
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, 'wb') as f:
+            f.write(artifacts[0])
+        os.replace(temp_path, path)
+
+    def __call__(self, x: torch.Tensor) -> torch.Tensor:
+        """
+        Transform a uint8 NCHW (or CHW) batch with one draw of the jitter factors, returning uint8
+        Raises:
+            Whatever compilation raises for a device it fails on (e.g. no C++
+            compiler for CPU code); callers fall back to the eager pipeline
+        """
+        squeeze = x.dim() == 3
+        if squeeze:
+            x = x.unsqueeze(0)
+        jitter = self.color_jitter
+        fn_idx, brightness, contrast, _, _ = transforms.ColorJitter.get_params(
+            jitter.brightness, jitter.contrast, jitter.saturation, jitter.hue
+        )
+        order = fn_idx.tolist()
+        brightness_first = order.index(0) < order.index(1)
+        as_tensor = lambda factor: None if factor is None else torch.tensor(factor, device=x.device, dtype=torch.float32)
+        if self.channels_last:
+            x = x.contiguous(memory_format=torch.channels_last)
+
+        backend = self.blur_engine.select_backend(tuple(x.shape), x.device.type)
+        # Compiled graphs specialize on a batch of one
+        bucket = (f"{'n1' if x.shape[0] == 1 else 'n'}-c{x.shape[1]}-{str(x.dtype).replace('torch.', '')}-"
+                  f"{backend}-{'bc' if brightness_first else 'cb'}")
+        compile_key = f"{x.device.type}/{bucket}"
+        start_time = time.perf_counter()
+        output = self._fn(x, as_tensor(brightness), as_tensor(contrast), brightness_first)
+        if compile_key not in self.compile_times:
+            if x.device.type == 'cuda':
+                torch.cuda.synchronize()
+            self.compile_times[compile_key] = time.perf_counter() - start_time
+            self._save_artifacts(x.device, bucket)
+
+        output = output.contiguous()
+        return output.squeeze(0) if squeeze else output
\ No newline at end of file
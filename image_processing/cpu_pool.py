@@ -0,0 +1,131 @@
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+from benchmark_operations.cpu_threads import available_cpus
+
+# Per-process ImageProcessingOperations, created by _init_worker
+_worker_ops = None
+
+
+def _init_worker(blur_backend: str, kernel_size: int, sigma: float,
+                 blur_costs: Optional[Dict[str, float]], num_threads: int, max_side: int, encoder):
+    """Build the worker's transform pipeline once, reusing the parent's calibration"""
+    global _worker_ops
+    import torch
+    from .image_processing_operations import ImageProcessingOperations
+
+    torch.set_num_threads(num_threads)
+    # Single timed pass per image so the pool wall time measures real throughput. CPU only,
+    # so a worker on a GPU node creates no CUDA context; the 1 MB budget is never used
+    _worker_ops = ImageProcessingOperations(
+        blur_backend=blur_backend,
+        kernel_size=kernel_size,
+        sigma=sigma,
+        calibrate=False,
+        warmup=0,
+        repeats=1,
+        max_side=max_side,
+        encoder=encoder,
+        memory_budget_mb=1,
+        cpu_only=True
+    )
+    if blur_costs:
+        _worker_ops.blur_engine.costs['cpu'] = blur_costs
+    # Warm up the transform once instead of on the first timed image
+    _worker_ops.transform_cpu(torch.randint(0, 256, (3, 64, 64), dtype=torch.uint8))
+
+
+def _process_image(image_data: bytes) -> Dict:
+    """
+    Decode, transform and encode one image inside a worker process
+
+    The encoded output is only timed, not returned: the parent keeps its
+    own output, so pickling it back would add IPC to the baseline.
+    """
+    start_time = time.perf_counter()
+    image_tensor, image_format = _worker_ops.decode_image(image_data)
+    processed_tensor, cpu_stats = _worker_ops.transform_cpu(image_tensor)
+    _worker_ops.encode_image(processed_tensor, image_format)
+    return {
+        'cpu_time': cpu_stats['median'],
+        'cpu_total_time': time.perf_counter() - start_time
+    }
+
+
+def _ping(_) -> int:
+    time.sleep(0.05)
+    return os.getpid()
+
+
+class CPUProcessPool:
+    """
+    Multi-process CPU baseline for the image pipeline
+
+    Every worker process decodes, transforms and encodes whole images, so
+    only the compressed input and the timings cross process boundaries.
+    Intra-op threads are split evenly across workers to avoid
+    oversubscribing the cores the pod is allowed to use.
+    """
+
+    def __init__(self, workers: int, blur_backend: str = 'auto', kernel_size: int = 31,
+                 sigma: float = 5.0, blur_costs: Optional[Dict[str, float]] = None, max_side: int = 0,
+                 encoder=None):
+        """
+        Args:
+            workers: Number of worker processes
+            blur_backend: Gaussian blur backend used by the workers
+            kernel_size: Gaussian blur kernel size
+            sigma: Gaussian blur standard deviation
+            blur_costs: Calibrated CPU blur costs from the parent process
+            max_side: Longest side images are scaled down to when decoding (0 keeps their size)
+            encoder: OutputEncoder the workers encode with (None for the default)
+        """
+        self.workers = workers
+        self.threads_per_worker = max(1, available_cpus() // workers)
+        # spawn keeps workers independent of any CUDA context in the parent
+        self.executor = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=_init_worker,
+            initargs=(blur_backend, kernel_size, sigma, blur_costs, self.threads_per_worker, max_side, encoder)
+        )
+        self._warm = False
+
+    def warmup(self):
+        """Start every worker so process startup and imports are not timed"""
+        if not self._warm:
+            list(self.executor.map(_ping, range(self.workers * 2)))
+            self._warm = True
+
+    def process(self, images_data: List[bytes]) -> Tuple[List[Dict], float]:
+        """
+        Process images across the worker processes
+        Args:
+            images_data: List of image bytes
+        Returns:
+            Tuple of (per-image results in input order, wall-clock time)
+        """
+        self.warmup()
+        start_time = time.perf_counter()
+        # Memory-mapped cache hits cannot be pickled to the workers
+        futures = [
+            self.executor.submit(
+                _process_image,
+                image_data if isinstance(image_data, (bytes, bytearray)) else bytes(image_data)
+            )
+            for image_data in images_data
+        ]
+        results = []
+        for future in futures:
+            try:
+                result = future.result()
+                result['error'] = None
+            except Exception as e:
+                result = {'error': str(e)}
+            results.append(result)
+        return results, time.perf_counter() - start_time
+
+    def shutdown(self):
+        self.executor.shutdown(wait=True, cancel_futures=True)
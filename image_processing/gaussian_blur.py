@@ -0,0 +1,187 @@
+import math
+import time
+import torch
+import torch.nn.functional as F
+from typing import Dict, Optional, Tuple
+
+BACKENDS = ('direct', 'separable', 'fft')
+
+
+def gaussian_kernel1d(kernel_size: int, sigma: float) -> torch.Tensor:
+    """Normalized 1D Gaussian kernel, sampled like torchvision's GaussianBlur"""
+    half = (kernel_size - 1) * 0.5
+    x = torch.linspace(-half, half, steps=kernel_size)
+    pdf = torch.exp(-0.5 * (x / sigma).pow(2))
+    return pdf / pdf.sum()
+
+
+class GaussianBlurEngine(torch.nn.Module):
+    """
+    Gaussian blur with selectable convolution backends
+
+    Backends (all with reflect padding, matching transforms.GaussianBlur):
+        direct:    one depthwise conv2d with the full k x k kernel, O(k^2) per pixel
+        separable: a horizontal then a vertical 1D pass, O(k) per pixel
+        fft:       pointwise product in the frequency domain, O(log N) per pixel
+        auto:      per call, the backend with the lowest predicted cost for the
+                   kernel and image size (see predict_cost / calibrate)
+    """
+
+    # Relative cost per unit of work (kernel tap or FFT butterfly) until calibrated
+    DEFAULT_COSTS = {'direct': 1.0, 'separable': 1.0, 'fft': 4.0}
+
+    def __init__(self, kernel_size: int = 31, sigma: float = 5.0, backend: str = 'auto'):
+        super().__init__()
+        if kernel_size % 2 == 0 or kernel_size < 1:
+            raise ValueError("kernel_size must be a positive odd integer")
+        if backend != 'auto' and backend not in BACKENDS:
+            raise ValueError(f"Unknown blur backend '{backend}', expected auto or one of {', '.join(BACKENDS)}")
+
+        self.kernel_size = kernel_size
+        self.sigma = sigma
+        self.backend = backend
+        self.kernel1d = gaussian_kernel1d(kernel_size, sigma)
+        self.kernel2d = torch.outer(self.kernel1d, self.kernel1d)
+        # Calibrated costs per device type, filled by calibrate()
+        self.costs: Dict[str, Dict[str, float]] = {}
+        self._kernel_cache: Dict[Tuple, torch.Tensor] = {}
+        self._fft_kernel: Optional[Tuple[Tuple, torch.Tensor]] = None
+
+    def _kernel(self, name: str, channels: int, x: torch.Tensor) -> torch.Tensor:
+        """Depthwise conv weights for the input's device, dtype and channel count"""
+        key = (name, channels, x.device, x.dtype)
+        if key not in self._kernel_cache:
+            k = self.kernel_size
+            if name == 'direct':
+                weight = self.kernel2d.view(1, 1, k, k)
+            elif name == 'horizontal':
+                weight = self.kernel1d.view(1, 1, 1, k)
+            else:
+                weight = self.kernel1d.view(1, 1, k, 1)
+            self._kernel_cache[key] = weight.repeat(channels, 1, 1, 1).to(device=x.device, dtype=x.dtype)
+        return self._kernel_cache[key]
+
+    def _pad(self, x: torch.Tensor) -> torch.Tensor:
+        half = self.kernel_size // 2
+        return F.pad(x, [half, half, half, half], mode='reflect')
+
+    def blur_direct(self, x: torch.Tensor) -> torch.Tensor:
+        channels = x.shape[1]
+        return F.conv2d(self._pad(x), self._kernel('direct', channels, x), groups=channels)
+
+    def blur_separable(self, x: torch.Tensor) -> torch.Tensor:
+        channels = x.shape[1]
+        x = F.conv2d(self._pad(x), self._kernel('horizontal', channels, x), groups=channels)
+        return F.conv2d(x, self._kernel('vertical', channels, x), groups=channels)
+
+    def blur_fft(self, x: torch.Tensor) -> torch.Tensor:
+        height, width = x.shape[-2:]
+        padded = self._pad(x)
+        size = padded.shape[-2:]
+        # Kernel spectra are image-sized, so only the most recent one is kept
+        key = (tuple(size), x.device, x.dtype)
+        if self._fft_kernel is None or self._fft_kernel[0] != key:
+            kernel = self.kernel2d.to(device=x.device, dtype=x.dtype)
+            self._fft_kernel = (key, torch.fft.rfft2(kernel, s=size))
+        # Circular convolution over the padded size; the wrapped region only
+        # touches the first k - 1 rows/columns, which are cropped away below
+        spectrum = torch.fft.rfft2(padded, s=size) * self._fft_kernel[1]
+        blurred = torch.fft.irfft2(spectrum, s=size)
+        k = self.kernel_size
+        return blurred[..., k - 1:k - 1 + height, k - 1:k - 1 + width]
+
+    def _work(self, backend: str, shape: Tuple[int, ...]) -> float:
+        """Units of work (kernel taps or FFT butterflies) a backend needs for a shape"""
+        k = self.kernel_size
+        planes = math.prod(shape[:-2])
+        height, width = shape[-2:]
+        if backend == 'direct':
+            return planes * height * width * k * k
+        if backend == 'separable':
+            return planes * height * width * 2 * k
+        padded = (height + k - 1) * (width + k - 1)
+        return planes * padded * math.log2(padded)
+
+    def predict_cost(self, backend: str, shape: Tuple[int, ...], device_type: str = 'cpu') -> float:
+        """
+        Predict the cost of a backend for an input shape
+        Args:
+            backend: One of BACKENDS
+            shape: Input tensor shape, (..., H, W)
+            device_type: Device type used to look up calibrated costs
+        Returns:
+            Predicted cost (seconds once calibrated, relative units otherwise)
+        """
+        costs = self.costs.get(device_type, self.DEFAULT_COSTS)
+        return costs[backend] * self._work(backend, shape)
+
+    def select_backend(self, shape: Tuple[int, ...], device_type: str = 'cpu') -> str:
+        """Return the configured backend, or the cheapest predicted one in auto mode"""
+        if self.backend != 'auto':
+            return self.backend
+        return min(BACKENDS, key=lambda backend: self.predict_cost(backend, shape, device_type))
+
+    def calibrate(self, device: torch.device, size: int = 256, channels: int = 3,
+                  repeats: int = 3) -> Dict[str, float]:
+        """
+        Measure per-unit cost of every backend on a device for the auto policy
+        Args:
+            device: Device to calibrate
+            size: Side of the square test image
+            channels: Channels of the test image
+            repeats: Timed runs per backend (after one warmup run)
+        Returns:
+            Calibrated cost per unit of work for each backend
+        """
+        x = torch.rand(1, channels, size, size, device=device)
+        costs = {}
+        for backend in BACKENDS:
+            blur = getattr(self, f"blur_{backend}")
+            blur(x)
+            if device.type == 'cuda':
+                torch.cuda.synchronize()
+            start_time = time.perf_counter()
+            for _ in range(repeats):
+                blur(x)
+            if device.type == 'cuda':
+                torch.cuda.synchronize()
+            elapsed = (time.perf_counter() - start_time) / repeats
+            costs[backend] = elapsed / self._work(backend, x.shape)
+        self.costs[device.type] = costs
+        return costs
+
+    def validate(self, x: Optional[torch.Tensor] = None, atol: float = 1e-4) -> Dict[str, float]:
+        """
+        Compare every backend against torchvision's gaussian_blur
+        Args:
+            x: NCHW float tensor to blur (a random 1x3x128x160 image by default)
+            atol: Maximum allowed absolute difference
+        Returns:
+            Maximum absolute difference per backend
+        Raises:
+            RuntimeError if any backend differs by more than atol
+        """
+        from torchvision.transforms import functional as TF
+
+        if x is None:
+            x = torch.rand(1, 3, 128, 160)
+        reference = TF.gaussian_blur(x, [self.kernel_size, self.kernel_size], [self.sigma, self.sigma])
+        errors = {}
+        for backend in BACKENDS:
+            output = getattr(self, f"blur_{backend}")(x)
+            errors[backend] = (output - reference).abs().max().item()
+        failed = {backend: error for backend, error in errors.items() if error > atol}
+        if failed:
+            raise RuntimeError(f"Blur backends differ from torchvision beyond {atol}: {failed}")
+        return errors
+
+    def forward(self, x: torch.Tensor) -> torch.Tensor:
+        squeeze = x.dim() == 3
+        if squeeze:
+            x = x.unsqueeze(0)
+        backend = self.select_backend(tuple(x.shape), x.device.type)
+        output = getattr(self, f"blur_{backend}")(x)
+        return output.squeeze(0) if squeeze else output
+
+    def extra_repr(self) -> str:
+        return f"kernel_size={self.kernel_size}, sigma={self.sigma}, backend={self.backend}"
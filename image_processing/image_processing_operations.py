@@ -1,26 +1,142 @@
 from PIL import Image
+import numpy as np
 import torch
 import torchvision.transforms as transforms
-import io
-import time
+import statistics
 from rich.console import Console
-from typing import Tuple, List, Dict
+from typing import Tuple, List, Dict, Optional, Union
+from benchmark_operations.batch_scheduler import AdaptiveBatchScheduler, device_memory_budget, is_out_of_memory
+from benchmark_operations.cpu_threads import cpu_threads, thread_sweep
+from benchmark_operations.timing import TimingHarness, scale_stats, summarize
+from tracing.tracer import tracer
+from .codec import BufferPool, ImageCodec, OutputEncoder, to_float, to_uint8
+from .compiled import CompiledTransform
+from .cpu_pool import CPUProcessPool
+from .gaussian_blur import GaussianBlurEngine
+from .tiled import TiledTransform
 
 console = Console()
 
+# Per-image pipeline stages in processing order: (stage name, result key in seconds)
+PIPELINE_STAGES = (
+    ('fetch', 'fetch_time'),
+    ('decode', 'decode_time'),
+    ('to_tensor', 'to_tensor_time'),
+    ('cpu_transform', 'cpu_time'),
+    ('h2d', 'h2d_time'),
+    ('gpu_transform', 'gpu_time'),
+    ('transform', 'transform_time'),
+    ('d2h', 'd2h_time'),
+    ('to_pil', 'to_pil_time'),
+    ('encode', 'encode_time'),
+    ('upload', 'upload_time')
+)
+
 class ImageProcessingOperations:
-    def __init__(self):
-        """Initialize image processing operations with CUDA availability check"""
-        self.cuda_available = torch.cuda.is_available()
+    # Float32 image-sized buffers alive at once per image while transforming:
+    # input, padded input, blur passes and ColorJitter intermediates
+    TRANSFORM_WORKING_COPIES = 6
+
+    def __init__(self, batch_size: int = 1, blur_backend: str = 'auto',
+                 kernel_size: int = 31, sigma: float = 5.0, cpu_workers: int = 0,
+                 calibrate: bool = True, warmup: int = 1, repeats: int = 5,
+                 memory_budget_mb: int = 0, batch_limits: Optional[Dict[str, int]] = None,
+                 tile_threshold_mp: int = 0, tile_size: int = 2048,
+                 cpu_threads: Optional[int] = None,
+                 compile_transforms: bool = False, compile_cache_dir: Optional[str] = None,
+                 max_side: int = 0, encoder: Optional[OutputEncoder] = None, cpu_only: bool = False):
+        """
+        Initialize image processing operations with CUDA availability check
+        Args:
+            batch_size: Maximum number of same-shape images transformed together
+            blur_backend: Gaussian blur backend (auto, direct, separable or fft)
+            kernel_size: Gaussian blur kernel size (odd)
+            sigma: Gaussian blur standard deviation
+            cpu_workers: Worker processes for the CPU baseline (0 runs it in-process)
+            calibrate: Calibrate blur backend costs when blur_backend is 'auto'
+            warmup: Untimed transform runs before measurement
+            repeats: Timed transform runs per measurement
+            memory_budget_mb: Memory a transform batch may use on the transform
+                device (0 = a share of its free memory)
+            batch_limits: Sustainable batch sizes recorded by earlier runs
+            tile_threshold_mp: Images above this many megapixels are transformed
+                tile by tile (0 disables tiling)
+            tile_size: Side of the square tiles, in pixels
+            cpu_threads: Intra-op threads of the in-process CPU baseline
+                (None keeps torch's default)
+            compile_transforms: Also time a torch.compile'd, channels_last
+                pipeline next to the eager one, and use it for production runs
+            compile_cache_dir: Directory persisting compiled artifacts across runs
+            max_side: Scale images down to this longest side when decoding
+                (0 keeps their size)
+            encoder: Output encoding settings (default: source format, Pillow defaults)
+            cpu_only: Never touch CUDA, even when a GPU is present (CPU pool
+                workers, which must not create a CUDA context of their own)
+        """
+        self.batch_size = max(1, batch_size)
+        self.cpu_threads = cpu_threads
+        self.timer = TimingHarness(warmup=warmup, repeats=repeats)
+        self.cuda_available = not cpu_only and torch.cuda.is_available()
         self.gpu_device = torch.device("cuda" if self.cuda_available else "cpu")
         self.cpu_device = torch.device("cpu")
+        self.device_name = torch.cuda.get_device_name(0) if self.cuda_available else "cpu"
+        self.codec = ImageCodec(max_side)
+        self.buffers = BufferPool()
+        self.encoder = encoder or OutputEncoder()
         
         # Create transform pipeline
+        self.blur_engine = GaussianBlurEngine(kernel_size=kernel_size, sigma=sigma, backend=blur_backend)
         self.blur = transforms.Compose([
-            transforms.GaussianBlur(kernel_size=(31, 31), sigma=5.0),
+            self.blur_engine,
             transforms.ColorJitter(brightness=0.2, contrast=0.2), 
         ])
         
+        self.tile_threshold_mp = tile_threshold_mp
+        self.tiler = TiledTransform(self.blur_engine, self.blur.transforms[1], tile_size, self.gpu_device)
+        
+        # Measure backend costs on each device so 'auto' picks the fastest one
+        if blur_backend == 'auto' and calibrate:
+            self.blur_engine.calibrate(self.cpu_device)
+            if self.cuda_available:
+                self.blur_engine.calibrate(self.gpu_device)
+        
+        self.compiled = None
+        self.compile_failed = set()
+        if compile_transforms:
+            self.compiled = CompiledTransform(self.blur_engine, self.blur.transforms[1], self.pipeline_params(),
+                                              cache_dir=compile_cache_dir)
+            for device in {self.cpu_device, self.gpu_device}:
+                self.compiled.load_artifacts(device)
+        
+        # Budgeted after calibration, so the free memory it measures is what the batches get
+        budget_bytes = memory_budget_mb * 1024**2 or device_memory_budget(self.gpu_device)
+        self.scheduler = AdaptiveBatchScheduler(budget_bytes, self.gpu_device, batch_limits)
+        
+        self.cpu_pool = None
+        if cpu_workers > 0:
+            self.cpu_pool = CPUProcessPool(
+                cpu_workers,
+                blur_backend=blur_backend,
+                kernel_size=kernel_size,
+                sigma=sigma,
+                blur_costs=self.blur_engine.costs.get('cpu'),
+                max_side=max_side,
+                encoder=self.encoder
+            )
+        
+    def close(self):
+        """Shut down the CPU worker processes, if any"""
+        if self.cpu_pool is not None:
+            self.cpu_pool.shutdown()
+            self.cpu_pool = None
+
+    @staticmethod
+    def speedup(cpu_time: Optional[float], gpu_time: Optional[float]) -> Optional[float]:
+        """CPU over GPU time, or None when either is missing"""
+        if cpu_time is None or not gpu_time or gpu_time <= 0:
+            return None
+        return cpu_time / gpu_time
+
     def get_device_info(self):
         """Return information about the CUDA device if available"""
         if self.cuda_available:
@@ -32,109 +148,603 @@ class ImageProcessingOperations:
             }
         return {"device_name": "CPU only - No CUDA device available"}
 
-    def process_image_gpu(self, image_data: bytes) -> Tuple[bytes, float]:
+    def pipeline_params(self) -> Dict:
+        """
+        Parameters that determine the processed output, for the incremental manifest
+
+        The blur backend is left out: every backend matches torchvision's
+        gaussian_blur within validate()'s tolerance.
+        """
+        color_jitter = self.blur.transforms[1]
+        params = {
+            'gaussian_blur': {'kernel_size': self.blur_engine.kernel_size, 'sigma': self.blur_engine.sigma},
+            'color_jitter': {'brightness': list(color_jitter.brightness), 'contrast': list(color_jitter.contrast)},
+            'encoding': self.encoder.params()
+        }
+        if self.codec.max_side:
+            params['max_side'] = self.codec.max_side
+        return params
+
+    def open_image(self, image_data: bytes, timings: Optional[Dict] = None) -> Tuple[Image.Image, str]:
+        """
+        Decode image bytes into an 8-bit PIL image, scaled to fit the codec's max_side
+        Args:
+            image_data: Raw image bytes
+            timings: Optional dictionary receiving decode_time
+        Returns:
+            Tuple of (loaded image, image format)
+        """
+        with tracer.span('decode', 'image') as decode_span:
+            image = self.codec.open(image_data)
+        if timings is not None:
+            timings['decode_time'] = decode_span.duration
+        return image, image.format if image.format else 'PNG'
+
+    def decode_image(self, image_data: bytes, timings: Optional[Dict] = None) -> Tuple[torch.Tensor, str]:
+        """
+        Decode image bytes into a uint8 CHW tensor
+
+        The transforms convert it to float, so the tensor waiting in the
+        pipeline and copied to the GPU is a quarter of the float32 size.
+        Args:
+            image_data: Raw image bytes
+            timings: Optional dictionary receiving decode_time and, for images
+                decoded through PIL, to_tensor_time
+        Returns:
+            Tuple of (image tensor, image format)
+        """
+        return self.codec.decode(image_data, timings)
+
+    def encode_image(self, image: Union[torch.Tensor, Image.Image], image_format: str,
+                     timings: Optional[Dict] = None) -> bytes:
+        """
+        Encode a uint8 CHW tensor (or an already converted PIL image) into image bytes
+        Args:
+            image: Processed image tensor on the CPU, or PIL image
+            image_format: Format of the source image (e.g. PNG, JPEG); the
+                encoder's output format when it sets one
+            timings: Optional dictionary receiving to_pil_time, encode_time
+                and output_format
+        Returns:
+            Encoded image bytes
+        """
+        with tracer.span('to_pil', 'image') as to_pil_span:
+            processed_image = image if isinstance(image, Image.Image) else self.codec.to_pil(image)
+        output_format = self.encoder.output_format(image_format)
+        with tracer.span('encode', 'image', format=output_format) as encode_span:
+            image_data, output_format = self.encoder.encode(processed_image, image_format)
+        if timings is not None:
+            # Tiled images are converted tile by tile while transforming
+            if not isinstance(image, Image.Image):
+                timings['to_pil_time'] = to_pil_span.duration
+            timings['encode_time'] = encode_span.duration
+            timings['output_format'] = output_format
+        return image_data
+
+    def needs_tiling(self, shape: Tuple[int, int, int]) -> bool:
+        """Whether an image of a CHW shape is transformed tile by tile"""
+        return self.tile_threshold_mp > 0 and shape[1] * shape[2] > self.tile_threshold_mp * 1_000_000
+
+    def transform_tiled(self, image: Image.Image) -> Tuple[Image.Image, Dict]:
+        """
+        Transform a large image once, tile by tile, on the GPU when available and the CPU otherwise
+
+        Like transform_batch_best, this runs once without a CPU baseline.
+        Args:
+            image: Decoded PIL image
+        Returns:
+            Tuple of (processed PIL image, timings with device, transform_time,
+            to_tensor_time, to_pil_time, tiles and tile_size)
+        """
+        processed_image, timings = self.tiler(image)
+        return processed_image, {'batch_size': 1, 'device': self.gpu_device.type, 'compared': False,
+                                 'tiled': True, **timings}
+
+    def image_shape(self, image_data: bytes) -> Tuple[int, int, int]:
         """
-        Process image using GPU
+        Read the CHW tensor shape of an image from its header without decoding it
         Args:
             image_data: Raw image bytes
         Returns:
-            Tuple of (processed image bytes, processing time)
+            Tuple of (channels, height, width) of the decoded tensor
+        """
+        return self.codec.shape(image_data)
+
+    def shape_batches(self, shapes: List[Tuple[int, ...]]) -> List[List[int]]:
+        """
+        Group item indices by shape into batches of at most self.batch_size
+        Args:
+            shapes: Tensor shape of each item
+        Returns:
+            List of index lists, one per batch
+        """
+        groups = {}
+        for idx, shape in enumerate(shapes):
+            groups.setdefault(tuple(shape), []).append(idx)
+        
+        batches = []
+        for indices in groups.values():
+            for start in range(0, len(indices), self.batch_size):
+                batches.append(indices[start:start + self.batch_size])
+        return batches
+
+    def transform_batch_gpu(self, batch_tensor: torch.Tensor) -> Tuple[torch.Tensor, Dict]:
+        """
+        Apply the transform pipeline to an NCHW batch on the GPU
+        Args:
+            batch_tensor: NCHW image tensor on the CPU
+        Returns:
+            Tuple of (processed NCHW tensor on the CPU, timing stats with the
+            host-to-device and device-to-host copy times as h2d_time and d2h_time
+            and the compiled pipeline's stats as compiled_stats)
         """
         if not self.cuda_available:
             raise RuntimeError("CUDA is not available on this system")
 
-        # Convert bytes to PIL Image
-        image = Image.open(io.BytesIO(image_data))
-        
-        # Convert to tensor and move to GPU
-        transform = transforms.Compose([
-            transforms.ToTensor(),
-        ])
-        image_tensor = transform(image).unsqueeze(0).to(self.gpu_device)
-        
-        torch.cuda.synchronize()
-        start_time = time.perf_counter()
+        batch_tensor, h2d_time = self._to_gpu(batch_tensor)
         
         # Apply blur on GPU
-        processed_tensor = self.blur(image_tensor)
+        with tracer.span('transform_gpu', 'cuda', batch=len(batch_tensor)):
+            processed_tensor, stats = self.timer.run(lambda: self._transform_eager(batch_tensor), 'cuda')
+        compiled_stats = self.transform_batch_compiled(batch_tensor)
         
-        torch.cuda.synchronize()
-        end_time = time.perf_counter()
-        
-        # Convert back to image
-        processed_tensor = processed_tensor.cpu().squeeze(0)
-        processed_image = transforms.ToPILImage()(processed_tensor)
-        
-        # Convert to bytes
-        buffer = io.BytesIO()
-        processed_image.save(buffer, format=image.format if image.format else 'PNG')
-        
-        return buffer.getvalue(), end_time - start_time
+        processed_tensor, d2h_time = self._to_host(processed_tensor)
+        return processed_tensor, {**stats, 'h2d_time': h2d_time, 'd2h_time': d2h_time, 'compiled_stats': compiled_stats}
+
+    def _transform_eager(self, batch_tensor: torch.Tensor) -> torch.Tensor:
+        """
+        Eager transform pipeline on a uint8 NCHW batch, returning uint8
+
+        The float32 input is written into a buffer reused across batches,
+        which the transforms never return.
+        """
+        float_input = self.buffers.get('float_input', tuple(batch_tensor.shape), torch.float32, batch_tensor.device)
+        return to_uint8(self.blur(to_float(batch_tensor, float_input)))
+
+    def _stack(self, image_tensors: List[torch.Tensor]) -> torch.Tensor:
+        """Stack CHW tensors into an NCHW batch, in reused page-locked memory when copied to a GPU"""
+        shape = (len(image_tensors), *image_tensors[0].shape)
+        batch = self.buffers.get('batch', shape, image_tensors[0].dtype, self.cpu_device,
+                                 pin_memory=self.cuda_available)
+        return torch.stack(image_tensors, out=batch)
+
+    def transform_batch_compiled(self, batch_tensor: torch.Tensor) -> Optional[Dict]:
+        """
+        Time the compiled pipeline on an NCHW batch on its device
 
-    def process_image_cpu(self, image_data: bytes) -> Tuple[bytes, float]:
+        Compilation happens in the harness's warmup runs. A device the
+        pipeline fails to compile for (e.g. no C++ compiler for CPU code) is
+        not tried again.
+        Args:
+            batch_tensor: NCHW image tensor on the device to time
+        Returns:
+            Timing stats, or None when compilation is off or failed on the device
         """
-        Process image using CPU
+        device_type = batch_tensor.device.type
+        if self.compiled is None or device_type in self.compile_failed:
+            return None
+        try:
+            with tracer.span(f"transform_compiled_{device_type}", device_type, batch=len(batch_tensor)), \
+                    cpu_threads(self.cpu_threads if device_type == 'cpu' else None):
+                _, stats = self.timer.run(lambda: self.compiled(batch_tensor), device_type)
+        except Exception as e:
+            if is_out_of_memory(e):
+                raise
+            self.compile_failed.add(device_type)
+            console.print(f"[yellow]Compiled pipeline unavailable on {device_type.upper()}, eager only: "
+                          f"{str(e).splitlines()[0] if str(e) else type(e).__name__}[/]")
+            return None
+        return stats
+
+    def _to_gpu(self, tensor: torch.Tensor) -> Tuple[torch.Tensor, float]:
+        """Copy a tensor to the GPU, returning it with the copy time"""
+        with tracer.span('h2d', 'cuda', bytes=tensor.element_size() * tensor.nelement()) as span:
+            tensor = tensor.to(self.gpu_device, non_blocking=tensor.is_pinned())
+            torch.cuda.synchronize()
+        return tensor, span.duration
+
+    @staticmethod
+    def _to_host(tensor: torch.Tensor) -> Tuple[torch.Tensor, float]:
+        """Copy a GPU tensor back to the CPU, returning it with the copy time"""
+        # .cpu() blocks until the copy is done
+        with tracer.span('d2h', 'cuda') as span:
+            tensor = tensor.cpu()
+        return tensor, span.duration
+
+    def transform_batch_best(self, image_tensors: List[torch.Tensor]) -> Tuple[List[torch.Tensor], List[Dict]]:
+        """
+        Transform same-shape images once, on the GPU when available and the CPU otherwise
+
+        This is the production path: no warmup, no repeated runs and no CPU
+        baseline, so every image is transformed exactly once. With compilation
+        on, the compiled pipeline is used, so the first batch of every shape
+        bucket includes its compile time.
         Args:
-            image_data: Raw image bytes
+            image_tensors: CHW image tensors on the CPU, all with the same shape
         Returns:
-            Tuple of (processed image bytes, processing time)
+            Tuple of (processed tensors on the CPU, per-image timings with device,
+            transform_time, compiled and, on the GPU, h2d_time and d2h_time;
+            times are per image)
         """
-        # Convert bytes to PIL Image
-        image = Image.open(io.BytesIO(image_data))
+        batch_tensor = self._stack(image_tensors)
+        batch_size = len(image_tensors)
+        timings = {'batch_size': batch_size, 'device': self.gpu_device.type, 'compared': False}
         
-        # Convert to tensor
-        transform = transforms.Compose([
-            transforms.ToTensor(),
-        ])
-        image_tensor = transform(image).unsqueeze(0)
+        if self.cuda_available:
+            batch_tensor, h2d_time = self._to_gpu(batch_tensor)
+            timings['h2d_time'] = h2d_time / batch_size
+        processed_tensor, transform_time = self._transform_production(batch_tensor, timings)
+        timings['transform_time'] = transform_time / batch_size
+        if self.cuda_available:
+            processed_tensor, d2h_time = self._to_host(processed_tensor)
+            timings['d2h_time'] = d2h_time / batch_size
         
-        start_time = time.perf_counter()
+        return list(processed_tensor.unbind(0)), [dict(timings) for _ in range(batch_size)]
+
+    def _transform_production(self, batch_tensor: torch.Tensor, timings: Dict) -> Tuple[torch.Tensor, float]:
+        """
+        Transform a batch once with the compiled pipeline, or eagerly when it is off or fails
+
+        Sets timings['compiled'] to the pipeline that produced the output.
+        Returns:
+            Tuple of (processed tensor, transform seconds)
+        """
+        device_type = batch_tensor.device.type
+        if self.compiled is not None and device_type not in self.compile_failed:
+            try:
+                with tracer.span(f"transform_{device_type}", device_type, batch=len(batch_tensor),
+                                 compiled=True) as span:
+                    processed_tensor = self.compiled(batch_tensor)
+                    if self.cuda_available:
+                        torch.cuda.synchronize()
+                timings['compiled'] = True
+                return processed_tensor, span.duration
+            except Exception as e:
+                if is_out_of_memory(e):
+                    raise
+                self.compile_failed.add(device_type)
+                console.print(f"[yellow]Compiled pipeline unavailable on {device_type.upper()}, eager only: "
+                              f"{str(e).splitlines()[0] if str(e) else type(e).__name__}[/]")
         
+        timings['compiled'] = False
+        with tracer.span(f"transform_{device_type}", device_type, batch=len(batch_tensor)) as span:
+            processed_tensor = self._transform_eager(batch_tensor)
+            if self.cuda_available:
+                torch.cuda.synchronize()
+        return processed_tensor, span.duration
+
+    def transform_batch_cpu(self, batch_tensor: torch.Tensor) -> Tuple[torch.Tensor, Dict]:
+        """
+        Apply the transform pipeline to an NCHW batch on the CPU
+        Args:
+            batch_tensor: NCHW image tensor
+        Returns:
+            Tuple of (processed NCHW tensor, timing stats with the compiled
+            pipeline's stats as compiled_stats)
+        """
         # Apply blur on CPU
-        processed_tensor = self.blur(image_tensor)
+        with tracer.span('transform_cpu', 'cpu', batch=len(batch_tensor)), cpu_threads(self.cpu_threads):
+            processed_tensor, stats = self.timer.run(lambda: self._transform_eager(batch_tensor), 'cpu')
         
-        end_time = time.perf_counter()
+        return processed_tensor, {**stats, 'compiled_stats': self.transform_batch_compiled(batch_tensor)}
+
+    def run_thread_sweep(self, thread_counts: List[int], pin: bool = False,
+                         shape: Tuple[int, int, int] = (3, 1080, 1920)) -> List[Dict]:
+        """
+        Time the CPU transform of a random image per intra-op thread count
+        Args:
+            thread_counts: Intra-op thread counts to try
+            pin: Pin the process to as many CPUs as threads
+            shape: CHW shape of the test image
+        Returns:
+            List of dictionaries with shape, threads, pinned, time, stats, and
+            speedup and scaling efficiency relative to the fewest threads
+        """
+        image_tensor = torch.randint(0, 256, (1, *shape), dtype=torch.uint8)
+        results = thread_sweep(lambda: self._transform_eager(image_tensor), thread_counts, self.timer, pin)
+        for result in results:
+            result['shape'] = 'x'.join(map(str, shape))
+        return results
+
+    def transform_cpu(self, image_tensor: torch.Tensor) -> Tuple[torch.Tensor, Dict]:
+        """
+        Apply the transform pipeline to a single image on the CPU
+        Args:
+            image_tensor: CHW image tensor
+        Returns:
+            Tuple of (processed CHW tensor, timing stats)
+        """
+        processed_tensor, stats = self.transform_batch_cpu(image_tensor.unsqueeze(0))
+        return processed_tensor.squeeze(0), stats
+
+    def compare_devices_batch(self, image_tensors: List[torch.Tensor],
+                              run_cpu: bool = True) -> Tuple[List[torch.Tensor], List[Dict]]:
+        """
+        Transform same-shape images as one NCHW batch on CPU and, when available, on GPU
+
+        The pipeline runs once per timed repetition of the batch, so ColorJitter
+        draws a single set of brightness/contrast factors for the whole batch.
+        Batch timing stats are split evenly across the images so per-image
+        times stay comparable with unbatched runs; cpu_time and gpu_time are
+        the per-image medians. With compilation on, cpu_compiled_time and
+        gpu_compiled_time are those of the compiled pipeline, whose output is
+        not kept.
+        Args:
+            image_tensors: CHW image tensors on the CPU, all with the same shape
+            run_cpu: Also time the in-process CPU path (skipped when the CPU
+                baseline comes from the process pool and a GPU is present)
+        Returns:
+            Tuple of (processed tensors to keep, per-image timings dictionaries)
+        """
+        batch_tensor = self._stack(image_tensors)
+        batch_size = len(image_tensors)
+        timings = {'batch_size': batch_size, 'compared': True}
         
-        # Convert back to image
-        processed_tensor = processed_tensor.squeeze(0)
-        processed_image = transforms.ToPILImage()(processed_tensor)
+        if run_cpu or not self.cuda_available:
+            processed_tensor, cpu_stats = self.transform_batch_cpu(batch_tensor)
+            self._split_compiled(timings, 'cpu', cpu_stats.pop('compiled_stats'), batch_size)
+            timings['cpu_stats'] = scale_stats(cpu_stats, 1 / batch_size)
+            timings['cpu_time'] = timings['cpu_stats']['median']
+            timings['cpu_wall_time'] = timings['cpu_time']
         
-        # Convert to bytes
-        buffer = io.BytesIO()
-        processed_image.save(buffer, format=image.format if image.format else 'PNG')
+        timings['gpu_time'] = None
+        timings['gpu_stats'] = None
+        if self.cuda_available:
+            processed_tensor, gpu_stats = self.transform_batch_gpu(batch_tensor)
+            self._split_compiled(timings, 'gpu', gpu_stats.pop('compiled_stats'), batch_size)
+            timings['gpu_stats'] = scale_stats(gpu_stats, 1 / batch_size)
+            timings['gpu_time'] = timings['gpu_stats']['median']
+            timings['h2d_time'] = gpu_stats['h2d_time'] / batch_size
+            timings['d2h_time'] = gpu_stats['d2h_time'] / batch_size
         
-        return buffer.getvalue(), end_time - start_time
+        timings['speedup'] = self.speedup(timings.get('cpu_wall_time'), timings['gpu_time'])
+        return list(processed_tensor.unbind(0)), [dict(timings) for _ in range(batch_size)]
 
-    def process_batch(self, images_data: List[bytes]) -> Tuple[List[Dict], Dict]:
+    def transform_adaptive(self, image_tensors: List[torch.Tensor], compare: bool = True,
+                           run_cpu: bool = True) -> Tuple[List[torch.Tensor], List[Dict]]:
         """
-        Process a batch of images and compare CPU vs GPU performance
+        Transform same-shape images in batches that fit the memory budget
+
+        The scheduler splits the images into the largest batches whose
+        estimated memory fits, halving a batch that still runs out of memory.
+        Args:
+            image_tensors: CHW image tensors on the CPU, all with the same shape
+            compare: Benchmark CPU against GPU (compare_devices_batch); False
+                transforms once on the best device (transform_batch_best)
+            run_cpu: Passed on to compare_devices_batch
+        Returns:
+            Tuple of (processed tensors, per-image timings) in input order
+        """
+        shape = tuple(image_tensors[0].shape)
+        dtype = image_tensors[0].dtype
+        key = (f"{self.device_name}/{'compare' if compare else 'production'}/"
+               f"{'x'.join(map(str, shape))}/{str(dtype).replace('torch.', '')}")
+        # The working copies are float32 whatever the input dtype
+        item_bytes = self.scheduler.item_bytes(shape, torch.float32, self.TRANSFORM_WORKING_COPIES)
+        if compare:
+            work = lambda batch: self.compare_devices_batch(batch, run_cpu=run_cpu)
+        else:
+            work = self.transform_batch_best
+        return self.scheduler.run(key, image_tensors, work, item_bytes, len(image_tensors))
+
+    @staticmethod
+    def _split_compiled(timings: Dict, prefix: str, compiled_stats: Optional[Dict], batch_size: int):
+        """Store a batch's compiled pipeline stats per image as <prefix>_compiled_stats/_time"""
+        if compiled_stats is not None:
+            timings[f"{prefix}_compiled_stats"] = scale_stats(compiled_stats, 1 / batch_size)
+            timings[f"{prefix}_compiled_time"] = timings[f"{prefix}_compiled_stats"]['median']
+
+    def process_cpu_pool(self, images_data: List[bytes]) -> List[Dict]:
+        """
+        Run the CPU baseline for whole images on the worker process pool
         Args:
             images_data: List of image bytes
         Returns:
-            Tuple of (results list, device info)
+            Per-image dictionaries with cpu_time (transform only), cpu_total_time
+            (decode + transform + encode), cpu_wall_time and error. cpu_wall_time
+            is the pool's wall time per image times the share of the worker's
+            time the transform took: the transform-only time per image of all
+            workers running concurrently, comparable with the GPU's
+            transform-only gpu_time.
+        """
+        pool_results, wall_time = self.cpu_pool.process(images_data)
+        for result in pool_results:
+            if result['error'] is None:
+                share = result['cpu_time'] / result['cpu_total_time'] if result['cpu_total_time'] > 0 else 1.0
+                result['cpu_wall_time'] = wall_time / len(pool_results) * share
+        return pool_results
+
+    @staticmethod
+    def throughput_summary(results: List[Dict], cpu_workers: int = 0) -> Dict:
         """
-        results = []
-        device_info = self.get_device_info()
+        Aggregate throughput over processed images
+        Args:
+            results: Per-image results with cpu_wall_time and gpu_time (compared
+                images) or device and transform_time (production images), and
+                the end-to-end pipeline latency when streamed
+            cpu_workers: Worker processes used for the CPU baseline (0 for in-process)
+        Returns:
+            Dictionary of summary values for display and result files
+        """
+        cpu_walls = [result['cpu_wall_time'] for result in results if result.get('cpu_wall_time') is not None]
+        gpu_times = [result['gpu_time'] for result in results if result.get('gpu_time') is not None]
+        summary = {
+            'images': len(results),
+            'cpu_mode': (f"{cpu_workers} worker processes, transform share of the pool wall time" if cpu_workers
+                         else "in-process, transform only"),
+            'cpu_images_per_s': len(cpu_walls) / sum(cpu_walls) if cpu_walls and sum(cpu_walls) > 0 else None,
+            'gpu_images_per_s': len(gpu_times) / sum(gpu_times) if gpu_times and sum(gpu_times) > 0 else None
+        }
+        summary['throughput_speedup'] = ImageProcessingOperations.speedup(
+            summary['gpu_images_per_s'], summary['cpu_images_per_s']
+        )
+        for prefix in ('cpu', 'gpu'):
+            compiled_times = [result[f"{prefix}_compiled_time"] for result in results
+                              if result.get(f"{prefix}_compiled_time") is not None]
+            if compiled_times and sum(compiled_times) > 0:
+                summary[f"{prefix}_compiled_images_per_s"] = len(compiled_times) / sum(compiled_times)
         
-        for idx, image_data in enumerate(images_data):
-            console.print(f"\nProcessing image {idx + 1}/{len(images_data)}...")
-            
-            console.print("Processing on CPU...")
-            processed_cpu, cpu_time = self.process_image_cpu(image_data)
-            
-            gpu_time = None
-            processed_gpu = None
-            if self.cuda_available:
-                console.print("Processing on GPU...")
-                processed_gpu, gpu_time = self.process_image_gpu(image_data)
-                torch.cuda.empty_cache()
-            
-            results.append({
-                'image_index': idx,
-                'cpu_time': cpu_time,
-                'gpu_time': gpu_time,
-                'speedup': (cpu_time / gpu_time) if gpu_time and gpu_time > 0 else None,
-                'processed_data': processed_gpu if processed_gpu else processed_cpu
+        production = [result for result in results if result.get('transform_time') is not None]
+        if production:
+            transform_total = sum(result['transform_time'] for result in production)
+            summary['production_device'] = production[0]['device']
+            summary['production_images_per_s'] = len(production) / transform_total if transform_total > 0 else None
+        
+        latencies = [result['latency'] for result in results if result.get('latency') is not None]
+        if latencies:
+            summary['latency_p50'] = float(np.percentile(latencies, 50))
+            summary['latency_p95'] = float(np.percentile(latencies, 95))
+        return summary
+
+    def encoding_summary(self, results: List[Dict]) -> Optional[Dict]:
+        """
+        Output encoding cost against output size (S3 egress)
+        Args:
+            results: Per-image results with encode_time, output_bytes and input_bytes
+        Returns:
+            Dictionary with the encoding parameters, output formats, images,
+            total and median encode time and output bytes, total input bytes
+            and the output/input size ratio, or None without encoded images
+        """
+        encoded = [result for result in results
+                   if result.get('encode_time') is not None and result.get('output_bytes') is not None]
+        if not encoded:
+            return None
+        output_bytes = sum(result['output_bytes'] for result in encoded)
+        input_bytes = sum(result.get('input_bytes') or 0 for result in encoded)
+        return {
+            'encoding': self.encoder.params(),
+            'formats': sorted({result.get('output_format', '?') for result in encoded}),
+            'images': len(encoded),
+            'encode_time_total': sum(result['encode_time'] for result in encoded),
+            'encode_time_median': statistics.median(result['encode_time'] for result in encoded),
+            'output_bytes': output_bytes,
+            'output_bytes_median': statistics.median(result['output_bytes'] for result in encoded),
+            'input_bytes': input_bytes,
+            'size_ratio': output_bytes / input_bytes if input_bytes else None
+        }
+
+    def compile_comparison(self, results: List[Dict]) -> List[Dict]:
+        """
+        Eager vs compiled transform times per device
+        Args:
+            results: Per-image results with cpu/gpu_time and cpu/gpu_compiled_time
+        Returns:
+            One dictionary per timed device with compiled times: label, device, images,
+            eager_time and compiled_time (per-image medians), speedup of the
+            compiled pipeline and compile_time (summed over shape buckets)
+        """
+        comparison = []
+        if self.compiled is None:
+            return comparison
+        for prefix in ('cpu', 'gpu'):
+            pairs = [(result[f"{prefix}_time"], result[f"{prefix}_compiled_time"]) for result in results
+                     if result.get(f"{prefix}_time") is not None and result.get(f"{prefix}_compiled_time") is not None]
+            if not pairs:
+                continue
+            eager_time = statistics.median(eager for eager, _ in pairs)
+            compiled_time = statistics.median(compiled for _, compiled in pairs)
+            device = self.gpu_device.type if prefix == 'gpu' else 'cpu'
+            comparison.append({
+                'label': prefix.upper(),
+                'device': device,
+                'images': len(pairs),
+                'eager_time': eager_time,
+                'compiled_time': compiled_time,
+                'speedup': ImageProcessingOperations.speedup(eager_time, compiled_time),
+                # Buckets compiled for the device, shared when the "GPU" is the CPU
+                'compile_time': sum(seconds for key, seconds in self.compiled.compile_times.items()
+                                    if key.split('/')[0] == device)
             })
+        return comparison
+
+    @staticmethod
+    def sampled_speedup(results: List[Dict], total_images: int, confidence: float = 0.95,
+                        resamples: int = 2000, seed: int = 0) -> Optional[Dict]:
+        """
+        Extrapolate the CPU vs GPU comparison of a sample of images to the whole run
+
+        The speedup is mean CPU over mean GPU time per compared image, i.e. the
+        throughput speedup, with a percentile bootstrap confidence interval.
+        The same resamples give intervals for the CPU and GPU time all
+        total_images would have taken on each device.
+        Args:
+            results: Per-image results; those compared on both devices are used
+            total_images: Number of images the estimate is extrapolated to
+            confidence: Confidence level of the intervals
+            resamples: Bootstrap resamples
+            seed: Seed of the bootstrap
+        Returns:
+            Dictionary with sample_size, total_images, confidence, speedup,
+            cpu_total_time and gpu_total_time (seconds) and a (low, high) tuple
+            for each under the same name with a _ci suffix; None without at
+            least two images timed on both devices
+        """
+        pairs = [(result['cpu_wall_time'], result['gpu_time']) for result in results
+                 if result.get('compared') and result.get('cpu_wall_time') is not None
+                 and result.get('gpu_time') is not None]
+        if len(pairs) < 2:
+            return None
+        
+        cpu_times, gpu_times = np.array(pairs).T
+        rng = np.random.default_rng(seed)
+        indices = rng.integers(0, len(pairs), size=(resamples, len(pairs)))
+        cpu_means = cpu_times[indices].mean(axis=1)
+        gpu_means = gpu_times[indices].mean(axis=1)
+        bounds = [(1 - confidence) / 2 * 100, (1 + confidence) / 2 * 100]
         
-        return results, device_info
\ No newline at end of file
+        def interval(values):
+            low, high = np.percentile(values, bounds)
+            return float(low), float(high)
+        
+        return {
+            'sample_size': len(pairs),
+            'total_images': total_images,
+            'confidence': confidence,
+            'speedup': float(cpu_times.mean() / gpu_times.mean()),
+            'speedup_ci': interval(cpu_means / gpu_means),
+            'cpu_total_time': float(cpu_times.mean() * total_images),
+            'cpu_total_time_ci': interval(cpu_means * total_images),
+            'gpu_total_time': float(gpu_times.mean() * total_images),
+            'gpu_total_time_ci': interval(gpu_means * total_images)
+        }
+
+    @staticmethod
+    def stage_summary(results: List[Dict]) -> Dict[str, Dict]:
+        """
+        Timing distribution of every pipeline stage over the processed images
+        Args:
+            results: Per-image results carrying the PIPELINE_STAGES timings
+        Returns:
+            Stage name -> summary statistics (seconds per image), in pipeline
+            order; stages no image went through are left out
+        """
+        stages = {}
+        for stage, key in PIPELINE_STAGES:
+            samples = [result[key] for result in results if result.get(key) is not None]
+            if samples:
+                stages[stage] = summarize(samples)
+        return stages
+
+    def merge_pool_timing(self, timing: Dict, pool_result: Dict) -> Dict:
+        """
+        Replace in-process CPU timings with the process pool ones
+
+        When the pool failed on the image, in-process CPU timings are kept if
+        there are any; on a GPU node there are none (the in-process CPU pass
+        is skipped), so the CPU timings and speedup are None and the pool's
+        error is kept as cpu_error.
+        """
+        if pool_result['error'] is None:
+            timing.update({
+                'cpu_time': pool_result['cpu_time'],
+                'cpu_stats': None,
+                'cpu_total_time': pool_result['cpu_total_time'],
+                'cpu_wall_time': pool_result['cpu_wall_time']
+            })
+        else:
+            for key in ('cpu_time', 'cpu_stats', 'cpu_wall_time'):
+                timing.setdefault(key, None)
+            timing['cpu_error'] = pool_result['error']
+        timing['speedup'] = self.speedup(timing['cpu_wall_time'], timing.get('gpu_time'))
+        return timing
\ No newline at end of file
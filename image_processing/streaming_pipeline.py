@@ -0,0 +1,531 @@
+import math
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterator, Optional, Set
+from s3_operations.s3_operations import IDLE
+from tracing.tracer import tracer
+
+# Marks the end of the stream flowing through a stage queue
+_END = object()
+
+
+class MemoryBudget:
+    """
+    Byte budget shared by the pipeline stages
+
+    Each stage reserves the bytes it is about to hold. A reservation blocks
+    while it would exceed the budget, unless no memory is held at the same
+    or a later stage: those are the only holders that can release memory
+    without waiting on the blocked stage, so proceeding avoids a deadlock
+    and an oversized single image is still processed, one at a time.
+    """
+
+    def __init__(self, limit_bytes: int, num_stages: int):
+        self.limit_bytes = limit_bytes
+        self.held = [0] * num_stages
+        self.peak_bytes = 0
+        self._condition = threading.Condition()
+
+    @property
+    def used_bytes(self) -> int:
+        return sum(self.held)
+
+    def acquire(self, nbytes: int, stage: int, stop: threading.Event) -> bool:
+        """Reserve nbytes at the given stage; returns False if the pipeline stopped"""
+        with self._condition:
+            if self._must_wait(nbytes, stage):
+                with tracer.span('wait_memory', 'pipeline', bytes=nbytes):
+                    while self._must_wait(nbytes, stage):
+                        if stop.is_set():
+                            return False
+                        self._condition.wait(timeout=0.1)
+            self.held[stage] += nbytes
+            self.peak_bytes = max(self.peak_bytes, self.used_bytes)
+            tracer.counter('memory_budget', fetch=self.held[0], decode=self.held[1], encode=self.held[2])
+            return True
+
+    def _must_wait(self, nbytes: int, stage: int) -> bool:
+        return self.used_bytes + nbytes > self.limit_bytes and sum(self.held[stage:]) > 0
+
+    def release(self, nbytes: int, stage: int):
+        """Release nbytes previously reserved at the given stage"""
+        with self._condition:
+            self.held[stage] -= nbytes
+            tracer.counter('memory_budget', fetch=self.held[0], decode=self.held[1], encode=self.held[2])
+            self._condition.notify_all()
+
+
+class StreamingPipeline:
+    """
+    Staged list -> fetch -> decode -> transform -> encode -> upload pipeline
+
+    Stages run on their own threads and are connected by bounded queues, so
+    S3 transfers, decoding, device transforms and encoding overlap while at
+    most `queue_size` items wait between any two stages. Encoding runs on
+    `encode_workers` threads (Pillow's encoders release the GIL), so a slow
+    output format does not hold up the transform stage. Bytes held by
+    in-flight images are charged against a MemoryBudget, and results are
+    yielded as soon as each image has been uploaded.
+
+    With a ProcessingManifest the run is incremental: sources that are
+    unchanged since they were last processed are skipped, and sources whose
+    bytes match an image processed earlier (or queued earlier in this run)
+    are not fetched at all; their output is copied server-side once the
+    original output exists.
+    """
+
+    # Budget stages: compressed input, decoded tensors, encoded output
+    FETCH, DECODE, ENCODE = range(3)
+    # How often the upload stage collects finished uploads while its queue is empty
+    IDLE_POLL_SECONDS = 0.01
+
+    def __init__(self, s3_ops, image_ops, raw_folder: str, processed_folder: str,
+                 queue_size: int = 8, memory_budget_mb: int = 2048, manifest=None,
+                 compare_keys: Optional[Set[str]] = None, encode_workers: int = 1):
+        """
+        Args:
+            s3_ops: S3Operations used for listing, downloads and uploads
+            image_ops: ImageProcessingOperations used for decode/transform/encode
+            raw_folder: Source folder path
+            processed_folder: Destination folder path
+            queue_size: Maximum number of items waiting between two stages
+            memory_budget_mb: Upper bound for bytes held by in-flight images
+            manifest: Optional loaded ProcessingManifest for incremental runs
+            compare_keys: Source keys to benchmark on CPU and GPU; every other
+                image is transformed once on the best device. None compares
+                every image, an empty set none (production)
+            encode_workers: Threads encoding processed images
+        """
+        self.s3_ops = s3_ops
+        self.image_ops = image_ops
+        self.raw_folder = raw_folder
+        self.processed_folder = processed_folder
+        self.queue_size = queue_size
+        self.budget = MemoryBudget(memory_budget_mb * 1024**2, num_stages=3)
+        self.manifest = manifest
+        self.compare_keys = compare_keys
+        self.encode_workers = max(1, encode_workers)
+        self.skipped = 0
+        self._listing_complete = False
+        self._uploads_in_flight = 0
+        self._stop = threading.Event()
+
+    def _put(self, stage_queue: queue.Queue, item) -> bool:
+        """Put an item on a stage queue unless the pipeline was stopped"""
+        try:
+            stage_queue.put_nowait(item)
+            return True
+        except queue.Full:
+            pass
+        # The next stage is behind: show the back-pressure stall in the trace
+        with tracer.span('wait_output', 'pipeline'):
+            while not self._stop.is_set():
+                try:
+                    stage_queue.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    continue
+        return False
+
+    def _get(self, stage_queue: queue.Queue):
+        """Take the next item from a stage queue, or None if the pipeline was stopped"""
+        try:
+            return stage_queue.get_nowait()
+        except queue.Empty:
+            pass
+        # The previous stage is behind: show the starvation in the trace
+        with tracer.span('wait_input', 'pipeline'):
+            while not self._stop.is_set():
+                try:
+                    return stage_queue.get(timeout=0.1)
+                except queue.Empty:
+                    continue
+        return None
+
+    def _iter_queue(self, stage_queue: queue.Queue) -> Iterator:
+        """Consume a stage queue until the end marker"""
+        while not self._stop.is_set():
+            item = self._get(stage_queue)
+            if item is None or item is _END:
+                return
+            yield item
+
+    def output_key(self, key: str) -> str:
+        """Processed key of a source key, with the extension of the output format"""
+        return self.s3_ops.processed_key(key, self.processed_folder, self.image_ops.encoder.suffix)
+
+    def _needs_processing(self, record: Dict) -> bool:
+        """Check a listed source against the manifest, queueing a copy for duplicates"""
+        if self.manifest.is_current(record):
+            self.skipped += 1
+            return False
+        
+        target_key = self.output_key(record['key'])
+        content = self.manifest.content_id(record)
+        owner = self._content_owners.get(content)
+        if owner is not None:
+            # Same bytes as an image already queued in this run
+            self._copies.append((record, target_key, owner))
+            return False
+        
+        output_key = self.manifest.output_for_content(record)
+        if output_key is not None:
+            self._copies.append((record, target_key, output_key))
+            return False
+        
+        self._content_owners[content] = target_key
+        return True
+
+    def _admitted_keys(self, records: Dict[str, Dict]) -> Iterator[str]:
+        """Yield listed image keys once their compressed size fits the budget"""
+        for record in self.s3_ops.iter_image_files(self.raw_folder):
+            if self.manifest is not None and not self._needs_processing(record):
+                continue
+            if not self.budget.acquire(record['size'], self.FETCH, self._stop):
+                return
+            records[record['key']] = record
+            yield record['key']
+        self._listing_complete = True
+
+    def _fetch_stage(self, out_queue: queue.Queue):
+        records = {}
+        index = 0
+        for download in self.s3_ops.download_images(self._admitted_keys(records), ordered=False):
+            source = records.pop(download['key'])
+            item = {
+                'image_index': index,
+                'key': download['key'],
+                'source': source,
+                'input_bytes': download['bytes'],
+                'fetch_time': download['elapsed'],
+                'fetch_reserved': source['size'],
+                # End-to-end latency runs from the start of the download to the end of the upload
+                'started_at': time.perf_counter() - download['elapsed'],
+                'error': download['error'],
+                'data': download.get('data')
+            }
+            index += 1
+            if not self._put(out_queue, item):
+                return
+        self._put(out_queue, _END)
+
+    def _decode_stage(self, in_queue: queue.Queue, out_queue: queue.Queue):
+        for item in self._iter_queue(in_queue):
+            shape = None
+            if item['error'] is None:
+                try:
+                    shape = self.image_ops.image_shape(item['data'])
+                except Exception as e:
+                    item['error'] = f"decode failed: {e}"
+            if shape is not None:
+                tiled = self.image_ops.needs_tiling(shape)
+                # Reserved from the header's shape before decoding, so the budget
+                # bounds what is allocated. Tiled images are kept as 8 bits per
+                # channel and only tiles become float tensors; others are the
+                # uint8 input plus the CPU and GPU outputs of compare_devices_batch
+                reserved = self.image_ops.tiler.memory_bytes(shape) if tiled else math.prod(shape) * 3
+                if not self.budget.acquire(reserved, self.DECODE, self._stop):
+                    return
+                item['decode_reserved'] = reserved
+                try:
+                    if tiled:
+                        item['image'], image_format = self.image_ops.open_image(item['data'], timings=item)
+                    else:
+                        item['tensor'], image_format = self.image_ops.decode_image(item['data'], timings=item)
+                    item['format'] = image_format
+                except Exception as e:
+                    item['error'] = f"decode failed: {e}"
+                    self.budget.release(item.pop('decode_reserved'), self.DECODE)
+            # The CPU process pool works from the compressed bytes, so they
+            # are kept until the transform stage in that case
+            if self.image_ops.cpu_pool is None:
+                self._release_input(item)
+
+            if not self._put(out_queue, item):
+                return
+        self._put(out_queue, _END)
+
+    def _release_input(self, item: Dict):
+        """Drop an item's compressed input bytes and release their reservation"""
+        self.s3_ops.release_image(item.pop('data', None))
+        if 'fetch_reserved' in item:
+            self.budget.release(item.pop('fetch_reserved'), self.FETCH)
+
+    def _transform_items(self, items, out_queue: queue.Queue) -> bool:
+        """Transform decoded items in same-shape batches and forward them"""
+        valid = [item for item in items if item['error'] is None]
+        # Benchmarked images run on both devices, the rest once on the best one;
+        # tiled images are too large to benchmark whole, so they run once too
+        compared, production, tiled = [], [], []
+        for item in valid:
+            if 'image' in item:
+                tiled.append(item)
+            elif self.compare_keys is None or item['key'] in self.compare_keys:
+                compared.append(item)
+            else:
+                production.append(item)
+        
+        pool_results = None
+        if self.image_ops.cpu_pool is not None and compared:
+            try:
+                with tracer.span('cpu_pool', 'cpu', images=len(compared)):
+                    pool_results = self.image_ops.process_cpu_pool([item['data'] for item in compared])
+            except Exception as e:
+                for item in compared:
+                    item['error'] = f"CPU pool failed: {e}"
+                compared = []
+        for item in items:
+            self._release_input(item)
+        
+        for indices in self.image_ops.shape_batches([item['tensor'].shape for item in compared]):
+            batch = [compared[idx] for idx in indices]
+            try:
+                processed_tensors, timings = self.image_ops.transform_adaptive(
+                    [item['tensor'] for item in batch],
+                    run_cpu=pool_results is None
+                )
+                for idx, processed_tensor, timing in zip(indices, processed_tensors, timings):
+                    if pool_results is not None:
+                        timing = self.image_ops.merge_pool_timing(timing, pool_results[idx])
+                    compared[idx]['tensor'] = processed_tensor
+                    compared[idx].update(timing)
+            except Exception as e:
+                for item in batch:
+                    item['error'] = f"transform failed: {e}"
+        
+        for indices in self.image_ops.shape_batches([item['tensor'].shape for item in production]):
+            batch = [production[idx] for idx in indices]
+            try:
+                processed_tensors, timings = self.image_ops.transform_adaptive(
+                    [item['tensor'] for item in batch],
+                    compare=False
+                )
+                for item, processed_tensor, timing in zip(batch, processed_tensors, timings):
+                    item['tensor'] = processed_tensor
+                    item.update(timing)
+            except Exception as e:
+                for item in batch:
+                    item['error'] = f"transform failed: {e}"
+        
+        for item in tiled:
+            try:
+                item['image'], timing = self.image_ops.transform_tiled(item['image'])
+                item.update(timing)
+            except Exception as e:
+                item['error'] = f"transform failed: {e}"
+        
+        for item in items:
+            if not self._put(out_queue, item):
+                return False
+        return True
+
+    def _transform_stage(self, in_queue: queue.Queue, out_queue: queue.Queue):
+        batch_size = self.image_ops.batch_size
+        if self.image_ops.cpu_pool is not None:
+            # Give every worker process an image per round
+            batch_size = max(batch_size, self.image_ops.cpu_pool.workers)
+        ended = False
+        for item in self._iter_queue(in_queue):
+            items = [item]
+            # Batch whatever is already waiting instead of stalling for a full batch
+            while len(items) < batch_size:
+                try:
+                    next_item = in_queue.get_nowait()
+                except queue.Empty:
+                    break
+                if next_item is _END:
+                    ended = True
+                    break
+                items.append(next_item)
+            
+            if not self._transform_items(items, out_queue):
+                return
+            if ended:
+                break
+        self._put(out_queue, _END)
+
+    def _encode_item(self, item: Dict) -> Dict:
+        """Encode one processed item and release its decoded memory"""
+        image = item.pop('tensor', None)
+        if image is None:
+            image = item.pop('image', None)
+        if item['error'] is None:
+            try:
+                item['data'] = self.image_ops.encode_image(image, item['format'], timings=item)
+                item['output_bytes'] = len(item['data'])
+            except Exception as e:
+                item['error'] = f"encode failed: {e}"
+        del image
+        if 'decode_reserved' in item:
+            self.budget.release(item.pop('decode_reserved'), self.DECODE)
+        return item
+
+    def _forward_encoded(self, item: Dict, out_queue: queue.Queue) -> bool:
+        if 'data' in item:
+            if not self.budget.acquire(item['output_bytes'], self.ENCODE, self._stop):
+                return False
+        return self._put(out_queue, item)
+
+    def _encode_stage(self, in_queue: queue.Queue, out_queue: queue.Queue):
+        with ThreadPoolExecutor(max_workers=self.encode_workers, thread_name_prefix='pipeline_encode') as executor:
+            pending = deque()
+            for item in self._iter_queue(in_queue):
+                pending.append(executor.submit(self._encode_item, item))
+                # Forward in arrival order, with at most two items per worker in flight
+                while pending and (len(pending) >= 2 * self.encode_workers or pending[0].done()):
+                    if not self._forward_encoded(pending.popleft().result(), out_queue):
+                        return
+            while pending:
+                if not self._forward_encoded(pending.popleft().result(), out_queue):
+                    return
+        self._put(out_queue, _END)
+
+    def _upload_items(self, in_queue: queue.Queue) -> Iterator[Dict]:
+        """
+        Consume the upload queue until the end marker, yielding IDLE while
+        uploads are in flight and nothing is queued
+
+        The encode stage may be waiting for budget that only finished uploads
+        release, so finished uploads must be collected without a new item.
+        """
+        while not self._stop.is_set():
+            try:
+                item = in_queue.get(timeout=self.IDLE_POLL_SECONDS if self._uploads_in_flight else 0.1)
+            except queue.Empty:
+                if self._uploads_in_flight:
+                    yield IDLE
+                continue
+            if item is _END:
+                return
+            yield item
+
+    def _upload_stage(self, in_queue: queue.Queue, out_queue: queue.Queue):
+        failed = []
+
+        def uploads():
+            for item in self._upload_items(in_queue):
+                if item is IDLE:
+                    yield IDLE
+                elif item['error'] is None:
+                    key = self.output_key(item['key'])
+                    # Several raw keys may share a filename and thus a processed key
+                    pending.setdefault(key, []).append(item)
+                    self._uploads_in_flight += 1
+                    yield key, item['data']
+                else:
+                    failed.append(item)
+                # Forward failures as soon as they reach the end of the pipeline
+                while failed:
+                    if not self._put(out_queue, failed.pop()):
+                        return
+
+        pending = {}
+        for upload in self.s3_ops.upload_objects(uploads(), ordered=False):
+            item = pending[upload['key']].pop(0)
+            if not pending[upload['key']]:
+                del pending[upload['key']]
+            self._uploads_in_flight -= 1
+            self.budget.release(item.pop('output_bytes'), self.ENCODE)
+            item.pop('data', None)
+            item['output_bytes'] = upload['bytes']
+            item['upload_time'] = upload['elapsed']
+            item['latency'] = time.perf_counter() - item.pop('started_at')
+            item['uri'] = upload.get('uri')
+            item['error'] = upload['error']
+            if item['error'] is None:
+                self._uploaded.add(upload['key'])
+                if self.manifest is not None:
+                    self.manifest.record(item['source'], upload['key'])
+            if not self._put(out_queue, item):
+                return
+        for item in failed:
+            if not self._put(out_queue, item):
+                return
+        for item in self._copy_duplicates():
+            if not self._put(out_queue, item):
+                return
+        self._put(out_queue, _END)
+
+    def _copy_duplicates(self) -> Iterator[Dict]:
+        """Produce the outputs of duplicate sources from their originals' outputs"""
+        owner_outputs = set(self._content_owners.values())
+        copies = []
+        for record, target_key, output_key in self._copies:
+            item = {'key': record['key'], 'copied_from': output_key, 'error': None,
+                    'uri': self.s3_ops.uri(target_key)}
+            if output_key in owner_outputs and output_key not in self._uploaded:
+                item['error'] = f"original output {output_key} was not produced"
+                yield item
+            elif output_key == target_key:
+                # Same filename, so the output is already in place
+                self.manifest.record(record, target_key)
+                yield item
+            else:
+                copies.append((record, target_key, output_key, item))
+        
+        pairs = [(output_key, target_key) for _, target_key, output_key, _ in copies]
+        for (record, target_key, _, item), copy in zip(copies, self.s3_ops.copy_objects(pairs)):
+            item['error'] = copy['error']
+            if copy['error'] is None:
+                self.manifest.record(record, target_key)
+            yield item
+
+    def _run_stage(self, stage, *args):
+        """Run a stage, turning an unexpected crash into a pipeline error"""
+        try:
+            stage(*args)
+        except Exception as e:
+            self._error = e
+            self._stop.set()
+
+    def run(self) -> Iterator[Dict]:
+        """
+        Run the pipeline
+        Yields:
+            Per-image result dictionaries as images finish uploading
+        """
+        self._stop.clear()
+        self._error = None
+        self._listing_complete = False
+        self._content_owners = {}
+        self._copies = []
+        self._uploaded = set()
+        self._uploads_in_flight = 0
+        self.skipped = 0
+        queues = [queue.Queue(maxsize=self.queue_size) for _ in range(5)]
+        stages = [
+            (self._fetch_stage, queues[0]),
+            (self._decode_stage, queues[0], queues[1]),
+            (self._transform_stage, queues[1], queues[2]),
+            (self._encode_stage, queues[2], queues[3]),
+            (self._upload_stage, queues[3], queues[4]),
+        ]
+        threads = [
+            threading.Thread(target=self._run_stage, args=stage, name=f"pipeline{stage[0].__name__}", daemon=True)
+            for stage in stages
+        ]
+        for thread in threads:
+            thread.start()
+
+        try:
+            yield from self._iter_queue(queues[4])
+        finally:
+            self._stop.set()
+            for thread in threads:
+                thread.join()
+
+        if self._error is not None:
+            raise self._error
+
+    @property
+    def listing_complete(self) -> bool:
+        """Whether the last run listed every source image"""
+        return self._listing_complete
+
+    @property
+    def peak_memory_bytes(self) -> int:
+        """Highest number of bytes held by in-flight images during the run"""
+        return self.budget.peak_bytes
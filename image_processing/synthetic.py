@@ -0,0 +1,86 @@
+import io
+import numpy as np
+from PIL import Image
+from typing import Iterator, List, Tuple
+
+# Output format -> (file extension, Pillow save options)
+FORMATS = {
+    'PNG': ('.png', {}),
+    'JPEG': ('.jpg', {'quality': 90}),
+    'WEBP': ('.webp', {'quality': 90})
+}
+
+
+def parse_resolutions(resolutions_str: str) -> List[Tuple[int, int]]:
+    """
+    Parse a comma-separated list of WIDTHxHEIGHT resolutions
+    Raises:
+        ValueError: For malformed or non-positive resolutions
+    """
+    resolutions = []
+    for item in resolutions_str.split(','):
+        width, _, height = item.strip().lower().partition('x')
+        resolution = (int(width), int(height))
+        if min(resolution) <= 0:
+            raise ValueError(f"Invalid resolution: {item}")
+        resolutions.append(resolution)
+    return resolutions
+
+
+def synthetic_image(width: int, height: int, rng: np.random.Generator) -> Image.Image:
+    """
+    RGB image with photo-like content: smooth gradients, soft blobs and sensor noise
+
+    Uniform or pure-noise images compress unrealistically well or badly,
+    which would skew decode, encode and transfer timings.
+    """
+    y, x = np.mgrid[0:height, 0:width].astype(np.float32)
+    x /= max(width - 1, 1)
+    y /= max(height - 1, 1)
+    image = np.empty((height, width, 3), dtype=np.float32)
+    for channel in range(3):
+        a, b, c = rng.uniform(-0.5, 0.5, 3)
+        image[:, :, channel] = 0.5 + a * x + b * y + c * x * y
+
+    # Low-frequency structure from a coarse random grid, bilinearly upsampled
+    grid = rng.uniform(-0.25, 0.25, (4, 6, 3)).astype(np.float32)
+    gy, gx = y * (grid.shape[0] - 1), x * (grid.shape[1] - 1)
+    y0, x0 = np.floor(gy).astype(int), np.floor(gx).astype(int)
+    y1, x1 = np.minimum(y0 + 1, grid.shape[0] - 1), np.minimum(x0 + 1, grid.shape[1] - 1)
+    fy, fx = (gy - y0)[..., None], (gx - x0)[..., None]
+    image += ((grid[y0, x0] * (1 - fx) + grid[y0, x1] * fx) * (1 - fy)
+              + (grid[y1, x0] * (1 - fx) + grid[y1, x1] * fx) * fy)
+
+    for _ in range(8):
+        cx, cy, radius = rng.uniform(0, 1), rng.uniform(0, 1), rng.uniform(0.05, 0.3)
+        blob = np.exp(-((x - cx) ** 2 + (y - cy) ** 2) / (2 * radius ** 2))
+        image += blob[..., None] * rng.uniform(-0.3, 0.3, 3).astype(np.float32)
+
+    image += rng.normal(0, 0.02, image.shape).astype(np.float32)
+    return Image.fromarray((np.clip(image, 0, 1) * 255).astype(np.uint8), 'RGB')
+
+
+def generate_dataset(count: int, resolutions: List[Tuple[int, int]], formats: List[str],
+                     seed: int = 0) -> Iterator[Tuple[str, bytes]]:
+    """
+    Generate a reproducible set of encoded synthetic images
+
+    Image i cycles through every resolution for each format in turn, and is
+    drawn from its own seed derived from (seed, i), so the first N images
+    are the same whatever the count.
+    Args:
+        count: Number of images
+        resolutions: (width, height) pairs
+        formats: Formats to encode in (keys of FORMATS)
+        seed: Dataset seed
+    Yields:
+        Tuples of (file name, encoded bytes)
+    """
+    for index in range(count):
+        width, height = resolutions[index % len(resolutions)]
+        image_format = formats[(index // len(resolutions)) % len(formats)].upper()
+        extension, options = FORMATS[image_format]
+        image = synthetic_image(width, height, np.random.default_rng([seed, index]))
+        buffer = io.BytesIO()
+        image.save(buffer, format=image_format, **options)
+        yield f"synthetic_{index:05d}_{width}x{height}{extension}", buffer.getvalue()
\ No newline at end of file
@@ -0,0 +1,153 @@
+import math
+import torch
+import torchvision.transforms as transforms
+import torchvision.transforms.functional as TF
+from PIL import Image
+from typing import Dict, Iterator, Optional, Tuple
+from tracing.tracer import tracer
+from .gaussian_blur import GaussianBlurEngine
+
+# ColorJitter.get_params result: (op order, brightness, contrast, saturation, hue factors)
+JitterParams = Tuple[torch.Tensor, Optional[float], Optional[float], Optional[float], Optional[float]]
+
+
+class TiledTransform:
+    """
+    Gaussian blur and ColorJitter of a large image, one tile at a time
+
+    Only the decoded 8-bit image and its 8-bit output are image-sized; the
+    float32 tensors the transforms work on are tile-sized, so their memory
+    does not grow with the image. Each tile is blurred together with a halo
+    of kernel_size // 2 pixels from its neighbours, which is cropped away
+    afterwards, so tile seams match the untiled blur. At the image border
+    the tile's own reflect padding is the image's, as long as tiles are at
+    least half a kernel wide.
+
+    ColorJitter draws its factors once per image instead of once per tile.
+    Contrast blends with the mean gray level of the whole image at the
+    point it is applied, so that mean is taken in a first pass over the
+    tiles (blurring them a second time) before the output pass.
+    """
+
+    # Float32 tile-sized buffers alive at once: tile, padded tile, blur passes, jitter
+    WORKING_COPIES = 6
+
+    def __init__(self, blur_engine: GaussianBlurEngine, color_jitter: transforms.ColorJitter,
+                 tile_size: int, device: torch.device):
+        """
+        Args:
+            blur_engine: Blur applied to every tile
+            color_jitter: ColorJitter whose factor ranges are used
+            tile_size: Side of the square output tiles, in pixels
+            device: Device the tiles are transformed on
+        """
+        self.blur_engine = blur_engine
+        self.color_jitter = color_jitter
+        self.halo = blur_engine.kernel_size // 2
+        self.tile_size = max(tile_size, self.halo + 1)
+        self.device = device
+
+    def jitter_params(self) -> JitterParams:
+        """Draw one set of ColorJitter factors and op order"""
+        jitter = self.color_jitter
+        return transforms.ColorJitter.get_params(jitter.brightness, jitter.contrast, jitter.saturation, jitter.hue)
+
+    def tiles(self, width: int, height: int) -> Iterator[Tuple[Tuple[int, int, int, int], Tuple[int, int, int, int]]]:
+        """
+        Tiles covering an image, row by row
+        Yields:
+            Tuples of (output box, box including the halo clipped to the image),
+            boxes as PIL (left, upper, right, lower)
+        """
+        for top in range(0, height, self.tile_size):
+            for left in range(0, width, self.tile_size):
+                box = (left, top, min(left + self.tile_size, width), min(top + self.tile_size, height))
+                halo_box = (max(box[0] - self.halo, 0), max(box[1] - self.halo, 0),
+                            min(box[2] + self.halo, width), min(box[3] + self.halo, height))
+                yield box, halo_box
+
+    def tile_count(self, width: int, height: int) -> int:
+        return math.ceil(width / self.tile_size) * math.ceil(height / self.tile_size)
+
+    def memory_bytes(self, shape: Tuple[int, int, int]) -> int:
+        """
+        Peak memory for an image of a CHW shape: 8-bit input and output plus the tile working set
+        """
+        channels, height, width = shape
+        side = self.tile_size + 2 * self.halo
+        return 2 * channels * height * width + self.WORKING_COPIES * 4 * channels * side * side
+
+    def _blurred_tile(self, image: Image.Image, box, halo_box, timings: Dict) -> torch.Tensor:
+        """Blur a tile with its halo on the device and crop it to the output box"""
+        with tracer.span('to_tensor', 'image') as span:
+            tile = TF.to_tensor(image.crop(halo_box)).to(self.device)
+        timings['to_tensor_time'] += span.duration
+        blurred = self.blur_engine(tile)
+        top, left = box[1] - halo_box[1], box[0] - halo_box[0]
+        return blurred[:, top:top + box[3] - box[1], left:left + box[2] - box[0]]
+
+    @staticmethod
+    def _gray(tile: torch.Tensor) -> torch.Tensor:
+        return TF.rgb_to_grayscale(tile) if tile.shape[0] == 3 else tile
+
+    @staticmethod
+    def _apply_jitter(tile: torch.Tensor, params: JitterParams, contrast_mean: Optional[float],
+                      until_contrast: bool = False) -> torch.Tensor:
+        """
+        Apply the brightness and contrast ops in their drawn order
+
+        Contrast is the blend torchvision's adjust_contrast does, with the
+        given whole-image mean instead of the tile's own. With until_contrast
+        the ops stop just before contrast, which is the input its mean is
+        taken from.
+        """
+        fn_idx, brightness, contrast, _, _ = params
+        for fn_id in fn_idx:
+            if fn_id == 0 and brightness is not None:
+                tile = TF.adjust_brightness(tile, brightness)
+            elif fn_id == 1 and contrast is not None:
+                if until_contrast:
+                    return tile
+                tile = (contrast * tile + (1.0 - contrast) * contrast_mean).clamp(0, 1)
+        return tile
+
+    def __call__(self, image: Image.Image, params: Optional[JitterParams] = None) -> Tuple[Image.Image, Dict]:
+        """
+        Transform a decoded image tile by tile
+        Args:
+            image: Decoded (loaded) PIL image
+            params: ColorJitter factors; drawn when not given
+        Returns:
+            Tuple of (processed PIL image, timings with transform_time, the
+            to_tensor_time and to_pil_time summed over tiles, tiles and tile_size)
+        """
+        params = params if params is not None else self.jitter_params()
+        width, height = image.size
+        timings = {'to_tensor_time': 0.0, 'to_pil_time': 0.0,
+                   'tiles': self.tile_count(width, height), 'tile_size': self.tile_size}
+
+        with tracer.span('transform_tiled', self.device.type, tiles=timings['tiles']) as span:
+            contrast_mean = None
+            if params[2] is not None:
+                total = 0.0
+                with tracer.span('contrast_mean', self.device.type):
+                    for box, halo_box in self.tiles(width, height):
+                        tile = self._apply_jitter(self._blurred_tile(image, box, halo_box, timings), params,
+                                                  None, until_contrast=True)
+                        total += self._gray(tile).sum(dtype=torch.float64).item()
+                contrast_mean = total / (width * height)
+
+            output = None
+            for box, halo_box in self.tiles(width, height):
+                tile = self._apply_jitter(self._blurred_tile(image, box, halo_box, timings), params, contrast_mean)
+                with tracer.span('to_pil', 'image') as to_pil_span:
+                    tile_image = TF.to_pil_image(tile.cpu())
+                    if output is None:
+                        output = Image.new(tile_image.mode, (width, height))
+                    output.paste(tile_image, box[:2])
+                timings['to_pil_time'] += to_pil_span.duration
+            if self.device.type == 'cuda':
+                torch.cuda.synchronize()
+
+        timings['transform_time'] = span.duration - timings['to_tensor_time'] - timings['to_pil_time']
+        return output, timings
\ No newline at end of file
@@ -1,15 +1,20 @@
 import sys
 sys.dont_write_bytecode = True
 
-from config.s3_config_handler import ConfigHandler
-from s3_operations.s3_operations import S3Operations
-from benchmark_operations.benchmark_operations import BenchmarkOperations
-from image_processing.image_processing_operations import ImageProcessingOperations
-from cli_operations.cli_operations import CLIOperations
-from rich.console import Console
-from rich.panel import Panel
-import argparse
-import os
+from tracing.startup import startup
+from tracing.tracer import tracer
+
+# Only light modules are imported here; torch, torchvision, PIL and boto3
+# are imported by the mode and storage backend that need them
+with startup.phase('import entry point'):
+    from cli_operations.cli_operations import CLIOperations
+    from results_operations.results_operations import ResultsOperations
+    from rich.console import Console
+    from rich.panel import Panel
+    from datetime import datetime
+    import argparse
+    import os
+    import random
 
 console = Console()
 
@@ -37,65 +42,357 @@ def get_folder_paths():
     return raw_folder, processed_folder, results_folder
 
 def process_matrices(s3_ops, cli_ops, results_folder):
-    """Handle matrix multiplication benchmark"""
+    """Handle matrix multiplication benchmark, returning the CPU vs GPU results"""
     sizes, source = cli_ops.get_matrix_sizes()
     cli_ops.display_configuration(sizes, source)
     
     txt_count = s3_ops.count_txt_files(results_folder)
     console.print(f"\n[cyan]Number of existing benchmark files:[/] {txt_count}")
     
-    benchmark_ops = BenchmarkOperations()
+    startup.import_modules('torch')
+    with startup.phase('import benchmark_operations'):
+        from benchmark_operations.benchmark_operations import BenchmarkOperations
+    thread_counts, pin_threads, interop_threads = cli_ops.get_cpu_thread_config()
+    apply_interop_threads(interop_threads)
+    init_cuda()
+    
+    warmup, repeats = cli_ops.get_timing_config()
+    memory_budget_mb, _ = cli_ops.get_transform_memory_budget()
+    with startup.phase('BenchmarkOperations init'):
+        benchmark_ops = BenchmarkOperations(warmup=warmup, repeats=repeats, memory_budget_mb=memory_budget_mb)
+    thread_sweep = None
+    cpu_baseline = None
+    if thread_counts:
+        console.print(f"\n[bold cyan]Starting CPU thread sweep ({', '.join(map(str, thread_counts))} threads)...[/]")
+        thread_sweep = benchmark_ops.run_thread_sweep(sizes, thread_counts, pin_threads)
+        cpu_baseline = benchmark_ops.best_thread_configs(thread_sweep)
+    
     console.print("\n[bold cyan]Starting matrix multiplication benchmark...[/]")
-    results, device_info = benchmark_ops.run_comparison(sizes)
+    results, device_info = benchmark_ops.run_comparison(sizes, cpu_baseline)
+    
+    precision_results = None
+    precisions = cli_ops.get_matrix_precisions()
+    if precisions:
+        console.print(f"\n[bold cyan]Starting precision sweep ({', '.join(precisions)})...[/]")
+        precision_results = benchmark_ops.run_precision_sweep(sizes, precisions)
+    
+    micro_results = None
+    micro_kernels, micro_elements, peaks = cli_ops.get_microbenchmark_config()
+    if micro_kernels:
+        console.print(f"\n[bold cyan]Starting microbenchmarks ({', '.join(micro_kernels)})...[/]")
+        micro_results = benchmark_ops.run_microbenchmarks(micro_kernels, micro_elements, peaks)
+    
+    out_of_core_results = None
+    ooc_sizes, ooc_budget_mb, ooc_dir = cli_ops.get_out_of_core_config()
+    if ooc_sizes:
+        console.print(f"\n[bold cyan]Starting out-of-core matrix multiplication ({ooc_budget_mb} MB budget)...[/]")
+        out_of_core_results = benchmark_ops.run_out_of_core(ooc_sizes, ooc_budget_mb, ooc_dir)
     
-    filename = s3_ops.save_results(results, device_info, results_folder)
+    filename = s3_ops.save_results(results, device_info, results_folder, precision_results, out_of_core_results,
+                                   thread_sweep, micro_results)
     console.print(f"\n[green]Benchmark complete! Results saved to:[/] {filename}")
+    records_uri = ResultsOperations(s3_ops, results_folder).save_run(
+        'matrix',
+        ResultsOperations.matrix_records(results, precision_results, out_of_core_results)
+        + ResultsOperations.thread_sweep_records(thread_sweep or [], 'matmul_threads', 'size')
+        + ResultsOperations.microbenchmark_records(micro_results or []),
+        device_info,
+        {'warmup': warmup, 'repeats': repeats, 'ooc_memory_budget_mb': ooc_budget_mb if ooc_sizes else None,
+         'interop_threads': interop_threads or None, 'peaks': peaks if micro_kernels else None}
+    )
+    if records_uri:
+        console.print(f"[green]Result records saved to:[/] {records_uri}")
     
+    if thread_sweep:
+        cli_ops.display_thread_sweep(thread_sweep, "Matrix Size", 'size')
     cli_ops.display_results(results)
+    if precision_results:
+        cli_ops.display_precision_results(precision_results)
+    if micro_results:
+        cli_ops.display_microbenchmarks(micro_results, peaks)
+    if out_of_core_results:
+        cli_ops.display_out_of_core_results(out_of_core_results)
+    return results
 
 def process_images(s3_ops, cli_ops, raw_folder, processed_folder, results_folder):
-    """Handle image processing benchmark"""
-    # List images in raw images folder
-    image_files = s3_ops.list_image_files(raw_folder)
-    if not image_files:
-        console.print(f"[red]No images found in {raw_folder} folder[/]")
-        return
+    """Handle image processing benchmark, returning the run's throughput summary (None without results)"""
+    # Initialize image processing operations
+    batch_size, _ = cli_ops.get_image_batch_size()
+    blur_backend, kernel_size, sigma = cli_ops.get_blur_config()
+    cpu_workers, _ = cli_ops.get_cpu_workers()
+    warmup, repeats = cli_ops.get_timing_config()
+    run_mode, run_mode_source = cli_ops.get_image_run_mode()
+    console.print(f"[cyan]Image run mode:[/] {run_mode} (from {run_mode_source})")
+    if run_mode == "production":
+        # No CPU baseline, so no worker processes for it either
+        cpu_workers = 0
+    memory_budget_mb, _ = cli_ops.get_transform_memory_budget()
+    tile_threshold_mp, tile_size = cli_ops.get_tiling_config()
+    compile_transforms, compile_cache_dir = cli_ops.get_compile_config()
+    max_side, _ = cli_ops.get_image_max_side()
+    output_format, png_compress_level, output_quality, output_optimize = cli_ops.get_output_encoding_config()
+    results_ops = ResultsOperations(s3_ops, results_folder)
+    batch_limits = results_ops.load_batch_limits()
+    startup.import_modules('torch', 'torchvision', 'PIL.Image')
+    with startup.phase('import image_processing'):
+        from image_processing.image_processing_operations import ImageProcessingOperations
+        from image_processing.codec import OutputEncoder
+    thread_counts, pin_threads, interop_threads = cli_ops.get_cpu_thread_config()
+    apply_interop_threads(interop_threads)
+    init_cuda()
+    # Includes the blur backend calibration and starting the CPU worker pool
+    with startup.phase('ImageProcessingOperations init'):
+        image_ops = ImageProcessingOperations(
+            batch_size=batch_size,
+            blur_backend=blur_backend,
+            kernel_size=kernel_size,
+            sigma=sigma,
+            cpu_workers=cpu_workers,
+            warmup=warmup,
+            repeats=repeats,
+            memory_budget_mb=memory_budget_mb,
+            batch_limits=batch_limits,
+            tile_threshold_mp=tile_threshold_mp,
+            tile_size=tile_size,
+            compile_transforms=compile_transforms,
+            compile_cache_dir=compile_cache_dir,
+            max_side=max_side,
+            encoder=OutputEncoder(output_format, png_compress_level, output_quality, output_optimize)
+        )
+    console.print(
+        f"[cyan]Transform memory budget:[/] {image_ops.scheduler.budget_bytes / 1024**2:.0f} MB"
+        + (f", {len(batch_limits)} recorded batch size limits" if batch_limits else "")
+    )
+    if image_ops.compiled is not None:
+        console.print(
+            f"[cyan]Compiled transforms:[/] on, artifact cache {compile_cache_dir or 'per process'}"
+            + (f", {image_ops.compiled.loaded_bundles} bundles loaded" if compile_cache_dir else "")
+        )
+    try:
+        thread_sweep = None
+        if thread_counts and run_mode != "production":
+            console.print(f"\n[bold cyan]Starting CPU thread sweep ({', '.join(map(str, thread_counts))} threads)...[/]")
+            thread_sweep = image_ops.run_thread_sweep(thread_counts, pin_threads)
+            cli_ops.display_thread_sweep(thread_sweep, "Image Shape", 'shape')
+            # The fastest setting becomes the in-process CPU baseline. It is not pinned: affinity is
+            # per process, and would also confine the pipeline's decode, encode and transfer threads
+            image_ops.cpu_threads = min(thread_sweep, key=lambda result: result['time'])['threads']
+        summary = run_image_pipeline(s3_ops, cli_ops, image_ops, raw_folder, processed_folder, results_folder,
+                                     run_mode, thread_sweep)
+        if image_ops.scheduler.backoffs:
+            console.print(f"[yellow]Batches halved after running out of memory:[/] {image_ops.scheduler.backoffs}")
+        limits = image_ops.scheduler.sustainable_limits()
+        if limits != batch_limits:
+            uri = results_ops.save_batch_limits(limits)
+            console.print(f"[green]Sustainable batch sizes saved to:[/] {uri}")
+    finally:
+        image_ops.close()
+    return summary
+
+def save_trace(s3_ops, results_folder, metadata):
+    """Export the recorded spans as a Chrome trace next to the results"""
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    key = f"{results_folder.rstrip('/')}/traces/image_trace_{timestamp}.json"
+    tracer.disable()
+    uri = s3_ops.put_bytes(key, tracer.export(metadata))
+    console.print(f"[green]Pipeline trace saved to:[/] {uri} (open in chrome://tracing or ui.perfetto.dev)")
+
+def sample_image_keys(s3_ops, raw_folder, sample_size, seed):
+    """Pick a reproducible random sample of the raw image keys"""
+    keys = sorted(record['key'] for record in s3_ops.iter_image_files(raw_folder))
+    return set(random.Random(seed).sample(keys, min(sample_size, len(keys))))
+
+def run_image_pipeline(s3_ops, cli_ops, image_ops, raw_folder, processed_folder, results_folder, run_mode,
+                       thread_sweep=None):
+    """Stream images through the processing pipeline, save the results and return the throughput summary"""
+    from image_processing.streaming_pipeline import StreamingPipeline
+    from s3_operations.manifest import ProcessingManifest
     
-    console.print(f"\nFound {len(image_files)} images to process")
+    # Check every blur backend against torchvision before trusting its timings
+    blur_engine = image_ops.blur_engine
+    blur_errors = blur_engine.validate()
+    console.print(
+        f"\n[cyan]Blur backend:[/] {blur_engine.backend} "
+        f"(kernel {blur_engine.kernel_size}x{blur_engine.kernel_size}, sigma {blur_engine.sigma}) - "
+        + ", ".join(f"{backend} max error {error:.2e}" for backend, error in blur_errors.items())
+    )
     
-    # Initialize image processing operations
-    image_ops = ImageProcessingOperations()
+    # Skip images whose output is up to date with the current parameters
+    manifest = None
+    incremental, _ = cli_ops.get_incremental_mode()
+    if incremental:
+        manifest = ProcessingManifest(s3_ops, processed_folder, image_ops.pipeline_params())
+        valid_entries = manifest.load()
+        console.print(f"\n[cyan]Incremental mode:[/] {valid_entries} manifest entries (hash {manifest.params_hash})")
+        if manifest.invalidated:
+            console.print(
+                f"[yellow]Pipeline parameters changed, {manifest.invalidated} manifest entries invalidated[/]"
+            )
     
-    # Process all images
-    image_data = []
-    for image_file in image_files:
-        try:
-            data = s3_ops.get_image(image_file)
-            image_data.append(data)
-        except Exception as e:
-            console.print(f"[red]Error loading image {image_file}: {str(e)}[/]")
+    # Choose which images are benchmarked on both devices
+    compare_keys = None
+    sample_size, sample_seed = cli_ops.get_compare_sample_config()
+    if run_mode == "production":
+        compare_keys = set()
+    elif run_mode == "sampled":
+        compare_keys = sample_image_keys(s3_ops, raw_folder, sample_size, sample_seed)
+        console.print(f"\n[cyan]Comparing CPU and GPU on a sample of {len(compare_keys)} images (seed {sample_seed})[/]")
+    
+    # Stream images through list -> fetch -> decode -> transform -> encode -> upload
+    queue_size, memory_budget_mb, encode_workers = cli_ops.get_pipeline_config()
+    pipeline = StreamingPipeline(
+        s3_ops,
+        image_ops,
+        raw_folder,
+        processed_folder,
+        queue_size=queue_size,
+        memory_budget_mb=memory_budget_mb,
+        manifest=manifest,
+        compare_keys=compare_keys,
+        encode_workers=encode_workers
+    )
     
     console.print("\n[bold cyan]Starting image processing benchmark...[/]")
-    results, device_info = image_ops.process_batch(image_data)
-    
-    # Save processed images and results
-    for image_file, result in zip(image_files, results):
-        try:
-            s3_uri = s3_ops.save_processed_image(
-                image_file, 
-                result['processed_data'],
-                raw_folder,
-                processed_folder
-            )
-            console.print(f"[green]Saved processed image to:[/] {s3_uri}")
-        except Exception as e:
-            console.print(f"[red]Error saving processed image {image_file}: {str(e)}[/]")
+    results = []
+    failures = 0
+    copies = 0
+    trace, _ = cli_ops.get_trace_mode()
+    if trace:
+        tracer.enable()
+    try:
+        with tracer.span('image_pipeline', 'pipeline') as pipeline_span:
+            for result in pipeline.run():
+                if result['error']:
+                    failures += 1
+                    console.print(f"[red]Error processing image {result['key']}: {result['error']}[/]")
+                    continue
+                if 'copied_from' in result:
+                    copies += 1
+                    console.print(f"[green]Duplicate of {result['copied_from']}, saved to:[/] {result['uri']}")
+                    continue
+                console.print(f"[green]Saved processed image to:[/] {result['uri']}")
+                results.append(result)
+    finally:
+        if manifest is not None:
+            manifest_uri = manifest.save(prune_unseen=pipeline.listing_complete)
+            console.print(f"\n[green]Manifest saved to:[/] {manifest_uri}")
+        if trace:
+            save_trace(s3_ops, results_folder, {'raw_folder': raw_folder, **image_ops.pipeline_params()})
+    
+    if manifest is not None:
+        console.print(f"[cyan]Skipped {pipeline.skipped} unchanged images, {copies} duplicates copied[/]")
+    
+    if not results:
+        if not failures and not pipeline.skipped and not copies:
+            console.print(f"[red]No images found in {raw_folder} folder[/]")
+        return None
+    
+    console.print(
+        f"\nProcessed {len(results)} images ({failures} failed), "
+        f"peak in-flight memory {pipeline.peak_memory_bytes / 1024**2:.1f} MB "
+        f"of {memory_budget_mb} MB budget"
+    )
     
     # Save benchmark results in ProcessedImages folder
-    results_uri = s3_ops.save_processing_results(results, device_info, processed_folder)
+    results.sort(key=lambda result: result['image_index'])
+    summary = image_ops.throughput_summary(
+        results,
+        image_ops.cpu_pool.workers if image_ops.cpu_pool is not None else 0
+    )
+    summary['failures'] = failures
+    summary['pipeline_wall_time'] = pipeline_span.duration
+    summary['pipeline_images_per_s'] = len(results) / pipeline_span.duration if pipeline_span.duration > 0 else None
+    stages = image_ops.stage_summary(results)
+    compared = [result for result in results if result.get('compared')]
+    comparison = None
+    if run_mode == "sampled":
+        comparison = image_ops.sampled_speedup(results, len(results), seed=sample_seed)
+    compile_comparison = image_ops.compile_comparison(compared)
+    encoding = image_ops.encoding_summary(results)
+    device_info = image_ops.get_device_info()
+    results_uri = s3_ops.save_processing_results(compared, device_info, processed_folder, summary, stages, comparison,
+                                                 thread_sweep, compile_comparison, encoding)
     console.print(f"\n[green]Benchmark results saved to:[/] {results_uri}")
+    records_uri = ResultsOperations(s3_ops, results_folder).save_run(
+        'image',
+        ResultsOperations.image_records(results, summary, {
+            'blur_backend': image_ops.blur_engine.backend,
+            'kernel_size': image_ops.blur_engine.kernel_size,
+            'sigma': image_ops.blur_engine.sigma,
+            'batch_size': image_ops.batch_size,
+            'cpu_workers': image_ops.cpu_pool.workers if image_ops.cpu_pool is not None else 0,
+            'run_mode': run_mode,
+            'compiled': image_ops.compiled is not None
+        }, stages, encoding) + ResultsOperations.thread_sweep_records(thread_sweep or [], 'image_transform_threads', 'shape'),
+        device_info,
+        {'warmup': image_ops.timer.warmup, 'repeats': image_ops.timer.repeats, 'pipeline': image_ops.pipeline_params(),
+         'cpu_threads': image_ops.cpu_threads}
+    )
+    if records_uri:
+        console.print(f"[green]Result records saved to:[/] {records_uri}")
+    
+    if compared:
+        cli_ops.display_image_results(compared, summary)
+    else:
+        console.print(f"\n[bold]Aggregate throughput:[/] {cli_ops.format_throughput(summary)}")
+    if comparison:
+        cli_ops.display_sampled_comparison(comparison)
+    if compile_comparison:
+        cli_ops.display_compile_comparison(compile_comparison)
+    if encoding:
+        cli_ops.display_encoding_summary(encoding)
+    cli_ops.display_stage_timings(stages)
+    return summary
+
+def apply_interop_threads(interop_threads):
+    """Set torch's inter-op thread count, which it only allows before any parallel work"""
+    if interop_threads:
+        from benchmark_operations.cpu_threads import set_interop_threads
+        set_interop_threads(interop_threads)
+
+def init_cuda():
+    """Create the CUDA context up front, so its cost shows up as its own startup phase"""
+    import torch
+    if torch.cuda.is_available():
+        with startup.phase('CUDA context'):
+            torch.cuda.init()
+            torch.empty(1, device='cuda')
+            torch.cuda.synchronize()
+
+def create_s3_operations(cli_ops):
+    """Initialize storage: S3 (default) or a local directory, optionally behind a disk cache"""
+    storage_backend, local_root, content_etags, cache_dir, cache_max_mb = cli_ops.get_storage_config()
+    transfer_workers, _ = cli_ops.get_transfer_workers()
+    with startup.phase('import s3_operations'):
+        from s3_operations.s3_operations import S3Operations
+        from s3_operations.storage import LocalBackend
+    if storage_backend == "local":
+        console.print(f"[cyan]Using local storage:[/] {local_root}")
+        credentials, bucket_name, backend = None, None, LocalBackend(local_root, content_etags)
+    else:
+        # Initialize configuration handler for S3 access
+        from config.s3_config_handler import ConfigHandler
+        config = ConfigHandler()
+        credentials, bucket_name, backend = config.get_aws_credentials(), config.s3_bucket, None
+        startup.import_modules('boto3')
     
-    cli_ops.display_image_results(results)
+    multipart_threshold, part_size, part_workers = cli_ops.get_multipart_config()
+    # For S3 this creates the boto3 session and client (endpoint and service model loading)
+    with startup.phase('storage client init'):
+        s3_ops = S3Operations(
+            credentials,
+            bucket_name,
+            max_workers=transfer_workers,
+            multipart_threshold=multipart_threshold,
+            part_size=part_size,
+            part_workers=part_workers,
+            backend=backend,
+            cache_dir=cache_dir,
+            cache_max_bytes=cache_max_mb * 1024**2
+        )
+    if cache_dir:
+        console.print(f"[cyan]Disk cache:[/] {cache_dir} (max {cache_max_mb} MB)")
+    return s3_ops
 
 def main():
     """Main function to run the GPU processing benchmark"""
@@ -119,17 +416,26 @@ def main():
     
     print("\n")
     
-    # Initialize configuration handler for S3 access
-    config = ConfigHandler()
-    
-    # Initialize S3 operations
-    s3_ops = S3Operations(config.get_aws_credentials(), config.s3_bucket)
+    s3_ops = create_s3_operations(cli_ops)
     
     # Run appropriate processing mode
     if mode == "matrix":
         process_matrices(s3_ops, cli_ops, results_folder)
     else:  # mode == "image"
         process_images(s3_ops, cli_ops, raw_folder, processed_folder, results_folder)
+    
+    if s3_ops.cache_stats:
+        cli_ops.display_cache_stats(s3_ops.cache_stats)
+    if s3_ops.metrics is not None:
+        cli_ops.display_s3_metrics(s3_ops.metrics.summary())
+    
+    profile_startup, _ = cli_ops.get_startup_profile_mode()
+    if profile_startup:
+        cli_ops.display_startup_profile(startup.phases)
+        records_uri = ResultsOperations(s3_ops, results_folder).save_run(
+            'startup', ResultsOperations.startup_records(startup.phases, mode), {}, {'mode': mode}
+        )
+        console.print(f"[green]Startup records saved to:[/] {records_uri}")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1 @@
+from .results_operations import ResultsOperations
\ No newline at end of file
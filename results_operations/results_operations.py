@@ -0,0 +1,410 @@
+import json
+import math
+import os
+import socket
+import uuid
+import numpy as np
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+from benchmark_operations.timing import summarize
+
+SCHEMA_VERSION = 1
+RECORDS_FOLDER = 'records'
+BATCH_LIMITS_NAME = 'batch_limits.json'
+
+
+def run_metadata() -> Dict:
+    """
+    Identify the current run: container image tag, git revision and host
+
+    IMAGE_TAG and GIT_SHA are baked into the image at build time; without an
+    IMAGE_TAG the tag is derived from GIT_SHA the way the build tags images
+    (sha-<7 hex digits>), and runs outside a built image are tagged 'local'.
+    """
+    git_sha = os.getenv('GIT_SHA', '')
+    image_tag = os.getenv('IMAGE_TAG') or (f"sha-{git_sha[:7]}" if git_sha else 'local')
+    return {
+        'run_id': uuid.uuid4().hex[:12],
+        'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'image_tag': image_tag,
+        'git_sha': git_sha or None,
+        'hostname': socket.gethostname()
+    }
+
+
+def _ranks(values: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Ranks (1-based, ties averaged) and the sizes of the tie groups"""
+    order = np.argsort(values, kind='mergesort')
+    sorted_values = values[order]
+    ranks = np.empty(len(values))
+    ties = []
+    start = 0
+    for end in range(1, len(values) + 1):
+        if end == len(values) or sorted_values[end] != sorted_values[start]:
+            ranks[order[start:end]] = (start + end + 1) / 2
+            ties.append(end - start)
+            start = end
+    return ranks, np.array(ties)
+
+
+def mann_whitney_greater(candidate, baseline) -> float:
+    """
+    One-sided Mann-Whitney U test that candidate samples tend to be larger
+
+    Uses the normal approximation with tie and continuity correction, which
+    needs no distributional assumption about timings (they are typically
+    right-skewed) and no scipy.
+    Args:
+        candidate: Candidate timing samples
+        baseline: Baseline timing samples
+    Returns:
+        p-value (1.0 when either side has no samples)
+    """
+    x = np.asarray(candidate, dtype=np.float64)
+    y = np.asarray(baseline, dtype=np.float64)
+    n1, n2 = len(x), len(y)
+    if n1 == 0 or n2 == 0:
+        return 1.0
+    n = n1 + n2
+    ranks, ties = _ranks(np.concatenate([x, y]))
+    u = ranks[:n1].sum() - n1 * (n1 + 1) / 2
+    tie_term = (ties ** 3 - ties).sum() / (n * (n - 1)) if n > 1 else 0.0
+    variance = n1 * n2 / 12 * ((n + 1) - tie_term)
+    if variance <= 0:
+        return 1.0
+    z = (u - n1 * n2 / 2 - 0.5) / math.sqrt(variance)
+    return 0.5 * math.erfc(z / math.sqrt(2))
+
+
+class ResultsOperations:
+    """
+    Structured benchmark results stored as JSON lines next to the text reports
+
+    Every run writes one object, <folder>/records/<kind>_<timestamp>_<run_id>.jsonl,
+    with one record per measurement. A record carries the run metadata, the
+    device information, the benchmark name, device and parameters that
+    identify the measurement across runs, and the full timing distribution.
+    """
+
+    def __init__(self, s3_ops, folder: str):
+        """
+        Args:
+            s3_ops: S3Operations used to read and write records
+            folder: Results folder; records go into its records/ subfolder
+        """
+        self.s3_ops = s3_ops
+        self.folder = folder.rstrip('/')
+        self.records_folder = f"{self.folder}/{RECORDS_FOLDER}"
+
+    @staticmethod
+    def _record(benchmark: str, device: str, params: Dict, stats: Dict, metric: str = 'seconds',
+                extra: Optional[Dict] = None) -> Dict:
+        record = {
+            'benchmark': benchmark,
+            'device': device,
+            'params': params,
+            'metric': metric,
+            'stats': {k: v for k, v in stats.items() if k in ('min', 'median', 'mean', 'p95', 'stddev', 'samples')}
+        }
+        if extra:
+            record.update(extra)
+        return record
+
+    @staticmethod
+    def thread_sweep_records(results: List[Dict], benchmark: str, label_key: str) -> List[Dict]:
+        """Measurement records for a CPU thread sweep, one per workload and thread count"""
+        return [
+            ResultsOperations._record(
+                benchmark, 'cpu', {label_key: result[label_key], 'threads': result['threads'], 'pinned': result['pinned']},
+                result['stats'], extra={'efficiency': result['efficiency'], 'gflops': result.get('gflops')}
+            )
+            for result in results
+        ]
+
+    @staticmethod
+    def matrix_records(results: List[Dict], precision_results: Optional[List[Dict]] = None,
+                       out_of_core_results: Optional[List[Dict]] = None) -> List[Dict]:
+        """Measurement records for a matrix multiplication run"""
+        records = []
+        for result in results:
+            for device, key in (('cpu', 'cpu'), ('cuda', 'gpu')):
+                if result.get(f"{key}_stats"):
+                    records.append(ResultsOperations._record(
+                        'matmul', device, {'size': result['size'], 'precision': 'fp32'},
+                        result[f"{key}_stats"], extra={'gflops': result[f"{key}_gflops"]}
+                    ))
+        for result in precision_results or []:
+            if result['stats']:
+                records.append(ResultsOperations._record(
+                    'matmul', result['device'], {'size': result['size'], 'precision': result['precision']},
+                    result['stats'], extra={'gflops': result['gflops']}
+                ))
+        for result in out_of_core_results or []:
+            if not result['error']:
+                records.append(ResultsOperations._record(
+                    'matmul_out_of_core', result['device'], {'size': result['size'], 'tile': result['tile']},
+                    summarize([result['total_time']]),
+                    extra={'gflops': result['gflops'], 'io_wait_time': result['io_wait_time']}
+                ))
+        return records
+
+    @staticmethod
+    def microbenchmark_records(results: List[Dict]) -> List[Dict]:
+        """Measurement records for the compute and bandwidth microbenchmarks, one per kernel and device"""
+        return [
+            ResultsOperations._record(
+                f"micro_{result['kernel']}", result['device'], result['params'], result['stats'],
+                extra={key: result[key] for key in ('gflops', 'gbs', 'intensity', 'bound', 'peak_fraction')}
+            )
+            for result in results if result['stats']
+        ]
+
+    @staticmethod
+    def image_records(results: List[Dict], summary: Dict, params: Dict,
+                      stages: Optional[Dict[str, Dict]] = None,
+                      encoding: Optional[Dict] = None) -> List[Dict]:
+        """
+        Measurement records for an image processing run
+
+        Per device, the samples are the per-image median transform times, so a
+        run is compared as a distribution over the dataset; compiled pipeline
+        times and images transformed once on the production device are
+        recorded separately. Pipeline stage
+        timings, when given, become one 'image_stage' record per stage. With
+        an encoding summary, per-image encode times and output sizes are
+        recorded as 'image_encode' (seconds) and 'image_output_size' (bytes).
+        """
+        records = []
+        for device, key in (('cpu', 'cpu_time'), ('cuda', 'gpu_time')):
+            samples = [result[key] for result in results if result.get(key) is not None]
+            if not samples:
+                continue
+            throughput_key = 'cpu_images_per_s' if device == 'cpu' else 'gpu_images_per_s'
+            records.append(ResultsOperations._record(
+                'image_transform', device, params, summarize(samples),
+                extra={'images': len(samples), 'images_per_s': summary.get(throughput_key)}
+            ))
+        for device, key in (('cpu', 'cpu_compiled_time'), ('cuda', 'gpu_compiled_time')):
+            samples = [result[key] for result in results if result.get(key) is not None]
+            if not samples:
+                continue
+            throughput_key = 'cpu_compiled_images_per_s' if device == 'cpu' else 'gpu_compiled_images_per_s'
+            records.append(ResultsOperations._record(
+                'image_transform_compiled', device, params, summarize(samples),
+                extra={'images': len(samples), 'images_per_s': summary.get(throughput_key)}
+            ))
+        production = [result for result in results if result.get('transform_time') is not None]
+        if production:
+            records.append(ResultsOperations._record(
+                'image_transform_production', production[0]['device'], params,
+                summarize([result['transform_time'] for result in production]),
+                extra={'images': len(production), 'images_per_s': summary.get('production_images_per_s')}
+            ))
+        encoded = [result for result in results
+                   if result.get('encode_time') is not None and result.get('output_bytes') is not None]
+        if encoding and encoded:
+            encode_params = {**params, 'encoding': encoding['encoding']}
+            extra = {'images': len(encoded), 'output_bytes': encoding['output_bytes'],
+                     'input_bytes': encoding['input_bytes'], 'size_ratio': encoding['size_ratio']}
+            records.append(ResultsOperations._record(
+                'image_encode', 'cpu', encode_params, summarize([result['encode_time'] for result in encoded]),
+                extra=extra
+            ))
+            records.append(ResultsOperations._record(
+                'image_output_size', 'storage', encode_params,
+                summarize([result['output_bytes'] for result in encoded]), metric='bytes', extra=extra
+            ))
+        for stage, stats in (stages or {}).items():
+            records.append(ResultsOperations._record('image_stage', 'pipeline', {**params, 'stage': stage}, stats))
+        return records
+
+    @staticmethod
+    def startup_records(phases: List[Dict], mode: str) -> List[Dict]:
+        """Records for the startup phases of an entry point, plus their total"""
+        records = [
+            ResultsOperations._record('startup', 'host', {'mode': mode, 'phase': phase['name']},
+                                      summarize([phase['seconds']]), extra={'packages': phase['packages']})
+            for phase in phases
+        ]
+        if phases:
+            records.append(ResultsOperations._record(
+                'startup', 'host', {'mode': mode, 'phase': 'total'},
+                summarize([sum(phase['seconds'] for phase in phases)])
+            ))
+        return records
+
+    def save_run(self, kind: str, records: List[Dict], device_info: Dict, config: Dict) -> Optional[str]:
+        """
+        Write the records of one run
+        Args:
+            kind: Run kind ('matrix', 'image' or 'startup')
+            records: Measurement records from matrix_records / image_records
+            device_info: Device information dictionary
+            config: Run configuration (warmup, repeats, ...) stored with every record
+        Returns:
+            URI of the records object, or None when there is nothing to write
+        """
+        if not records:
+            return None
+        metadata = run_metadata()
+        lines = []
+        for record in records:
+            lines.append(json.dumps({
+                'schema': SCHEMA_VERSION,
+                **metadata,
+                'kind': kind,
+                'device_info': device_info,
+                'config': config,
+                **record
+            }, sort_keys=True, default=str))
+        stamp = datetime.fromisoformat(metadata['timestamp']).strftime('%Y%m%dT%H%M%SZ')
+        key = f"{self.records_folder}/{kind}_{stamp}_{metadata['run_id']}.jsonl"
+        return self.s3_ops.put_bytes(key, ('\n'.join(lines) + '\n').encode())
+
+    def load_batch_limits(self) -> Dict[str, int]:
+        """
+        Sustainable batch sizes recorded by earlier runs
+        Returns:
+            Batch size by work key (device, mode, shape and dtype); empty when none were recorded
+        """
+        try:
+            document = json.loads(self.s3_ops.get_bytes(f"{self.folder}/{BATCH_LIMITS_NAME}"))
+        except FileNotFoundError:
+            return {}
+        except Exception as e:
+            # botocore's ClientError, matched by its response so local runs need no botocore
+            if getattr(e, 'response', {}).get('Error', {}).get('Code') not in ('NoSuchKey', '404'):
+                raise
+            return {}
+        return document.get('limits', {})
+
+    def save_batch_limits(self, limits: Dict[str, int]) -> str:
+        """Store the sustainable batch sizes for later runs, returning the object URI"""
+        document = {'schema': SCHEMA_VERSION, **run_metadata(), 'limits': limits}
+        return self.s3_ops.put_bytes(f"{self.folder}/{BATCH_LIMITS_NAME}",
+                                     json.dumps(document, indent=2, sort_keys=True).encode())
+
+    def load_history(self, kind: Optional[str] = None) -> List[Dict]:
+        """
+        Load every stored record
+        Args:
+            kind: Only load runs of this kind
+        Returns:
+            List of records in run order
+        """
+        records = []
+        for obj in self.s3_ops.iter_objects(self.records_folder, suffixes=('.jsonl',)):
+            name = obj['key'].rsplit('/', 1)[-1]
+            if kind and not name.startswith(f"{kind}_"):
+                continue
+            for line in self.s3_ops.get_bytes(obj['key']).decode().splitlines():
+                if line.strip():
+                    records.append(json.loads(line))
+        records.sort(key=lambda record: record['timestamp'])
+        return records
+
+    @staticmethod
+    def series_key(record: Dict) -> Tuple[str, str, str]:
+        """What makes two records comparable: benchmark, device and parameters"""
+        return record['benchmark'], record['device'], json.dumps(record['params'], sort_keys=True)
+
+    @staticmethod
+    def image_tags(history: List[Dict]) -> List[str]:
+        """Image tags in order of their first run"""
+        tags = []
+        for record in history:
+            if record['image_tag'] not in tags:
+                tags.append(record['image_tag'])
+        return tags
+
+    @staticmethod
+    def aggregate(history: List[Dict]) -> List[Dict]:
+        """
+        Summarize history per series and image tag
+        Returns:
+            List of dictionaries with benchmark, device, params, image_tag, runs,
+            samples and the median over all pooled samples
+        """
+        groups: Dict[Tuple, Dict] = {}
+        for record in history:
+            if record['metric'] != 'seconds':
+                continue
+            group = groups.setdefault(ResultsOperations.series_key(record) + (record['image_tag'],), {
+                'benchmark': record['benchmark'],
+                'device': record['device'],
+                'params': record['params'],
+                'image_tag': record['image_tag'],
+                'run_ids': set(),
+                'samples': []
+            })
+            group['run_ids'].add(record['run_id'])
+            group['samples'].extend(record['stats']['samples'])
+        rows = []
+        for group in groups.values():
+            rows.append({
+                'benchmark': group['benchmark'],
+                'device': group['device'],
+                'params': group['params'],
+                'image_tag': group['image_tag'],
+                'runs': len(group['run_ids']),
+                'samples': len(group['samples']),
+                'median': float(np.median(group['samples']))
+            })
+        return rows
+
+    @staticmethod
+    def detect_regressions(history: List[Dict], baseline_tag: str, candidate_tag: str,
+                           alpha: float = 0.01, min_slowdown: float = 0.05) -> List[Dict]:
+        """
+        Compare every series measured under both image tags
+
+        Samples of all runs with the same tag are pooled. A series is flagged
+        as a regression when the candidate is slower with p < alpha
+        (one-sided Mann-Whitney U) and its median is at least min_slowdown
+        slower, so that tiny but consistent differences are not reported;
+        the mirrored test flags improvements.
+        Args:
+            history: Records from load_history
+            baseline_tag: Image tag to compare against
+            candidate_tag: Image tag under test
+            alpha: Significance level
+            min_slowdown: Minimum relative change of the median to flag
+        Returns:
+            List of comparisons with medians, ratio, p-values and a status of
+            'regression', 'improvement' or 'unchanged'
+        """
+        pooled: Dict[Tuple, Dict[str, List[float]]] = {}
+        for record in history:
+            if record['metric'] != 'seconds' or record['image_tag'] not in (baseline_tag, candidate_tag):
+                continue
+            series = pooled.setdefault(ResultsOperations.series_key(record), {baseline_tag: [], candidate_tag: []})
+            series[record['image_tag']].extend(record['stats']['samples'])
+
+        comparisons = []
+        for (benchmark, device, params), samples in sorted(pooled.items()):
+            baseline, candidate = samples[baseline_tag], samples[candidate_tag]
+            if not baseline or not candidate:
+                continue
+            baseline_median = float(np.median(baseline))
+            candidate_median = float(np.median(candidate))
+            ratio = candidate_median / baseline_median if baseline_median > 0 else float('inf')
+            p_slower = mann_whitney_greater(candidate, baseline)
+            p_faster = mann_whitney_greater(baseline, candidate)
+            status = 'unchanged'
+            if p_slower < alpha and ratio >= 1 + min_slowdown:
+                status = 'regression'
+            elif p_faster < alpha and ratio <= 1 / (1 + min_slowdown):
+                status = 'improvement'
+            comparisons.append({
+                'benchmark': benchmark,
+                'device': device,
+                'params': json.loads(params),
+                'baseline_median': baseline_median,
+                'candidate_median': candidate_median,
+                'baseline_samples': len(baseline),
+                'candidate_samples': len(candidate),
+                'ratio': ratio,
+                'p_value': p_slower if ratio >= 1 else p_faster,
+                'status': status
+            })
+        return comparisons
\ No newline at end of file
@@ -1 +1,6 @@
-from .s3_operations import S3Operations
\ No newline at end of file
+def __getattr__(name):
+    # Loaded on first use so that s3_operations.s3_client can be imported on its own
+    if name == 'S3Operations':
+        from .s3_operations import S3Operations
+        return S3Operations
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
\ No newline at end of file
@@ -0,0 +1,172 @@
+import hashlib
+import mmap
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Iterator, Tuple
+from .storage import StorageBackend
+
+
+def release(data):
+    """
+    Unmap a memory-mapped cache hit once its bytes are no longer needed
+
+    Other bytes-like objects are left to the garbage collector, as are maps
+    still exported elsewhere (e.g. through a memoryview).
+    """
+    if isinstance(data, mmap.mmap):
+        try:
+            data.close()
+        except BufferError:
+            pass
+
+
+class CachedBackend(StorageBackend):
+    """
+    Read-through disk cache in front of another storage backend
+
+    Objects are cached on first read under a name derived from their key and
+    ETag, so a changed object is simply a miss and its old copy ages out.
+    Lookups use the ETag of the latest listing (or a HEAD when a key was not
+    listed), while fetched bytes are stored under the ETag of the GET that
+    returned them, so an object replaced in between is never cached under
+    the listed version. Hits are served as read-only memory maps of the
+    cached file, which lets the page cache serve repeated runs without
+    copying into the process; release() unmaps them when done.
+    The cache is capped at max_bytes and evicts least recently used files;
+    recency survives restarts through the files' modification times.
+    """
+
+    def __init__(self, backend: StorageBackend, cache_dir: str, max_bytes: int):
+        """
+        Args:
+            backend: Backend that misses are read from and writes go to
+            cache_dir: Local directory for cached objects (e.g. on node NVMe)
+            max_bytes: Upper bound for the total size of cached objects
+        """
+        self.backend = backend
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.metrics = backend.metrics
+        self.stats = {'hits': 0, 'misses': 0, 'bytes_from_cache': 0, 'bytes_fetched': 0, 'evictions': 0}
+        self._etags: Dict[str, str] = {}
+        # Cached file name -> size, least recently used first
+        self._entries: OrderedDict = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+        self._load_index()
+
+    @property
+    def s3_client(self):
+        return self.backend.s3_client
+
+    def _load_index(self):
+        """Rebuild the LRU order from files left by earlier runs"""
+        files = []
+        for entry in os.scandir(self.cache_dir):
+            if entry.is_file() and not entry.name.startswith('.tmp-'):
+                stat = entry.stat()
+                files.append((stat.st_mtime_ns, entry.name, stat.st_size))
+        for _, name, size in sorted(files):
+            self._entries[name] = size
+            self._bytes += size
+        with self._lock:
+            self._evict()
+
+    def _evict(self):
+        """Remove least recently used files until the cache fits (lock held)"""
+        while self._bytes > self.max_bytes and self._entries:
+            name, size = self._entries.popitem(last=False)
+            self._bytes -= size
+            self.stats['evictions'] += 1
+            try:
+                os.unlink(os.path.join(self.cache_dir, name))
+            except FileNotFoundError:
+                pass
+
+    @staticmethod
+    def _filename(key: str, etag: str) -> str:
+        return hashlib.sha256(f"{key}\0{etag}".encode()).hexdigest()
+
+    @staticmethod
+    def _map(path: str):
+        """Read-only memory map of a cached file"""
+        with open(path, 'rb') as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return bytearray()
+            return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def _store(self, name: str, data):
+        """Write a fetched object into the cache"""
+        size = len(data)
+        if size > self.max_bytes:
+            return
+        fd, tmp_path = tempfile.mkstemp(prefix='.tmp-', dir=self.cache_dir)
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, os.path.join(self.cache_dir, name))
+        except OSError:
+            # A full or failing cache disk must not fail the read itself
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            return
+        with self._lock:
+            if name not in self._entries:
+                self._entries[name] = size
+                self._bytes += size
+            self._evict()
+
+    def list_objects(self, prefix: str, **kwargs) -> Iterator[Dict]:
+        for record in self.backend.list_objects(prefix, **kwargs):
+            self._etags[record['key']] = record['etag']
+            yield record
+
+    def head(self, key: str) -> Dict:
+        record = self.backend.head(key)
+        self._etags[key] = record['etag']
+        return record
+
+    def get_with_etag(self, key: str) -> Tuple[Any, str]:
+        etag = self._etags.get(key) or self.head(key)['etag']
+        name = self._filename(key, etag)
+        path = os.path.join(self.cache_dir, name)
+
+        with self._lock:
+            hit = name in self._entries
+            if hit:
+                self._entries.move_to_end(name)
+        if hit:
+            try:
+                data = self._map(path)
+                os.utime(path)
+            except FileNotFoundError:
+                # Removed behind our back, e.g. by another process sharing the directory
+                with self._lock:
+                    self._bytes -= self._entries.pop(name, 0)
+            else:
+                with self._lock:
+                    self.stats['hits'] += 1
+                    self.stats['bytes_from_cache'] += len(data)
+                return data, etag
+
+        data, etag = self.backend.get_with_etag(key)
+        self._etags[key] = etag
+        self._store(self._filename(key, etag), data)
+        with self._lock:
+            self.stats['misses'] += 1
+            self.stats['bytes_fetched'] += len(data)
+        return data, etag
+
+    def put(self, key: str, data) -> str:
+        self._etags.pop(key, None)
+        return self.backend.put(key, data)
+
+    def copy(self, source_key: str, key: str) -> str:
+        self._etags.pop(key, None)
+        return self.backend.copy(source_key, key)
+
+    def uri(self, key: str) -> str:
+        return self.backend.uri(key)
\ No newline at end of file
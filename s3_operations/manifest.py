@@ -0,0 +1,137 @@
+import hashlib
+import json
+import threading
+from datetime import datetime
+from typing import Dict, Optional
+
+MANIFEST_NAME = '_manifest.json'
+MANIFEST_VERSION = 1
+
+
+def params_hash(params: Dict) -> str:
+    """Stable short hash of the pipeline parameters"""
+    encoded = json.dumps(params, sort_keys=True, separators=(',', ':')).encode()
+    return hashlib.sha256(encoded).hexdigest()[:16]
+
+
+class ProcessingManifest:
+    """
+    Record of which raw images have already been processed, stored in S3
+
+    Entries map a source key to the ETag and size it had when processed and
+    the output key it was written to. The whole manifest is tagged with a
+    hash of the pipeline parameters; when the parameters change, every entry
+    is stale and is dropped on load. Sources are also indexed by content
+    (ETag and size), so byte-identical images under other keys can reuse an
+    existing output with a server-side copy instead of being reprocessed.
+    """
+
+    def __init__(self, s3_ops, processed_folder: str, params: Dict):
+        """
+        Args:
+            s3_ops: S3Operations used to read and write the manifest
+            processed_folder: Folder holding the processed images and the manifest
+            params: Parameters that determine the processed output
+        """
+        self.s3_ops = s3_ops
+        self.processed_folder = processed_folder.rstrip('/')
+        self.key = f"{self.processed_folder}/{MANIFEST_NAME}"
+        self.params = params
+        self.params_hash = params_hash(params)
+        self.entries: Dict[str, Dict] = {}
+        self.invalidated = 0
+        self._outputs = set()
+        # Content ID -> output key of the latest source processed with that content
+        self._content_outputs: Dict[str, str] = {}
+        self._seen = set()
+        self._lock = threading.Lock()
+
+    def load(self) -> int:
+        """
+        Read the manifest and the list of existing outputs from S3
+        Returns:
+            Number of entries still valid for the current parameters
+        """
+        try:
+            document = json.loads(self.s3_ops.get_bytes(self.key))
+        except FileNotFoundError:
+            document = {}
+        except Exception as e:
+            # botocore's ClientError, matched by its response so local runs need no botocore
+            if getattr(e, 'response', {}).get('Error', {}).get('Code') not in ('NoSuchKey', '404'):
+                raise
+            document = {}
+
+        entries = document.get('entries', {})
+        if document.get('version') == MANIFEST_VERSION and document.get('params_hash') == self.params_hash:
+            self.entries = entries
+        else:
+            self.entries = {}
+            self.invalidated = len(entries)
+        self._content_outputs = {entry['content']: entry['output_key'] for entry in self.entries.values()}
+
+        # Outputs deleted since the last run must be produced again. Listed
+        # without a suffix filter: outputs may be in any format (e.g. .webp)
+        self._outputs = {record['key'] for record in self.s3_ops.iter_objects(self.processed_folder)}
+        return len(self.entries)
+
+    @staticmethod
+    def content_id(record: Dict) -> str:
+        """
+        Content identity of a listed object
+
+        Single-part ETags are the MD5 of the body; multipart ETags hash the
+        part digests, so equal IDs always mean equal bytes while the same
+        bytes uploaded with other part sizes are simply not matched.
+        LocalBackend's default ETags identify the file rather than its
+        bytes, so duplicates are only found there with content_etags.
+        """
+        return f"{record['etag']}:{record['size']}"
+
+    def is_current(self, record: Dict) -> bool:
+        """Whether a listed source was processed unchanged with the current parameters"""
+        with self._lock:
+            self._seen.add(record['key'])
+            entry = self.entries.get(record['key'])
+            return (entry is not None
+                    and entry['content'] == self.content_id(record)
+                    and entry['output_key'] in self._outputs)
+
+    def output_for_content(self, record: Dict) -> Optional[str]:
+        """Existing output key of a source with the same content, if any"""
+        with self._lock:
+            output_key = self._content_outputs.get(self.content_id(record))
+            return output_key if output_key in self._outputs else None
+
+    def record(self, record: Dict, output_key: str):
+        """Remember that a source was written to output_key"""
+        content = self.content_id(record)
+        with self._lock:
+            self.entries[record['key']] = {
+                'content': content,
+                'output_key': output_key,
+                'processed_at': datetime.now().isoformat(timespec='seconds')
+            }
+            self._content_outputs[content] = output_key
+            self._outputs.add(output_key)
+
+    def save(self, prune_unseen: bool = False) -> str:
+        """
+        Write the manifest back to S3
+        Args:
+            prune_unseen: Drop entries for sources not listed in this run
+                (only safe after a complete listing)
+        Returns:
+            URI of the manifest
+        """
+        with self._lock:
+            entries = self.entries
+            if prune_unseen:
+                entries = {key: entry for key, entry in entries.items() if key in self._seen}
+            document = {
+                'version': MANIFEST_VERSION,
+                'params_hash': self.params_hash,
+                'params': self.params,
+                'entries': entries
+            }
+        return self.s3_ops.put_bytes(self.key, json.dumps(document, indent=1, sort_keys=True).encode())
\ No newline at end of file
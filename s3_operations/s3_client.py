@@ -1,16 +1,116 @@
 import boto3
 from botocore.config import Config
-from botocore.exceptions import ClientError, ReadTimeoutError
+from botocore.exceptions import ReadTimeoutError, ResponseStreamingError
+import bisect
+import threading
 import time
 import numpy as np
-from typing import Any, Dict
+from typing import Any, Callable, Dict
 import logging
 
+# Upper bounds (seconds) of the latency histogram buckets; the last one is open
+LATENCY_BUCKETS = (0.001, 0.002, 0.005, 0.01, 0.02, 0.05, 0.1, 0.2, 0.5, 1.0, 2.0, 5.0, 10.0, float('inf'))
+
+
+class S3Metrics:
+    """
+    Client-side metrics per S3 operation
+
+    Latency is measured from the start of an API call until its response
+    headers are parsed, including botocore's own retries; streaming a body
+    afterwards is not part of it. Bytes are counted from request bodies
+    and response Content-Length.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.operations: Dict[str, Dict[str, Any]] = {}
+
+    def _operation(self, name: str) -> Dict[str, Any]:
+        if name not in self.operations:
+            self.operations[name] = {
+                'calls': 0,
+                'errors': 0,
+                'retries': 0,
+                'bytes_sent': 0,
+                'bytes_received': 0,
+                'total_time': 0.0,
+                'max_time': 0.0,
+                'histogram': [0] * len(LATENCY_BUCKETS)
+            }
+        return self.operations[name]
+
+    def record_call(self, name: str, seconds: float, retries: int = 0, bytes_sent: int = 0,
+                    bytes_received: int = 0, error: bool = False):
+        """Record one completed API call"""
+        with self._lock:
+            operation = self._operation(name)
+            operation['calls'] += 1
+            operation['errors'] += int(error)
+            operation['retries'] += retries
+            operation['bytes_sent'] += bytes_sent
+            operation['bytes_received'] += bytes_received
+            operation['total_time'] += seconds
+            operation['max_time'] = max(operation['max_time'], seconds)
+            operation['histogram'][bisect.bisect_left(LATENCY_BUCKETS, seconds)] += 1
+
+    def record_retry(self, name: str):
+        """Record a retry made outside botocore (e.g. after a broken body stream)"""
+        with self._lock:
+            self._operation(name)['retries'] += 1
+
+    @staticmethod
+    def _percentile(histogram, fraction: float) -> float:
+        """Upper bound of the bucket holding the given fraction of calls"""
+        target = fraction * sum(histogram)
+        seen = 0
+        for bound, count in zip(LATENCY_BUCKETS, histogram):
+            seen += count
+            if count and seen >= target:
+                return bound
+        return 0.0
+
+    def summary(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Snapshot of the metrics
+        Returns:
+            Per-operation dictionaries with counts, bytes, mean/max latency and
+            histogram-based p50/p95 (bucket upper bounds capped at the max, in seconds)
+        """
+        with self._lock:
+            summary = {}
+            for name, operation in sorted(self.operations.items()):
+                histogram = list(operation['histogram'])
+                summary[name] = {
+                    **operation,
+                    'histogram': histogram,
+                    'mean_time': operation['total_time'] / operation['calls'] if operation['calls'] else 0.0,
+                    'p50_time': min(self._percentile(histogram, 0.5), operation['max_time']),
+                    'p95_time': min(self._percentile(histogram, 0.95), operation['max_time'])
+                }
+            return summary
+
+    def reset(self):
+        with self._lock:
+            self.operations = {}
+
 
 class S3Client:
-    def __init__(self, credentials: Dict[str, str], max_retries: int = 5):
+    """
+    Shared, tuned S3 client
+
+    One boto3 client with a pooled connection config and adaptive retries,
+    instrumented through botocore's event hooks so that every call made
+    with it is recorded in `metrics`. boto3 clients are thread-safe, so a
+    single instance serves all transfer threads.
+    """
+
+    def __init__(self, credentials: Dict[str, str], max_retries: int = 5,
+                 max_pool_connections: int = 50):
         self.credentials = credentials
         self.max_retries = max_retries
+        self.max_pool_connections = max_pool_connections
+        self.metrics = S3Metrics()
         self.client = self._initialize_client()
         self.logger = logging.getLogger(__name__)
 
@@ -18,19 +118,89 @@ class S3Client:
         config = Config(
             connect_timeout=30,
             read_timeout=60,
-            retries={'max_attempts': 5, 'mode': 'adaptive'},
-            max_pool_connections=50,
+            retries={'max_attempts': self.max_retries, 'mode': 'adaptive'},
+            max_pool_connections=self.max_pool_connections,
             tcp_keepalive=True
         )
-        return boto3.client(
+        client = boto3.client(
             's3',
             endpoint_url=self.credentials['aws_endpoint_url'],
             aws_access_key_id=self.credentials['aws_access_key_id'],
             aws_secret_access_key=self.credentials['aws_secret_access_key'],
             config=config
         )
+        events = client.meta.events
+        events.register('before-call.s3', self._before_call)
+        events.register('after-call.s3', self._after_call)
+        events.register('after-call-error.s3', self._after_call_error)
+        return client
+
+    @staticmethod
+    def _body_size(body) -> int:
+        if isinstance(body, (bytes, bytearray)):
+            return len(body)
+        if hasattr(body, 'seek') and hasattr(body, 'tell'):
+            position = body.tell()
+            size = body.seek(0, 2)
+            body.seek(position)
+            return size - position
+        return 0
+
+    def _before_call(self, params=None, model=None, context=None, **kwargs):
+        context['metrics_start'] = time.perf_counter()
+        context['metrics_operation'] = model.name
+        context['metrics_bytes_sent'] = self._body_size(params.get('body'))
+
+    def _after_call(self, http_response=None, parsed=None, model=None, context=None, **kwargs):
+        if 'metrics_start' not in context:
+            return
+        retries = parsed.get('ResponseMetadata', {}).get('RetryAttempts', 0)
+        self.metrics.record_call(
+            context.pop('metrics_operation'),
+            time.perf_counter() - context.pop('metrics_start'),
+            retries=retries,
+            bytes_sent=context.pop('metrics_bytes_sent', 0),
+            bytes_received=parsed.get('ContentLength', 0) if 'Body' in parsed else 0,
+            error=http_response.status_code >= 300
+        )
+
+    def _after_call_error(self, exception=None, context=None, **kwargs):
+        # Raised after botocore gave up, e.g. on connection errors
+        if 'metrics_start' not in context:
+            return
+        self.metrics.record_call(
+            context.pop('metrics_operation'),
+            time.perf_counter() - context.pop('metrics_start'),
+            bytes_sent=context.pop('metrics_bytes_sent', 0),
+            error=True
+        )
 
     def _exponential_backoff(self, attempt: int) -> float:
         base_delay = min(300, 2 ** attempt)
         jitter = np.random.uniform(0, 0.1 * base_delay)
-        return base_delay + jitter
\ No newline at end of file
+        return base_delay + jitter
+
+    def with_retries(self, operation: str, fn: Callable[[], Any]) -> Any:
+        """
+        Run fn, retrying failures botocore does not retry itself
+
+        botocore retries requests up to the point the response headers
+        arrive; a body stream that breaks or stalls while being read is
+        surfaced to the caller instead. Those are retried here with
+        exponential backoff.
+        Args:
+            operation: Operation name the retries are recorded under
+            fn: Zero-argument callable making the request and reading its body
+        Returns:
+            Result of fn
+        """
+        for attempt in range(self.max_retries):
+            try:
+                return fn()
+            except (ReadTimeoutError, ResponseStreamingError, IOError) as e:
+                if attempt == self.max_retries - 1:
+                    raise
+                self.metrics.record_retry(operation)
+                delay = self._exponential_backoff(attempt)
+                self.logger.warning(f"{operation} failed while streaming ({e}), retrying in {delay:.1f}s")
+                time.sleep(delay)
\ No newline at end of file
@@ -1,23 +1,157 @@
-import boto3
 import io
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from datetime import datetime
 from rich.console import Console
-from typing import List, Dict
+from typing import List, Dict, Iterable, Iterator, Optional, Tuple
+from .disk_cache import CachedBackend, release
+from .storage import S3Backend, StorageBackend
+from tracing.tracer import tracer
 
 
 console = Console()
 
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg')
+
+# Yielded by a transfer producer that has no item ready yet (see _run_transfers)
+IDLE = object()
+
 
 class S3Operations:
-    def __init__(self, credentials, bucket_name):
-        """Initialize S3 operations with credentials and bucket name"""
+    def __init__(self, credentials, bucket_name, max_workers: int = 16,
+                 multipart_threshold: int = 64 * 1024**2, part_size: int = 16 * 1024**2,
+                 part_workers: int = 8, backend: Optional[StorageBackend] = None,
+                 cache_dir: Optional[str] = None, cache_max_bytes: int = 10 * 1024**3):
+        """
+        Initialize S3 operations with credentials and bucket name
+        Args:
+            credentials: Endpoint URL and access keys
+            bucket_name: Bucket to operate on
+            max_workers: Concurrent object transfers
+            multipart_threshold: Objects larger than this are transferred in parallel parts
+            part_size: Size of each ranged GET / multipart upload part
+            part_workers: Concurrent part transfers, shared by all large objects
+            backend: Storage backend to use instead of S3 (credentials and bucket are then ignored)
+            cache_dir: Directory for a read-through disk cache of downloaded objects (None disables it)
+            cache_max_bytes: Size cap of the disk cache
+        """
         self.bucket_name = bucket_name
-        self.s3_client = boto3.client(
-            's3',
-            endpoint_url=credentials['aws_endpoint_url'],
-            aws_access_key_id=credentials['aws_access_key_id'],
-            aws_secret_access_key=credentials['aws_secret_access_key']
+        self.max_workers = max_workers
+        if backend is None:
+            # Keep at least one pooled connection per transfer and part worker so
+            # that concurrent requests reuse connections instead of opening new ones
+            backend = S3Backend(
+                credentials,
+                bucket_name,
+                multipart_threshold=multipart_threshold,
+                part_size=part_size,
+                part_workers=part_workers,
+                max_pool_connections=max(50, max_workers + part_workers)
+            )
+        if cache_dir:
+            backend = CachedBackend(backend, cache_dir, cache_max_bytes)
+        self.backend = backend
+        self.metrics = backend.metrics
+        self.cache_stats = backend.stats if cache_dir else None
+
+    @property
+    def s3_client(self):
+        """boto3 client of the S3 backend (also reachable through a cache wrapping it)"""
+        return self.backend.s3_client
+
+    def uri(self, key: str) -> str:
+        """URI of a key in the storage backend"""
+        return self.backend.uri(key)
+
+    def get_image(self, key: str):
+        """
+        Get image data from storage
+        
+        Args:
+            key: Object key
+        
+        Returns:
+            Image data as a bytes-like object (bytearray, or mmap for disk cache hits)
+        """
+        return self.backend.get(key)
+
+    def get_bytes(self, key: str) -> bytes:
+        """
+        Get an object as bytes, unmapping a disk cache hit straight away
+        
+        Args:
+            key: Object key
+        
+        Returns:
+            Object data as bytes
+        """
+        data = self.get_image(key)
+        try:
+            return bytes(data)
+        finally:
+            release(data)
+
+    @staticmethod
+    def release_image(data):
+        """Unmap data returned by get_image or download_images once it is no longer needed"""
+        release(data)
+
+    def put_bytes(self, key: str, data) -> str:
+        """
+        Upload bytes to storage
+        
+        Args:
+            key: Destination object key
+            data: Bytes-like object to upload
+        
+        Returns:
+            URI of the uploaded object
+        """
+        return self.backend.put(key, data)
+
+    def iter_objects(self, folder: str, suffixes: Optional[Tuple[str, ...]] = None,
+                     prefetch: bool = True, fan_out: bool = False,
+                     max_workers: int = 8, page_size: int = 1000) -> Iterator[Dict]:
+        """
+        Stream object records from the specified folder
+        
+        Args:
+            folder: Folder path in the bucket
+            suffixes: Optional tuple of lowercase key suffixes to keep
+            prefetch: Request the next page while the current one is consumed
+            fan_out: List each sub-prefix of the folder concurrently
+            max_workers: Maximum number of concurrent sub-prefix listings
+            page_size: Keys requested per list_objects_v2 call (max 1000)
+        
+        Yields:
+            Dictionaries with key, size, etag and last_modified
+        """
+        # Ensure folder path ends with '/'
+        folder = folder.rstrip('/') + '/'
+
+        records = self.backend.list_objects(
+            folder,
+            prefetch=prefetch,
+            fan_out=fan_out,
+            max_workers=max_workers,
+            page_size=page_size
         )
+        for record in records:
+            if suffixes is None or record['key'].lower().endswith(suffixes):
+                yield record
+
+    def iter_image_files(self, folder: str, **kwargs) -> Iterator[Dict]:
+        """
+        Stream image object records from the specified folder
+        
+        Args:
+            folder: Folder path in the bucket
+            **kwargs: Listing options forwarded to iter_objects
+        
+        Yields:
+            Image object records
+        """
+        return self.iter_objects(folder, suffixes=IMAGE_EXTENSIONS, **kwargs)
 
     def count_txt_files(self, folder: str) -> int:
         """
@@ -30,20 +164,7 @@ class S3Operations:
             Integer count of .txt files
         """
         try:
-            # Ensure folder path ends with '/'
-            folder = folder.rstrip('/') + '/'
-            
-            response = self.s3_client.list_objects_v2(
-                Bucket=self.bucket_name,
-                Prefix=folder
-            )
-            
-            if 'Contents' not in response:
-                return 0
-                
-            txt_files = [obj for obj in response['Contents'] 
-                        if obj['Key'].endswith('.txt')]
-            return len(txt_files)
+            return sum(1 for _ in self.iter_objects(folder, suffixes=('.txt',)))
         except Exception as e:
             console.print(f"[red]Error counting txt files: {str(e)}[/]")
             return 0
@@ -59,38 +180,27 @@ class S3Operations:
             List of image file keys
         """
         try:
-            # Ensure folder path ends with '/'
-            folder = folder.rstrip('/') + '/'
-            
-            response = self.s3_client.list_objects_v2(
-                Bucket=self.bucket_name,
-                Prefix=folder
-            )
-            
-            if 'Contents' not in response:
-                return []
-                
-            image_files = [
-                obj['Key'] for obj in response['Contents']
-                if obj['Key'].lower().endswith(('.png', '.jpg', '.jpeg'))
-            ]
-            return image_files
+            return [record['key'] for record in self.iter_image_files(folder)]
         except Exception as e:
             console.print(f"[red]Error listing image files: {str(e)}[/]")
             return []
 
-    def get_image(self, key: str) -> bytes:
+    @staticmethod
+    def processed_key(original_key: str, processed_folder: str, suffix: Optional[str] = None) -> str:
         """
-        Get image data from S3
-        
+        Build the processed images folder key for an original image key
         Args:
-            key: S3 object key
-        
-        Returns:
-            Image data as bytes
+            original_key: Original image key
+            processed_folder: Destination folder path
+            suffix: Extension replacing the original one (e.g. .jpg), for
+                outputs encoded in another format
         """
-        response = self.s3_client.get_object(Bucket=self.bucket_name, Key=key)
-        return response['Body'].read()
+        # Get original filename from the full key
+        filename = original_key.split('/')[-1]
+        if suffix is not None:
+            stem, dot, _ = filename.rpartition('.')
+            filename = f"{stem if dot else filename}{suffix}"
+        return f"{processed_folder.rstrip('/')}/{filename}"
 
     def save_processed_image(self, original_key: str, image_data: bytes, 
                            raw_folder: str, processed_folder: str) -> str:
@@ -106,21 +216,193 @@ class S3Operations:
         Returns:
             S3 URI of saved file
         """
-        # Get original filename from the full key
-        filename = original_key.split('/')[-1]
-        
         # Create new key in processed folder
-        new_key = f"{processed_folder.rstrip('/')}/{filename}"
+        new_key = self.processed_key(original_key, processed_folder)
+        
+        return self.put_bytes(new_key, image_data)
+
+    def _run_transfers(self, transfer, items: Iterable, max_workers: Optional[int],
+                       ordered: bool, name: str) -> Iterator[Dict]:
+        """
+        Run `transfer(item)` for every item on a bounded worker pool
+
+        At most 2 * max_workers transfers are in flight at once, so large
+        inputs are streamed rather than submitted (and buffered) all at once.
+        Exceptions are captured per item instead of aborting the batch.
+        Each transfer is traced as a span called `name`.
+
+        A producer that has nothing ready can yield IDLE instead of blocking:
+        no transfer is submitted, but finished ones are yielded, so a consumer
+        that frees resources per result (e.g. the pipeline's memory budget)
+        is never stuck waiting on the producer.
+        """
+        max_workers = max_workers or self.max_workers
+
+        def timed(item):
+            key = item[0] if isinstance(item, tuple) else item
+            with tracer.span(name, 's3', key=key) as span:
+                try:
+                    record = transfer(item)
+                    record['error'] = None
+                except Exception as e:
+                    record = {'key': key, 'bytes': 0, 'error': str(e)}
+            record['elapsed'] = span.duration
+            return record
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            pending = deque()
+            for item in items:
+                if item is not IDLE:
+                    pending.append(executor.submit(timed, item))
+                # Finished transfers are yielded right away, not only once the window is full,
+                # so a slow producer (e.g. the pipeline's encode stage) sees them as they complete
+                while pending and (len(pending) >= 2 * max_workers or
+                                   (pending[0].done() if ordered else any(f.done() for f in pending))):
+                    if ordered:
+                        yield pending.popleft().result()
+                    else:
+                        yield from self._pop_completed(pending)
+            while pending:
+                if ordered:
+                    yield pending.popleft().result()
+                else:
+                    yield from self._pop_completed(pending)
+
+    @staticmethod
+    def _pop_completed(pending: deque, timeout: Optional[float] = None) -> Iterator[Dict]:
+        """
+        Yield and remove completed futures, waiting for at least one
+
+        Whichever transfer finishes first is yielded, so a slow transfer at
+        the head does not hold back those that finished after it.
+        Args:
+            pending: Futures in flight
+            timeout: Longest wait for a completion (None waits until one finishes)
+        """
+        done, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+        for future in [f for f in pending if f in done]:
+            pending.remove(future)
+            yield future.result()
+
+    def download_images(self, keys: Iterable[str], max_workers: Optional[int] = None,
+                        ordered: bool = True) -> Iterator[Dict]:
+        """
+        Download objects concurrently
+        
+        Args:
+            keys: Object keys to download
+            max_workers: Number of concurrent GETs (defaults to self.max_workers)
+            ordered: Yield results in input order instead of completion order
         
-        self.s3_client.put_object(
-            Bucket=self.bucket_name,
-            Key=new_key,
-            Body=image_data
+        Yields:
+            Dictionaries with key, data, bytes, elapsed and error (None on success)
+        """
+        def download(key):
+            data = self.get_image(key)
+            return {'key': key, 'data': data, 'bytes': len(data)}
+
+        return self._run_transfers(download, keys, max_workers, ordered, 'download')
+
+    def upload_objects(self, items: Iterable[Tuple[str, bytes]], max_workers: Optional[int] = None,
+                       ordered: bool = True) -> Iterator[Dict]:
+        """
+        Upload objects concurrently
+        
+        Args:
+            items: (key, data) pairs to upload
+            max_workers: Number of concurrent PUTs (defaults to self.max_workers)
+            ordered: Yield results in input order instead of completion order
+        
+        Yields:
+            Dictionaries with key, uri, bytes, elapsed and error (None on success)
+        """
+        def upload(item):
+            key, data = item
+            return {'key': key, 'uri': self.put_bytes(key, data), 'bytes': len(data)}
+
+        return self._run_transfers(upload, items, max_workers, ordered, 'upload')
+
+    def copy_objects(self, items: Iterable[Tuple[str, str]], max_workers: Optional[int] = None,
+                     ordered: bool = True) -> Iterator[Dict]:
+        """
+        Copy objects within the bucket concurrently (server-side for S3, no data transfer)
+        
+        Args:
+            items: (source key, destination key) pairs
+            max_workers: Number of concurrent copies (defaults to self.max_workers)
+            ordered: Yield results in input order instead of completion order
+        
+        Yields:
+            Dictionaries with key (the destination), source, uri, bytes, elapsed and error
+        """
+        def copy(item):
+            source_key, key = item
+            return {'key': key, 'source': source_key, 'uri': self.backend.copy(source_key, key), 'bytes': 0}
+
+        return self._run_transfers(copy, items, max_workers, ordered, 'copy')
+
+    @staticmethod
+    def _write_stats(buffer: io.StringIO, label: str, stats: Optional[Dict]):
+        """Write one timing distribution line (seconds) to a results buffer"""
+        if not stats:
+            buffer.write(f"  {label}: N/A\n")
+            return
+        buffer.write(
+            f"  {label}: min {stats['min']:.6f} | median {stats['median']:.6f} | "
+            f"mean {stats['mean']:.6f} | p95 {stats['p95']:.6f} | std {stats['stddev']:.6f} "
+            f"(n={stats['repeats']}, warmup={stats['warmup']}, {stats['timer']})\n"
         )
+        buffer.write(f"    samples: {', '.join(f'{sample:.6f}' for sample in stats['samples'])}\n")
+
+    def _write_metrics(self, buffer: io.StringIO):
+        """Write the client-side S3 metrics and disk cache statistics gathered so far"""
+        if self.cache_stats:
+            buffer.write("\nDisk Cache:\n")
+            buffer.write("=====================================\n")
+            for k, value in self.cache_stats.items():
+                buffer.write(f"{k}: {value}\n")
         
-        return f"s3://{self.bucket_name}/{new_key}"
+        metrics = self.metrics.summary() if self.metrics is not None else None
+        if not metrics:
+            return
+        buffer.write("\nS3 Client Metrics:\n")
+        buffer.write("=====================================\n")
+        buffer.write(
+            f"{'Operation':<24} | {'Calls':>6} | {'Errors':>6} | {'Retries':>7} | {'Sent (MB)':>9} | "
+            f"{'Recv (MB)':>9} | {'Mean (ms)':>9} | {'p50 (ms)':>8} | {'p95 (ms)':>8} | {'Max (ms)':>8}\n"
+        )
+        for name, operation in metrics.items():
+            buffer.write(
+                f"{name:<24} | {operation['calls']:>6} | {operation['errors']:>6} | {operation['retries']:>7} | "
+                f"{operation['bytes_sent'] / 1024**2:>9.2f} | {operation['bytes_received'] / 1024**2:>9.2f} | "
+                f"{operation['mean_time'] * 1000:>9.2f} | {operation['p50_time'] * 1000:>8.0f} | "
+                f"{operation['p95_time'] * 1000:>8.0f} | {operation['max_time'] * 1000:>8.2f}\n"
+            )
+        buffer.write("(p50/p95 are latency histogram bucket upper bounds)\n")
 
-    def save_results(self, results: List[Dict], device_info: Dict, folder: str) -> str:
+    def _write_thread_sweep(self, buffer: io.StringIO, results: List[Dict], label: str, label_key: str):
+        buffer.write("\nCPU Thread Sweep:\n")
+        buffer.write("=====================================\n")
+        buffer.write(
+            f"{label:^12} | {'Threads':^7} | {'Pinned':^6} | {'Time (s)':^10} | {'Speedup':^8} | {'Efficiency':^10}\n"
+        )
+        buffer.write("-" * 68 + "\n")
+        for result in results:
+            speedup = f"{result['speedup']:.2f}" if result['speedup'] is not None else "N/A"
+            efficiency = f"{result['efficiency']:.2f}" if result['efficiency'] is not None else "N/A"
+            buffer.write(
+                f"{result[label_key]:^12} | {result['threads']:^7} | {str(result['pinned']):^6} | "
+                f"{result['time']:^10.6f} | {speedup:^8} | {efficiency:^10}\n"
+            )
+        for result in results:
+            buffer.write(f"{label} {result[label_key]}, {result['threads']} threads:\n")
+            self._write_stats(buffer, "CPU", result['stats'])
+
+    def save_results(self, results: List[Dict], device_info: Dict, folder: str,
+                     precision_results: Optional[List[Dict]] = None,
+                     out_of_core_results: Optional[List[Dict]] = None,
+                     thread_sweep: Optional[List[Dict]] = None,
+                     microbenchmarks: Optional[List[Dict]] = None) -> str:
         """
         Save matrix multiplication benchmark results
         
@@ -128,6 +410,10 @@ class S3Operations:
             results: List of benchmark results
             device_info: Device information dictionary
             folder: Destination folder for results
+            precision_results: Optional precision sweep results
+            out_of_core_results: Optional out-of-core matmul results
+            thread_sweep: Optional CPU thread sweep results
+            microbenchmarks: Optional compute and bandwidth microbenchmark results
         
         Returns:
             S3 URI of saved file
@@ -149,24 +435,88 @@ class S3Operations:
         
         buffer.write("\nBenchmark Results:\n")
         buffer.write("=====================================\n")
-        buffer.write(f"{'Matrix Size':^12} | {'CPU Time (s)':^12} | {'GPU Time (s)':^12} | {'Speedup':^12}\n")
-        buffer.write("-" * 55 + "\n")
+        buffer.write(f"{'Matrix Size':^12} | {'CPU Time (s)':^12} | {'GPU Time (s)':^12} | {'Speedup':^12} | {'CPU Threads':^11}\n")
+        buffer.write("-" * 69 + "\n")
         
         for result in results:
             gpu_time = f"{result['gpu_time']:.6f}" if result['gpu_time'] is not None else "N/A"
             speedup = f"{result['speedup']:.2f}x" if result['speedup'] is not None else "N/A"
-            buffer.write(f"{result['size']:^12} | {result['cpu_time']:^12.6f} | {gpu_time:^12} | {speedup:^12}\n")
+            buffer.write(f"{result['size']:^12} | {result['cpu_time']:^12.6f} | {gpu_time:^12} | {speedup:^12} | "
+                         f"{result.get('cpu_threads', 'N/A'):^11}\n")
         
-        self.s3_client.put_object(
-            Bucket=self.bucket_name,
-            Key=key,
-            Body=buffer.getvalue()
-        )
+        buffer.write("\nTiming Distributions (s):\n")
+        buffer.write("=====================================\n")
+        for result in results:
+            buffer.write(f"Matrix size {result['size']}:\n")
+            self._write_stats(buffer, "CPU", result.get('cpu_stats'))
+            self._write_stats(buffer, "GPU", result.get('gpu_stats'))
         
+        if precision_results:
+            buffer.write("\nPrecision Sweep:\n")
+            buffer.write("=====================================\n")
+            buffer.write(f"{'Matrix Size':^12} | {'Device':^6} | {'Precision':^9} | {'Time (s)':^10} | {'GFLOPS':^10}\n")
+            buffer.write("-" * 60 + "\n")
+            for result in precision_results:
+                if result['time'] is None:
+                    buffer.write(f"{result['size']:^12} | {result['device']:^6} | {result['precision']:^9} | "
+                                 f"{'N/A':^10} | {result['error']}\n")
+                    continue
+                buffer.write(f"{result['size']:^12} | {result['device']:^6} | {result['precision']:^9} | "
+                             f"{result['time']:^10.6f} | {result['gflops']:^10.1f}\n")
+            for result in precision_results:
+                if result['stats']:
+                    buffer.write(f"Matrix size {result['size']} {result['device']} {result['precision']}:\n")
+                    self._write_stats(buffer, "Time", result['stats'])
+        
+        if out_of_core_results:
+            buffer.write("\nOut-of-Core Matmul:\n")
+            buffer.write("=====================================\n")
+            for result in out_of_core_results:
+                if result['error']:
+                    buffer.write(f"Matrix size {result['size']} {result['device']}: failed: {result['error']}\n")
+                    continue
+                buffer.write(
+                    f"Matrix size {result['size']} {result['device']} ({result['tile']}x{result['tile']} tiles): "
+                    f"{result['total_time']:.3f} s, {result['gflops']:.1f} GFLOPS, "
+                    f"max relative error {result['max_relative_error']:.2e}\n"
+                )
+                buffer.write(
+                    f"  read {result['bytes_read'] / 1e9:.2f} GB in {result['read_time']:.3f} s, "
+                    f"wrote {result['bytes_written'] / 1e9:.2f} GB in {result['write_time']:.3f} s, "
+                    f"I/O {result['io_bandwidth_gbs']:.2f} GB/s, waited on I/O {result['io_wait_time']:.3f} s\n"
+                )
+        
+        if microbenchmarks:
+            buffer.write("\nMicrobenchmarks:\n")
+            buffer.write("=====================================\n")
+            for result in microbenchmarks:
+                params = ', '.join(f"{k}={v}" for k, v in result['params'].items())
+                if result['time'] is None:
+                    buffer.write(f"{result['kernel']} {result['device']} ({params}): skipped: {result['error']}\n")
+                    continue
+                gflops = f"{result['gflops']:.1f} GFLOPS, " if result['gflops'] else ""
+                intensity = f", {result['intensity']:.2f} FLOP/B" if result['intensity'] else ""
+                peak = (f", {result['bound']}-bound at {result['peak_fraction']:.1%} of peak"
+                        if result['peak_fraction'] is not None else "")
+                buffer.write(f"{result['kernel']} {result['device']} ({params}): {result['time']:.6f} s, "
+                             f"{gflops}{result['gbs']:.2f} GB/s{intensity}{peak}\n")
+                self._write_stats(buffer, "Time", result['stats'])
+        
+        if thread_sweep:
+            self._write_thread_sweep(buffer, thread_sweep, "Matrix Size", 'size')
+        
+        self._write_metrics(buffer)
+        
+        uri = self.put_bytes(key, buffer.getvalue().encode())
         buffer.close()
-        return f"s3://{self.bucket_name}/{key}"
+        return uri
 
-    def save_processing_results(self, results: List[Dict], device_info: Dict, processed_folder: str) -> str:
+    def save_processing_results(self, results: List[Dict], device_info: Dict, processed_folder: str,
+                                summary: Optional[Dict] = None, stages: Optional[Dict] = None,
+                                comparison: Optional[Dict] = None,
+                                thread_sweep: Optional[List[Dict]] = None,
+                                compile_comparison: Optional[List[Dict]] = None,
+                                encoding: Optional[Dict] = None) -> str:
         """Save image processing benchmark results"""
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         filename = f"processing_results_{timestamp}.txt"
@@ -187,15 +537,65 @@ class S3Operations:
         buffer.write("─" * 55 + "\n")
         
         for result in results:
+            cpu_time = f"{result['cpu_time']:.6f}" if result['cpu_time'] is not None else "N/A"
             gpu_time = f"{result['gpu_time']:.6f}" if result['gpu_time'] is not None else "N/A"
             speedup = f"{result['speedup']:.2f}x" if result['speedup'] is not None else "N/A"
-            buffer.write(f"{result['image_index']:^12} | {result['cpu_time']:^12.6f} | {gpu_time:^12} | {speedup:^12}\n")
+            buffer.write(f"{result['image_index']:^12} | {cpu_time:^12} | {gpu_time:^12} | {speedup:^12}\n")
         
-        self.s3_client.put_object(
-            Bucket=self.bucket_name,
-            Key=key,
-            Body=buffer.getvalue()
-        )
+        buffer.write("\nTiming Distributions per image (s):\n")
+        buffer.write("─" * 55 + "\n")
+        for result in results:
+            buffer.write(f"Image {result['image_index']}:\n")
+            self._write_stats(buffer, "CPU", result.get('cpu_stats'))
+            self._write_stats(buffer, "GPU", result.get('gpu_stats'))
+            for prefix in ('cpu', 'gpu'):
+                if result.get(f"{prefix}_compiled_stats"):
+                    self._write_stats(buffer, f"{prefix.upper()} compiled", result[f"{prefix}_compiled_stats"])
+        
+        if summary:
+            buffer.write("\nAggregate Throughput:\n")
+            buffer.write("─" * 55 + "\n")
+            for k, value in summary.items():
+                buffer.write(f"{k}: {value}\n")
+        
+        if comparison:
+            buffer.write("\nSampled Comparison:\n")
+            buffer.write("─" * 55 + "\n")
+            for k, value in comparison.items():
+                buffer.write(f"{k}: {value}\n")
+        
+        if encoding:
+            buffer.write("\nOutput Encoding:\n")
+            buffer.write("─" * 55 + "\n")
+            for k, value in encoding.items():
+                buffer.write(f"{k}: {value}\n")
+        
+        if compile_comparison:
+            buffer.write("\nEager vs Compiled Transforms per image (s):\n")
+            buffer.write("─" * 55 + "\n")
+            for row in compile_comparison:
+                speedup = f"{row['speedup']:.2f}x" if row['speedup'] else "N/A"
+                buffer.write(
+                    f"  {row['label']} ({row['device']}): eager {row['eager_time']:.6f} | "
+                    f"compiled {row['compiled_time']:.6f} | speedup {speedup} | "
+                    f"compile {row['compile_time']:.2f} s (n={row['images']})\n"
+                )
+        
+        if thread_sweep:
+            self._write_thread_sweep(buffer, thread_sweep, "Image Shape", 'shape')
+        
+        if stages:
+            buffer.write("\nPipeline Stage Timings per image (s):\n")
+            buffer.write("─" * 55 + "\n")
+            for stage, stats in stages.items():
+                buffer.write(
+                    f"  {stage}: min {stats['min']:.6f} | median {stats['median']:.6f} | "
+                    f"mean {stats['mean']:.6f} | p95 {stats['p95']:.6f} | total {sum(stats['samples']):.6f} "
+                    f"(n={len(stats['samples'])})\n"
+                )
+        
+        self._write_metrics(buffer)
         
+        uri = self.put_bytes(key, buffer.getvalue().encode())
         buffer.close()
-        return f"s3://{self.bucket_name}/{key}"
\ No newline at end of file
+        return uri
\ No newline at end of file
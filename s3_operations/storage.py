@@ -0,0 +1,515 @@
+import abc
+import functools
+import hashlib
+import io
+import os
+import queue
+import shutil
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+# Sentinel marking the end of a fan-out listing worker
+_LISTING_DONE = object()
+
+# S3 rejects multipart parts smaller than this, except for the last one
+MIN_PART_SIZE = 5 * 1024**2
+
+class _BufferReader(io.RawIOBase):
+    """Seekable file-like view of a memoryview, so parts upload without a copy"""
+
+    def __init__(self, view: memoryview):
+        self._view = view
+        self._position = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        count = min(len(buffer), len(self._view) - self._position)
+        buffer[:count] = self._view[self._position:self._position + count]
+        self._position += count
+        return count
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        base = {io.SEEK_SET: 0, io.SEEK_CUR: self._position, io.SEEK_END: len(self._view)}[whence]
+        self._position = max(0, base + offset)
+        return self._position
+
+    def tell(self) -> int:
+        return self._position
+
+
+class StorageBackend(abc.ABC):
+    """
+    Object store primitives used by S3Operations
+
+    Keys are '/'-separated paths. Listings yield object records with key,
+    size, etag and last_modified; the etag changes whenever the content
+    does, which is what the manifest and the disk cache rely on.
+    """
+
+    # Optional S3Metrics of the underlying client
+    metrics = None
+
+    @abc.abstractmethod
+    def list_objects(self, prefix: str, prefetch: bool = True, fan_out: bool = False,
+                     max_workers: int = 8, page_size: int = 1000) -> Iterator[Dict]:
+        """Yield object records for every key starting with prefix"""
+
+    @abc.abstractmethod
+    def head(self, key: str) -> Dict:
+        """Object record of a single key"""
+
+    def get(self, key: str):
+        """Read an object into a bytes-like object"""
+        return self.get_with_etag(key)[0]
+
+    @abc.abstractmethod
+    def get_with_etag(self, key: str) -> Tuple[Any, str]:
+        """
+        Read an object, with the ETag of the version that was read
+
+        The ETag comes from the read itself, not from a listing, so it
+        matches the returned bytes even if the object changed since.
+        """
+
+    @abc.abstractmethod
+    def put(self, key: str, data) -> str:
+        """Write an object and return its URI"""
+
+    @abc.abstractmethod
+    def copy(self, source_key: str, key: str) -> str:
+        """Copy an object within the store and return the destination URI"""
+
+    @abc.abstractmethod
+    def uri(self, key: str) -> str:
+        """URI of a key, for logs and result files"""
+
+
+class S3Backend(StorageBackend):
+    """S3 storage over the shared, instrumented S3Client"""
+
+    def __init__(self, credentials: Dict[str, str], bucket_name: str,
+                 multipart_threshold: int = 64 * 1024**2, part_size: int = 16 * 1024**2,
+                 part_workers: int = 8, max_pool_connections: int = 50):
+        """
+        Args:
+            credentials: Endpoint URL and access keys
+            bucket_name: Bucket to operate on
+            multipart_threshold: Objects larger than this are transferred in parallel parts
+            part_size: Size of each ranged GET / multipart upload part
+            part_workers: Concurrent part transfers, shared by all large objects
+            max_pool_connections: Size of the client's connection pool
+        """
+        self.bucket_name = bucket_name
+        self.multipart_threshold = multipart_threshold
+        self.part_size = max(MIN_PART_SIZE, part_size)
+        self.part_workers = part_workers
+        self._part_executor = None
+        self._part_executor_lock = threading.Lock()
+        # boto3 is only loaded when S3 is actually used (not for LocalBackend runs)
+        from .s3_client import S3Client
+        self.client = S3Client(credentials, max_pool_connections=max_pool_connections)
+        self.s3_client = self.client.client
+        self.metrics = self.client.metrics
+
+    def _list_page(self, prefix: str, continuation_token: Optional[str] = None,
+                   delimiter: Optional[str] = None, page_size: int = 1000) -> Dict:
+        """Fetch a single list_objects_v2 page"""
+        kwargs = {
+            'Bucket': self.bucket_name,
+            'Prefix': prefix,
+            'MaxKeys': page_size
+        }
+        if continuation_token:
+            kwargs['ContinuationToken'] = continuation_token
+        if delimiter:
+            kwargs['Delimiter'] = delimiter
+        return self.s3_client.list_objects_v2(**kwargs)
+
+    @staticmethod
+    def _object_record(obj: Dict) -> Dict:
+        """Convert a list_objects_v2 entry into an object record"""
+        return {
+            'key': obj['Key'],
+            'size': obj.get('Size', 0),
+            'etag': obj.get('ETag', '').strip('"'),
+            'last_modified': obj.get('LastModified')
+        }
+
+    def _iter_prefix(self, prefix: str, prefetch: bool = True,
+                     page_size: int = 1000) -> Iterator[Dict]:
+        """
+        Yield object records under a prefix, following continuation tokens
+
+        While the caller consumes one page, the next one is requested in
+        a background thread so listing latency overlaps with processing.
+        """
+        executor = ThreadPoolExecutor(max_workers=1) if prefetch else None
+        try:
+            response = self._list_page(prefix, page_size=page_size)
+            while True:
+                next_page = None
+                token = response.get('NextContinuationToken') if response.get('IsTruncated') else None
+                if token and executor is not None:
+                    next_page = executor.submit(self._list_page, prefix, token, None, page_size)
+
+                for obj in response.get('Contents', []):
+                    yield self._object_record(obj)
+
+                if not token:
+                    break
+                response = next_page.result() if next_page is not None else self._list_page(
+                    prefix, token, None, page_size
+                )
+        finally:
+            if executor is not None:
+                executor.shutdown(wait=False, cancel_futures=True)
+
+    def _iter_fan_out(self, prefix: str, max_workers: int, prefetch: bool,
+                      page_size: int) -> Iterator[Dict]:
+        """
+        Yield object records by listing every sub-prefix of `prefix` concurrently
+
+        Keys directly under `prefix` are yielded first; sub-prefix listings are
+        then merged as their pages arrive, so ordering across sub-prefixes is
+        not guaranteed.
+        """
+        sub_prefixes = []
+        token = None
+        while True:
+            response = self._list_page(prefix, token, delimiter='/', page_size=page_size)
+            for obj in response.get('Contents', []):
+                yield self._object_record(obj)
+            sub_prefixes.extend(p['Prefix'] for p in response.get('CommonPrefixes', []))
+            if not response.get('IsTruncated'):
+                break
+            token = response.get('NextContinuationToken')
+
+        if not sub_prefixes:
+            return
+
+        # Bounded so that fast listings cannot run arbitrarily far ahead of the consumer
+        records = queue.Queue(maxsize=page_size * max_workers)
+        stop = threading.Event()
+
+        def put(item) -> bool:
+            # Give up once the consumer has gone away instead of blocking forever
+            while not stop.is_set():
+                try:
+                    records.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        def list_sub_prefix(sub_prefix):
+            try:
+                for record in self._iter_prefix(sub_prefix, prefetch, page_size):
+                    if not put(record):
+                        return
+            except Exception as e:
+                put(e)
+            finally:
+                put(_LISTING_DONE)
+
+        executor = ThreadPoolExecutor(max_workers=min(max_workers, len(sub_prefixes)))
+        try:
+            for sub_prefix in sub_prefixes:
+                executor.submit(list_sub_prefix, sub_prefix)
+
+            remaining = len(sub_prefixes)
+            while remaining:
+                item = records.get()
+                if item is _LISTING_DONE:
+                    remaining -= 1
+                elif isinstance(item, Exception):
+                    raise item
+                else:
+                    yield item
+        finally:
+            stop.set()
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def list_objects(self, prefix: str, prefetch: bool = True, fan_out: bool = False,
+                     max_workers: int = 8, page_size: int = 1000) -> Iterator[Dict]:
+        if fan_out:
+            return self._iter_fan_out(prefix, max_workers, prefetch, page_size)
+        return self._iter_prefix(prefix, prefetch, page_size)
+
+    def head(self, key: str) -> Dict:
+        response = self.s3_client.head_object(Bucket=self.bucket_name, Key=key)
+        return {
+            'key': key,
+            'size': response['ContentLength'],
+            'etag': response['ETag'].strip('"'),
+            'last_modified': response.get('LastModified')
+        }
+
+    def _parts(self) -> ThreadPoolExecutor:
+        """Executor for part transfers, created on first use"""
+        with self._part_executor_lock:
+            if self._part_executor is None:
+                self._part_executor = ThreadPoolExecutor(max_workers=self.part_workers)
+            return self._part_executor
+
+    def _part_ranges(self, size: int, start: int = 0) -> List[Tuple[int, int]]:
+        """Split [start, size) into part_size (start, end) ranges"""
+        return [(offset, min(offset + self.part_size, size)) for offset in range(start, size, self.part_size)]
+
+    @staticmethod
+    def _read_into(body, view: memoryview):
+        """Fill a buffer view from a response body stream"""
+        offset = 0
+        while offset < len(view):
+            count = body.readinto(view[offset:])
+            if not count:
+                raise IOError(f"Response ended after {offset} of {len(view)} bytes")
+            offset += count
+
+    def _get_range(self, key: str, view: memoryview, start: int, etag: str):
+        """Ranged GET of one part straight into its slice of the destination buffer"""
+        response = self.s3_client.get_object(
+            Bucket=self.bucket_name,
+            Key=key,
+            Range=f"bytes={start}-{start + len(view) - 1}",
+            # Fail instead of mixing parts if the object is replaced mid-download
+            IfMatch=etag
+        )
+        self._read_into(response['Body'], view)
+
+    def _get_first_part(self, key: str) -> Tuple[bytearray, int, str]:
+        """
+        Ranged GET of the first part into a buffer preallocated for the whole object
+        Returns:
+            Tuple of (buffer, bytes read into it, ETag)
+        """
+        try:
+            response = self.s3_client.get_object(Bucket=self.bucket_name, Key=key,
+                                                 Range=f"bytes=0-{self.part_size - 1}")
+        except Exception as e:
+            # botocore's ClientError; an empty object has no byte range to return
+            if getattr(e, 'response', {}).get('Error', {}).get('Code') != 'InvalidRange':
+                raise
+            response = self.s3_client.get_object(Bucket=self.bucket_name, Key=key)
+        length = response['ContentLength']
+        # 'bytes 0-<last>/<size>'
+        content_range = response.get('ContentRange')
+        buffer = bytearray(int(content_range.rpartition('/')[2]) if content_range else length)
+        self._read_into(response['Body'], memoryview(buffer)[:length])
+        return buffer, length, response['ETag']
+
+    def get_with_etag(self, key: str) -> Tuple[bytearray, str]:
+        """
+        Read an object
+        
+        The first request is a ranged GET of the first part; its
+        Content-Range gives the object size, which the buffer is
+        preallocated with. The rest is written directly into its slice of
+        the same buffer: by one more ranged GET up to multipart_threshold,
+        by parallel part_size ones above it. Broken body streams are
+        retried per part by the shared S3Client.
+        
+        Args:
+            key: S3 object key
+        
+        Returns:
+            Tuple of (object data as a bytearray, ETag of the first response,
+            which every part was matched against)
+        """
+        buffer, read, etag = self.client.with_retries('GetObject', lambda: self._get_first_part(key))
+        size = len(buffer)
+        if read >= size:
+            return buffer, etag.strip('"')
+        
+        ranges = self._part_ranges(size, start=read) if size > self.multipart_threshold else [(read, size)]
+        view = memoryview(buffer)
+        futures = [
+            self._parts().submit(
+                self.client.with_retries, 'GetObject',
+                functools.partial(self._get_range, key, view[start:end], start, etag)
+            )
+            for start, end in ranges
+        ]
+        for future in futures:
+            future.result()
+        return buffer, etag.strip('"')
+
+    def put(self, key: str, data) -> str:
+        """
+        Write an object, as a parallel multipart upload above multipart_threshold
+        
+        Args:
+            key: Destination object key
+            data: Bytes-like object to upload (parts are read from it without copying)
+        
+        Returns:
+            S3 URI of the uploaded object
+        """
+        if len(data) <= self.multipart_threshold:
+            self.s3_client.put_object(Bucket=self.bucket_name, Key=key, Body=data)
+            return self.uri(key)
+        
+        view = memoryview(data).cast('B')
+        upload_id = self.s3_client.create_multipart_upload(Bucket=self.bucket_name, Key=key)['UploadId']
+        
+        def upload_part(part_number, start, end):
+            response = self.s3_client.upload_part(
+                Bucket=self.bucket_name,
+                Key=key,
+                UploadId=upload_id,
+                PartNumber=part_number,
+                Body=_BufferReader(view[start:end])
+            )
+            return {'PartNumber': part_number, 'ETag': response['ETag']}
+        
+        futures = []
+        try:
+            for part_number, (start, end) in enumerate(self._part_ranges(len(view)), start=1):
+                futures.append(self._parts().submit(upload_part, part_number, start, end))
+            parts = [future.result() for future in futures]
+            self.s3_client.complete_multipart_upload(
+                Bucket=self.bucket_name,
+                Key=key,
+                UploadId=upload_id,
+                MultipartUpload={'Parts': parts}
+            )
+        except Exception:
+            for future in futures:
+                future.cancel()
+            self.s3_client.abort_multipart_upload(Bucket=self.bucket_name, Key=key, UploadId=upload_id)
+            raise
+        return self.uri(key)
+
+    def copy(self, source_key: str, key: str) -> str:
+        self.s3_client.copy_object(
+            Bucket=self.bucket_name,
+            Key=key,
+            CopySource={'Bucket': self.bucket_name, 'Key': source_key}
+        )
+        return self.uri(key)
+
+    def uri(self, key: str) -> str:
+        return f"s3://{self.bucket_name}/{key}"
+
+
+class LocalBackend(StorageBackend):
+    """
+    Storage in a local directory, e.g. a dataset already on the node's disk
+
+    By default ETags are derived from inode, size and modification time
+    (like HTTP servers do for static files), so listings do not have to
+    hash file contents; two files never share an ETag, so the manifest
+    cannot find duplicate images. With content_etags, the ETag is the MD5
+    of the file like a single-part S3 upload's, computed once per file
+    version (inode, size and modification time) and then cached.
+    """
+
+    def __init__(self, root: str, content_etags: bool = False):
+        """
+        Args:
+            root: Directory that plays the role of the bucket
+            content_etags: Use the MD5 of the contents as ETag
+        """
+        self.root = os.path.abspath(root)
+        self.content_etags = content_etags
+        self._md5s: Dict[Tuple[int, int, int], str] = {}
+        self._md5s_lock = threading.Lock()
+        os.makedirs(self.root, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        path = os.path.abspath(os.path.join(self.root, key))
+        if os.path.commonpath([self.root, path]) != self.root:
+            raise ValueError(f"Key escapes the storage root: {key}")
+        return path
+
+    def _md5(self, path: str, stat: os.stat_result, data=None) -> str:
+        """MD5 of a file version, hashing data (its contents, already read) when given"""
+        version = (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+        with self._md5s_lock:
+            digest = self._md5s.get(version)
+        if digest is None:
+            md5 = hashlib.md5(usedforsecurity=False)
+            if data is not None:
+                md5.update(data)
+            else:
+                with open(path, 'rb') as f:
+                    for block in iter(functools.partial(f.read, 1024**2), b''):
+                        md5.update(block)
+            digest = md5.hexdigest()
+            with self._md5s_lock:
+                self._md5s[version] = digest
+        return digest
+
+    def _record(self, key: str, stat: os.stat_result, path: Optional[str] = None, data=None) -> Dict:
+        if self.content_etags:
+            etag = self._md5(path or self._path(key), stat, data)
+        else:
+            etag = f"{stat.st_ino:x}-{stat.st_size:x}-{stat.st_mtime_ns:x}"
+        return {
+            'key': key,
+            'size': stat.st_size,
+            'etag': etag,
+            'last_modified': datetime.fromtimestamp(stat.st_mtime, tz=timezone.utc)
+        }
+
+    def list_objects(self, prefix: str, prefetch: bool = True, fan_out: bool = False,
+                     max_workers: int = 8, page_size: int = 1000) -> Iterator[Dict]:
+        # Walk the deepest directory containing the prefix, sorted within each directory
+        directory = os.path.dirname(prefix)
+        for current, dirs, files in os.walk(self._path(directory)):
+            dirs.sort()
+            relative = os.path.relpath(current, self.root)
+            for name in sorted(files):
+                if name.startswith('.tmp-'):
+                    continue
+                key = name if relative == '.' else f"{relative.replace(os.sep, '/')}/{name}"
+                if key.startswith(prefix):
+                    path = os.path.join(current, name)
+                    yield self._record(key, os.stat(path), path)
+
+    def head(self, key: str) -> Dict:
+        return self._record(key, os.stat(self._path(key)))
+
+    def get_with_etag(self, key: str) -> Tuple[bytearray, str]:
+        # The open file's own stat, so a file replaced meanwhile cannot lend its ETag
+        with open(self._path(key), 'rb', buffering=0) as f:
+            stat = os.fstat(f.fileno())
+            buffer = bytearray(stat.st_size)
+            view = memoryview(buffer)
+            offset = 0
+            while offset < len(buffer):
+                count = f.readinto(view[offset:])
+                if not count:
+                    raise IOError(f"{key} shrank while being read")
+                offset += count
+        return buffer, self._record(key, stat, data=buffer)['etag']
+
+    def put(self, key: str, data) -> str:
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write to a temporary file first so readers never see partial objects
+        fd, tmp_path = tempfile.mkstemp(prefix='.tmp-', dir=os.path.dirname(path))
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        return self.uri(key)
+
+    def copy(self, source_key: str, key: str) -> str:
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        shutil.copyfile(self._path(source_key), path)
+        return self.uri(key)
+
+    def uri(self, key: str) -> str:
+        return f"file://{self._path(key)}"
\ No newline at end of file
@@ -0,0 +1,45 @@
+import io
+import multiprocessing
+import unittest
+from concurrent.futures import ProcessPoolExecutor
+import torch
+from PIL import Image
+from image_processing import cpu_pool
+
+CUDA_CALLS = ('is_available', 'device_count', 'current_device', 'get_device_name', 'mem_get_info',
+              'synchronize', 'empty_cache', 'init')
+
+
+def _fail_cuda(*args, **kwargs):
+    raise AssertionError("CPU pool worker touched CUDA")
+
+
+def _init_worker_without_cuda(*args):
+    """cpu_pool._init_worker with every CUDA entry point raising"""
+    for name in CUDA_CALLS:
+        setattr(torch.cuda, name, _fail_cuda)
+    cpu_pool._init_worker(*args)
+
+
+class CPUPoolWorkerTest(unittest.TestCase):
+    def test_worker_never_touches_cuda(self):
+        buffer = io.BytesIO()
+        Image.new('RGB', (96, 64), (40, 120, 200)).save(buffer, format='PNG')
+        executor = ProcessPoolExecutor(
+            max_workers=1,
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=_init_worker_without_cuda,
+            initargs=('direct', 31, 5.0, None, 1, 0, None)
+        )
+        try:
+            result = executor.submit(cpu_pool._process_image, buffer.getvalue()).result(timeout=120)
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+        self.assertGreater(result['cpu_time'], 0)
+        self.assertGreaterEqual(result['cpu_total_time'], result['cpu_time'])
+        # The encoded output stays in the worker
+        self.assertNotIn('processed_data', result)
+
+
+if __name__ == '__main__':
+    unittest.main()
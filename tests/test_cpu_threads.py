@@ -0,0 +1,47 @@
+import io
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from benchmark_operations.cpu_threads import thread_sweep
+from cli_operations.cli_operations import CLIOperations
+from s3_operations.s3_operations import S3Operations
+from s3_operations.storage import LocalBackend
+
+
+class _Timer:
+    """TimingHarness stand-in reporting the given medians in turn"""
+
+    def __init__(self, medians):
+        self.medians = iter(medians)
+
+    def run(self, fn, device_type):
+        median = next(self.medians)
+        return None, {'min': median, 'median': median, 'mean': median, 'p95': median, 'stddev': 0.0,
+                      'repeats': 1, 'warmup': 0, 'timer': 'test', 'samples': [median]}
+
+
+class ThreadSweepTest(unittest.TestCase):
+    def test_scaling_relative_to_fewest_threads(self):
+        results = thread_sweep(lambda: None, [4, 1, 2], _Timer([1.0, 0.5, 0.5]))
+        self.assertEqual([result['threads'] for result in results], [1, 2, 4])
+        self.assertEqual([result['speedup'] for result in results], [1.0, 2.0, 2.0])
+        self.assertEqual([result['efficiency'] for result in results], [1.0, 1.0, 0.5])
+
+    def test_zero_median_is_reported_as_missing(self):
+        results = thread_sweep(lambda: None, [1, 2], _Timer([0.0, 0.0]))
+        self.assertIsNone(results[0]['speedup'])
+        self.assertIsNone(results[1]['efficiency'])
+        for result in results:
+            result['shape'] = '3x8x8'
+
+        with redirect_stdout(io.StringIO()):
+            CLIOperations.display_thread_sweep(results, "Image Shape", 'shape')
+        buffer = io.StringIO()
+        with tempfile.TemporaryDirectory() as directory:
+            s3_ops = S3Operations(None, None, backend=LocalBackend(directory))
+            s3_ops._write_thread_sweep(buffer, results, "Image Shape", 'shape')
+        self.assertIn('N/A', buffer.getvalue())
+
+
+if __name__ == '__main__':
+    unittest.main()
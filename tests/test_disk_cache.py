@@ -0,0 +1,61 @@
+import mmap
+import tempfile
+import unittest
+from s3_operations.disk_cache import CachedBackend, release
+from s3_operations.storage import LocalBackend
+
+
+class CachedBackendTest(unittest.TestCase):
+    def setUp(self):
+        self.storage = tempfile.TemporaryDirectory()
+        self.cache_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.storage.cleanup)
+        self.addCleanup(self.cache_dir.cleanup)
+        self.backend = LocalBackend(self.storage.name, content_etags=True)
+        self.cache = CachedBackend(self.backend, self.cache_dir.name, max_bytes=1024**2)
+
+    def _list(self):
+        return {record['key']: record['etag'] for record in self.cache.list_objects('')}
+
+    def test_object_replaced_after_listing_is_cached_under_its_own_etag(self):
+        self.backend.put('object', b'old')
+        listed = self._list()['object']
+        self.backend.put('object', b'new')
+        data, etag = self.cache.get_with_etag('object')
+        self.assertEqual(bytes(data), b'new')
+        self.assertNotEqual(etag, listed)
+
+        # Back to the listed version: its ETag must not find the newer bytes
+        self.backend.put('object', b'old')
+        self.assertEqual(self._list()['object'], listed)
+        data = self.cache.get('object')
+        self.assertEqual(bytes(data), b'old')
+        self.assertEqual(self.cache.stats['hits'], 0)
+
+    def test_hits_are_memory_maps_that_release_unmaps(self):
+        self.backend.put('object', b'cached')
+        self._list()
+        self.cache.get('object')
+        data = self.cache.get('object')
+        self.assertEqual(self.cache.stats['hits'], 1)
+        self.assertIsInstance(data, mmap.mmap)
+        self.assertEqual(bytes(data), b'cached')
+        release(data)
+        self.assertTrue(data.closed)
+
+    def test_release_leaves_exported_maps_open(self):
+        self.backend.put('object', b'cached')
+        self._list()
+        self.cache.get('object')
+        data = self.cache.get('object')
+        view = memoryview(data)
+        release(data)
+        self.assertFalse(data.closed)
+        self.assertEqual(bytes(view), b'cached')
+        view.release()
+        release(data)
+        self.assertTrue(data.closed)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,41 @@
+import unittest
+import torch
+import torchvision.transforms as transforms
+from image_processing.gaussian_blur import BACKENDS, GaussianBlurEngine
+
+
+class GaussianBlurBackendsTest(unittest.TestCase):
+    ATOL = 1e-4
+
+    def _compare(self, kernel_size, sigma, shape):
+        generator = torch.Generator().manual_seed(kernel_size)
+        image = torch.rand(shape, generator=generator)
+        # torchvision pads with reflect too, so the borders must agree as well
+        reference = transforms.GaussianBlur(kernel_size, sigma)(image)
+        for backend in BACKENDS:
+            with self.subTest(backend=backend, kernel_size=kernel_size, shape=shape):
+                output = GaussianBlurEngine(kernel_size, sigma, backend)(image)
+                self.assertEqual(output.shape, image.shape)
+                self.assertLessEqual((output - reference).abs().max().item(), self.ATOL)
+
+    def test_odd_kernel_sizes(self):
+        for kernel_size, sigma in ((1, 0.5), (3, 0.8), (7, 1.5), (31, 5.0)):
+            self._compare(kernel_size, sigma, (3, 48, 64))
+
+    def test_chw_and_nchw_inputs(self):
+        for shape in ((3, 40, 56), (1, 3, 40, 56), (4, 1, 40, 56)):
+            self._compare(9, 2.0, shape)
+
+    def test_kernel_larger_than_the_image(self):
+        # Reflect padding needs each side above half the kernel; the FFT runs over
+        # a padded size smaller than twice the kernel, so its wrap-around must be cropped
+        for shape in ((3, 16, 20), (2, 3, 17, 16)):
+            self._compare(31, 5.0, shape)
+
+    def test_non_square_images(self):
+        for shape in ((3, 23, 97), (3, 97, 23)):
+            self._compare(15, 3.0, shape)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,99 @@
+import io
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from unittest import mock
+import numpy as np
+import torch
+import torchvision.transforms as transforms
+import torchvision.transforms.functional as TF
+from cli_operations.cli_operations import CLIOperations
+from image_processing.image_processing_operations import ImageProcessingOperations
+from s3_operations.s3_operations import S3Operations
+from s3_operations.storage import LocalBackend
+
+
+class MergePoolTimingTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.image_ops = ImageProcessingOperations(calibrate=False)
+
+    def _gpu_timing(self):
+        # On a GPU node the in-process CPU pass is skipped, so there are no CPU keys
+        return {'batch_size': 1, 'compared': True, 'gpu_time': 0.01, 'gpu_stats': None}
+
+    def test_pool_timings_replace_in_process_ones(self):
+        pool_result = {'error': None, 'cpu_time': 0.02, 'cpu_total_time': 0.05, 'cpu_wall_time': 0.04}
+        timing = self.image_ops.merge_pool_timing(self._gpu_timing(), pool_result)
+        self.assertEqual(timing['cpu_time'], 0.02)
+        self.assertEqual(timing['cpu_wall_time'], 0.04)
+        self.assertAlmostEqual(timing['speedup'], 4.0)
+
+    def test_failed_pool_image_has_no_cpu_timings(self):
+        timing = self.image_ops.merge_pool_timing(self._gpu_timing(), {'error': 'decode failed'})
+        self.assertIsNone(timing['cpu_time'])
+        self.assertIsNone(timing['cpu_wall_time'])
+        self.assertIsNone(timing['speedup'])
+        self.assertEqual(timing['cpu_error'], 'decode failed')
+
+    def test_failed_pool_image_keeps_in_process_timings(self):
+        timing = {**self._gpu_timing(), 'cpu_time': 0.03, 'cpu_stats': None, 'cpu_wall_time': 0.03}
+        timing = self.image_ops.merge_pool_timing(timing, {'error': 'decode failed'})
+        self.assertEqual(timing['cpu_time'], 0.03)
+        self.assertAlmostEqual(timing['speedup'], 3.0)
+
+    def test_pool_wall_time_counts_only_the_transform_share(self):
+        class _Pool:
+            def process(self, images_data):
+                return [{'cpu_time': 0.1, 'cpu_total_time': 0.4, 'error': None},
+                        {'error': 'decode failed'}], 1.0
+
+        with mock.patch.object(self.image_ops, 'cpu_pool', _Pool()):
+            results = self.image_ops.process_cpu_pool([b'a', b'b'])
+        # Half a second of pool wall time per image, a quarter of it transforming
+        self.assertAlmostEqual(results[0]['cpu_wall_time'], 0.125)
+        self.assertNotIn('cpu_wall_time', results[1])
+
+    def test_failed_pool_image_is_reported(self):
+        result = {'image_index': 0, **self.image_ops.merge_pool_timing(self._gpu_timing(), {'error': 'decode failed'})}
+        with tempfile.TemporaryDirectory() as directory:
+            s3_ops = S3Operations(None, None, backend=LocalBackend(directory))
+            s3_ops.save_processing_results([result], {'device': 'test'}, 'processed')
+            report = b''.join(bytes(s3_ops.get_image(obj['key'])) for obj in s3_ops.iter_objects('processed')).decode()
+        self.assertIn('N/A', report)
+        with redirect_stdout(io.StringIO()):
+            CLIOperations.display_image_results([result])
+
+
+
+class TiledTransformTest(unittest.TestCase):
+    TILE_SIZE = 64
+
+    @classmethod
+    def setUpClass(cls):
+        cls.image_ops = ImageProcessingOperations(blur_backend='direct', calibrate=False, tile_size=cls.TILE_SIZE)
+
+    def _compare(self, params):
+        # Neither side is a multiple of the tile size, so the last row and column of tiles are partial
+        generator = torch.Generator().manual_seed(0)
+        image_tensor = torch.randint(0, 256, (3, 2 * self.TILE_SIZE + 37, 3 * self.TILE_SIZE + 22),
+                                     dtype=torch.uint8, generator=generator)
+        with mock.patch.object(transforms.ColorJitter, 'get_params', return_value=params):
+            eager = self.image_ops._transform_eager(image_tensor.unsqueeze(0))[0]
+        tiled, timings = self.image_ops.tiler(TF.to_pil_image(image_tensor), params)
+
+        self.assertEqual(timings['tiles'], 12)
+        tiled = torch.from_numpy(np.array(tiled)).permute(2, 0, 1)
+        self.assertEqual(tiled.shape, eager.shape)
+        # Both truncate to uint8, so float rounding can differ by one level
+        self.assertLessEqual((tiled.int() - eager.int()).abs().max().item(), 1)
+
+    def test_matches_eager_transform_contrast_first(self):
+        self._compare((torch.tensor([1, 0, 2, 3]), 1.15, 0.85, None, None))
+
+    def test_matches_eager_transform_brightness_first(self):
+        self._compare((torch.tensor([0, 1, 2, 3]), 0.9, 1.2, None, None))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,137 @@
+import hashlib
+import os
+import tempfile
+import unittest
+from s3_operations.manifest import ProcessingManifest
+from s3_operations.s3_operations import S3Operations
+from s3_operations.storage import LocalBackend
+
+
+class ProcessingManifestTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.s3_ops = S3Operations(None, None, backend=LocalBackend(self.directory.name, content_etags=True))
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def _manifest(self, params=None):
+        manifest = ProcessingManifest(self.s3_ops, 'processed', params or {'blur': 5})
+        manifest.load()
+        return manifest
+
+    def _source(self, key, data):
+        self.s3_ops.put_bytes(key, data)
+        return self.s3_ops.backend.head(key)
+
+    def _processed(self, manifest, source, output_key):
+        self.s3_ops.put_bytes(output_key, b'output')
+        manifest.record(source, output_key)
+
+    def test_unchanged_source_is_current(self):
+        source = self._source('raw/a.png', b'image')
+        manifest = self._manifest()
+        self.assertFalse(manifest.is_current(source))
+        self._processed(manifest, source, 'processed/a.png')
+        manifest.save()
+
+        reloaded = self._manifest()
+        self.assertEqual(len(reloaded.entries), 1)
+        self.assertTrue(reloaded.is_current(source))
+
+    def test_changed_source_is_not_current(self):
+        source = self._source('raw/a.png', b'image')
+        manifest = self._manifest()
+        self._processed(manifest, source, 'processed/a.png')
+        manifest.save()
+
+        changed = self._source('raw/a.png', b'other image')
+        self.assertFalse(self._manifest().is_current(changed))
+
+    def test_changed_params_invalidate_every_entry(self):
+        source = self._source('raw/a.png', b'image')
+        manifest = self._manifest({'blur': 5})
+        self._processed(manifest, source, 'processed/a.png')
+        manifest.save()
+
+        reloaded = self._manifest({'blur': 7})
+        self.assertEqual(reloaded.entries, {})
+        self.assertEqual(reloaded.invalidated, 1)
+        self.assertFalse(reloaded.is_current(source))
+        self.assertTrue(self._manifest({'blur': 5}).is_current(source))
+
+    def test_deleted_output_is_produced_again(self):
+        source = self._source('raw/a.png', b'image')
+        manifest = self._manifest()
+        self._processed(manifest, source, 'processed/a.png')
+        manifest.save()
+        os.remove(os.path.join(self.directory.name, 'processed', 'a.png'))
+
+        reloaded = self._manifest()
+        self.assertFalse(reloaded.is_current(source))
+        self.assertIsNone(reloaded.output_for_content(source))
+
+    def test_duplicate_content_reuses_existing_output(self):
+        original = self._source('raw/a.png', b'image')
+        manifest = self._manifest()
+        self._processed(manifest, original, 'processed/a.png')
+        manifest.save()
+
+        duplicate = self._source('raw/copy/b.png', b'image')
+        other = self._source('raw/c.png', b'different')
+        reloaded = self._manifest()
+        self.assertFalse(reloaded.is_current(duplicate))
+        self.assertEqual(reloaded.output_for_content(duplicate), 'processed/a.png')
+        self.assertIsNone(reloaded.output_for_content(other))
+
+    def test_duplicates_recorded_in_this_run_are_found(self):
+        manifest = self._manifest()
+        self._processed(manifest, self._source('raw/a.png', b'image'), 'processed/a.png')
+        self.assertEqual(manifest.output_for_content(self._source('raw/b.png', b'image')), 'processed/a.png')
+
+    def test_file_etags_never_match_duplicates(self):
+        s3_ops = S3Operations(None, None, backend=LocalBackend(self.directory.name))
+        s3_ops.put_bytes('raw/a.png', b'image')
+        s3_ops.put_bytes('raw/b.png', b'image')
+        self.assertNotEqual(s3_ops.backend.head('raw/a.png')['etag'], s3_ops.backend.head('raw/b.png')['etag'])
+
+    def test_content_etags_follow_the_bytes(self):
+        backend = self.s3_ops.backend
+        self.s3_ops.put_bytes('raw/a.png', b'image')
+        self.assertEqual(backend.head('raw/a.png')['etag'], hashlib.md5(b'image').hexdigest())
+        listed = {record['key']: record['etag'] for record in backend.list_objects('raw/')}
+        self.assertEqual(listed['raw/a.png'], hashlib.md5(b'image').hexdigest())
+
+    def test_prune_drops_sources_not_listed(self):
+        kept = self._source('raw/a.png', b'image')
+        removed = self._source('raw/b.png', b'other')
+        manifest = self._manifest()
+        self._processed(manifest, kept, 'processed/a.png')
+        self._processed(manifest, removed, 'processed/b.png')
+        manifest.save()
+
+        reloaded = self._manifest()
+        reloaded.is_current(kept)
+        reloaded.save(prune_unseen=True)
+        self.assertEqual(set(self._manifest().entries), {'raw/a.png'})
+
+    def test_save_without_prune_keeps_unseen_sources(self):
+        manifest = self._manifest()
+        self._processed(manifest, self._source('raw/a.png', b'image'), 'processed/a.png')
+        manifest.save()
+
+        self._manifest().save()
+        self.assertEqual(set(self._manifest().entries), {'raw/a.png'})
+
+    def test_outputs_in_any_format_count_as_existing(self):
+        source = self._source('raw/a.png', b'image')
+        manifest = self._manifest()
+        self.s3_ops.put_bytes('processed/a.webp', b'output')
+        manifest.record(source, 'processed/a.webp')
+        manifest.save()
+
+        self.assertTrue(self._manifest().is_current(source))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,32 @@
+import unittest
+import numpy as np
+from results_operations.results_operations import _ranks, mann_whitney_greater
+
+
+class MannWhitneyTest(unittest.TestCase):
+    # Expected p-values match scipy.stats.mannwhitneyu(candidate, baseline, alternative='greater',
+    # method='asymptotic'), which applies the same tie and continuity corrections
+
+    def test_ranks_average_ties(self):
+        ranks, ties = _ranks(np.array([3.0, 1.0, 3.0, 2.0, 3.0]))
+        self.assertEqual(ranks.tolist(), [4.0, 1.0, 4.0, 2.0, 4.0])
+        self.assertEqual(sorted(ties.tolist()), [1, 1, 3])
+
+    def test_separated_samples(self):
+        # U = 9 (every candidate sample beats every baseline one), variance 3 * 3 / 12 * 7 = 5.25
+        self.assertAlmostEqual(mann_whitney_greater([4, 5, 6], [1, 2, 3]), 0.040427799185026, places=12)
+        self.assertAlmostEqual(mann_whitney_greater([1, 2, 3], [4, 5, 6]), 0.985451834129374, places=12)
+
+    def test_ties(self):
+        # U = 2 + 3.5 + 3.5 + 4 = 13 with ties counted as half; tie groups of 3 (2s and 3s) reduce
+        # the variance to 4 * 4 / 12 * (9 - 48 / 56)
+        self.assertAlmostEqual(mann_whitney_greater([2, 3, 3, 4], [1, 2, 2, 3]), 0.086016854460911, places=12)
+
+    def test_degenerate_samples(self):
+        # All tied: no variance, no evidence either way
+        self.assertEqual(mann_whitney_greater([5, 5, 5], [5, 5, 5]), 1.0)
+        self.assertEqual(mann_whitney_greater([], [1.0, 2.0]), 1.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
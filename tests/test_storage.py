@@ -0,0 +1,70 @@
+import os
+import unittest
+from unittest import mock
+from moto import mock_aws
+from s3_operations.storage import MIN_PART_SIZE, S3Backend, StorageBackend
+
+BUCKET = 'storage-test'
+
+
+class StorageBackendTest(unittest.TestCase):
+    def test_backends_must_implement_every_primitive(self):
+        class Partial(StorageBackend):
+            def get(self, key):
+                return b''
+
+        with self.assertRaises(TypeError):
+            StorageBackend()
+        with self.assertRaises(TypeError):
+            Partial()
+
+
+class S3BackendGetTest(unittest.TestCase):
+    def setUp(self):
+        environment = mock.patch.dict(os.environ, {'AWS_DEFAULT_REGION': 'us-east-1'})
+        environment.start()
+        self.addCleanup(environment.stop)
+        moto = mock_aws()
+        moto.start()
+        self.addCleanup(moto.stop)
+
+        credentials = {'aws_endpoint_url': None, 'aws_access_key_id': 'testing',
+                       'aws_secret_access_key': 'testing'}
+        self.backend = S3Backend(credentials, BUCKET, multipart_threshold=2 * MIN_PART_SIZE,
+                                 part_size=MIN_PART_SIZE, part_workers=2)
+        self.backend.s3_client.create_bucket(Bucket=BUCKET)
+        self.requests = []
+        get_object = self.backend.s3_client.get_object
+        def record(**kwargs):
+            self.requests.append(kwargs.get('Range'))
+            return get_object(**kwargs)
+        self.backend.s3_client.get_object = record
+
+    def _roundtrip(self, size):
+        data = os.urandom(size)
+        self.backend.s3_client.put_object(Bucket=BUCKET, Key='object', Body=data)
+        self.assertEqual(bytes(self.backend.get('object')), data)
+
+    def test_first_request_reads_only_the_first_part(self):
+        self._roundtrip(3 * MIN_PART_SIZE + 1)
+        self.assertEqual(self.requests[0], f"bytes=0-{MIN_PART_SIZE - 1}")
+        self.assertCountEqual(self.requests[1:], [
+            f"bytes={MIN_PART_SIZE}-{2 * MIN_PART_SIZE - 1}",
+            f"bytes={2 * MIN_PART_SIZE}-{3 * MIN_PART_SIZE - 1}",
+            f"bytes={3 * MIN_PART_SIZE}-{3 * MIN_PART_SIZE}"
+        ])
+
+    def test_object_below_threshold_takes_one_more_request(self):
+        self._roundtrip(MIN_PART_SIZE + 10)
+        self.assertEqual(self.requests[1:], [f"bytes={MIN_PART_SIZE}-{MIN_PART_SIZE + 9}"])
+
+    def test_small_object_takes_one_request(self):
+        self._roundtrip(100)
+        self.assertEqual(len(self.requests), 1)
+
+    def test_empty_object(self):
+        self._roundtrip(0)
+
+
+if __name__ == '__main__':
+    unittest.main()
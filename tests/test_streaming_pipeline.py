@@ -0,0 +1,138 @@
+import queue
+import tempfile
+import threading
+import time
+import unittest
+from image_processing.streaming_pipeline import _END, MemoryBudget, StreamingPipeline
+from s3_operations.s3_operations import S3Operations
+from s3_operations.storage import LocalBackend
+
+
+class _Encoder:
+    suffix = None
+
+
+class _ImageOps:
+    """Just enough of ImageProcessingOperations for the decode, encode and upload stages"""
+
+    def __init__(self, output_size=60, shape=(3, 4, 5)):
+        self.encoder = _Encoder()
+        self.cpu_pool = None
+        self.output_size = output_size
+        self.shape = shape
+        self.held_at_decode = None
+        self.budget = None
+
+    def encode_image(self, image, image_format, timings=None):
+        return b'x' * self.output_size
+
+    def image_shape(self, data):
+        return self.shape
+
+    def needs_tiling(self, shape):
+        return False
+
+    def decode_image(self, data, timings=None):
+        self.held_at_decode = list(self.budget.held)
+        if data == b'corrupt':
+            raise ValueError('bad image')
+        return object(), 'PNG'
+
+
+class _SlowUploads(S3Operations):
+    def put_bytes(self, key, data):
+        time.sleep(0.2)
+        return super().put_bytes(key, data)
+
+
+def _item(index):
+    return {'key': f"raw/image_{index}.png", 'error': None, 'tensor': object(), 'format': 'PNG',
+            'source': {'key': f"raw/image_{index}.png"}, 'started_at': time.perf_counter()}
+
+
+class StreamingPipelineTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def _pipeline(self, s3_ops, image_ops, budget_bytes):
+        pipeline = StreamingPipeline(s3_ops, image_ops, 'raw', 'processed', queue_size=4)
+        pipeline.budget = MemoryBudget(budget_bytes, num_stages=3)
+        image_ops.budget = pipeline.budget
+        pipeline._uploaded = set()
+        pipeline._content_owners = {}
+        pipeline._copies = []
+        return pipeline
+
+    def test_encode_waiting_on_budget_does_not_deadlock_uploads(self):
+        # Two 60-byte outputs in a 100-byte budget: the second can only be
+        # encoded once the first upload finished and released its bytes,
+        # while no further item reaches the upload stage in the meantime
+        s3_ops = _SlowUploads(None, None, max_workers=4, backend=LocalBackend(self.directory.name))
+        pipeline = self._pipeline(s3_ops, _ImageOps(output_size=60), budget_bytes=100)
+        encode_in, upload_in, results = queue.Queue(), queue.Queue(), queue.Queue()
+        threads = [
+            threading.Thread(target=pipeline._encode_stage, args=(encode_in, upload_in), daemon=True),
+            threading.Thread(target=pipeline._upload_stage, args=(upload_in, results), daemon=True),
+        ]
+        for thread in threads:
+            thread.start()
+        for index in range(2):
+            encode_in.put(_item(index))
+        encode_in.put(_END)
+
+        uploaded = []
+        try:
+            while True:
+                item = results.get(timeout=5)
+                if item is _END:
+                    break
+                uploaded.append(item)
+        except queue.Empty:
+            self.fail(f"pipeline stalled with budget held {pipeline.budget.held}")
+        finally:
+            pipeline._stop.set()
+            for thread in threads:
+                thread.join(timeout=5)
+
+        self.assertEqual(sorted(item['key'] for item in uploaded), ['raw/image_0.png', 'raw/image_1.png'])
+        self.assertTrue(all(item['error'] is None for item in uploaded))
+        self.assertEqual(pipeline.budget.held, [0, 0, 0])
+        self.assertLessEqual(pipeline.budget.peak_bytes, 100)
+
+    def test_decode_reserves_before_decoding(self):
+        s3_ops = S3Operations(None, None, backend=LocalBackend(self.directory.name))
+        image_ops = _ImageOps(shape=(3, 10, 20))
+        pipeline = self._pipeline(s3_ops, image_ops, budget_bytes=10**6)
+        decode_in, decode_out = queue.Queue(), queue.Queue()
+        decode_in.put({'key': 'raw/a.png', 'error': None, 'data': b'png', 'fetch_reserved': 3})
+        decode_in.put(_END)
+        pipeline.budget.held[StreamingPipeline.FETCH] = 3
+
+        pipeline._decode_stage(decode_in, decode_out)
+
+        expected = 3 * 10 * 20 * 3
+        self.assertEqual(image_ops.held_at_decode, [3, expected, 0])
+        item = decode_out.get_nowait()
+        self.assertEqual(item['decode_reserved'], expected)
+        self.assertEqual(pipeline.budget.held, [0, expected, 0])
+
+    def test_failed_decode_releases_its_reservation(self):
+        s3_ops = S3Operations(None, None, backend=LocalBackend(self.directory.name))
+        pipeline = self._pipeline(s3_ops, _ImageOps(), budget_bytes=10**6)
+        decode_in, decode_out = queue.Queue(), queue.Queue()
+        decode_in.put({'key': 'raw/a.png', 'error': None, 'data': b'corrupt'})
+        decode_in.put(_END)
+
+        pipeline._decode_stage(decode_in, decode_out)
+
+        item = decode_out.get_nowait()
+        self.assertIn('decode failed', item['error'])
+        self.assertNotIn('decode_reserved', item)
+        self.assertEqual(pipeline.budget.held, [0, 0, 0])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,48 @@
+import tempfile
+import time
+import unittest
+from s3_operations.s3_operations import S3Operations
+from s3_operations.storage import LocalBackend
+
+
+class RunTransfersTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.s3_ops = S3Operations(None, None, max_workers=4, backend=LocalBackend(self.directory.name))
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_unordered_yields_in_completion_order(self):
+        # The head transfer is the slowest; the others must not wait for it
+        delays = {'slow': 0.5, 'fast1': 0.0, 'fast2': 0.05}
+        transfer = lambda key: (time.sleep(delays[key]), {'key': key})[1]
+        keys = [record['key'] for record in
+                self.s3_ops._run_transfers(transfer, list(delays), None, False, 'test')]
+        self.assertEqual(keys, ['fast1', 'fast2', 'slow'])
+
+    def test_ordered_keeps_input_order(self):
+        delays = {'slow': 0.2, 'fast1': 0.0, 'fast2': 0.0}
+        transfer = lambda key: (time.sleep(delays[key]), {'key': key})[1]
+        keys = [record['key'] for record in
+                self.s3_ops._run_transfers(transfer, list(delays), None, True, 'test')]
+        self.assertEqual(keys, list(delays))
+
+    def test_errors_are_captured_per_item(self):
+        def transfer(key):
+            if key == 'bad':
+                raise IOError('boom')
+            return {'key': key}
+        records = {record['key']: record for record in
+                   self.s3_ops._run_transfers(transfer, ['good', 'bad'], None, True, 'test')}
+        self.assertIsNone(records['good']['error'])
+        self.assertEqual(records['bad']['error'], 'boom')
+
+    def test_upload_objects_roundtrip(self):
+        uploads = list(self.s3_ops.upload_objects([('a/x.bin', b'123'), ('a/y.bin', b'45')]))
+        self.assertEqual(sorted(upload['bytes'] for upload in uploads), [2, 3])
+        self.assertEqual(bytes(self.s3_ops.get_image('a/x.bin')), b'123')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1 @@
+from .tracer import Tracer, tracer
\ No newline at end of file
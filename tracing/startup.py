@@ -0,0 +1,56 @@
+import importlib
+import sys
+from contextlib import contextmanager
+from typing import Dict, Iterator, List
+from .tracer import tracer
+
+
+class StartupProfile:
+    """
+    Wall time of the startup phases of an entry point
+
+    Entry points wrap their imports and one-off initialization (CUDA
+    context, S3 client, ...) in phases. Each phase records its duration and
+    the top-level packages it loaded, so the cost of a heavy dependency is
+    attributed to the phase that first needed it. Phases are also traced as
+    spans, so they show up at the start of a pipeline trace.
+    """
+
+    def __init__(self):
+        self.phases: List[Dict] = []
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """Time a startup phase"""
+        before = set(sys.modules)
+        with tracer.span(name, 'startup') as span:
+            yield
+        # The standard library is loaded along the way by everything; leave it out
+        packages = {module.split('.')[0] for module in set(sys.modules) - before}
+        self.phases.append({
+            'name': name,
+            'seconds': span.duration,
+            'packages': sorted(package for package in packages
+                               if not package.startswith('_') and package not in sys.stdlib_module_names)
+        })
+
+    def import_modules(self, *names: str):
+        """
+        Import modules one phase each, in order
+
+        Importing a framework's dependencies ahead of the code that needs them
+        (e.g. torch before torchvision) reports each one's own cost; modules
+        loaded already are skipped.
+        """
+        for name in names:
+            if name not in sys.modules:
+                with self.phase(f"import {name}"):
+                    importlib.import_module(name)
+
+    @property
+    def total_seconds(self) -> float:
+        return sum(phase['seconds'] for phase in self.phases)
+
+
+# Process-wide profile filled in by the entry points
+startup = StartupProfile()
\ No newline at end of file
@@ -0,0 +1,118 @@
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional
+
+
+class Span:
+    """Timing of one traced region; duration is set when the region exits"""
+
+    __slots__ = ('name', 'start', 'duration')
+
+    def __init__(self, name: str, start: float):
+        self.name = name
+        self.start = start
+        self.duration = 0.0
+
+
+class Tracer:
+    """
+    Span recorder with Chrome trace export
+
+    `span()` always measures its region, so callers can use the duration for
+    their own per-stage timings. Only while the tracer is enabled are spans
+    (and counters) also kept as trace events, tagged with the recording
+    thread; `chrome_trace()` renders them in the Chrome trace event format,
+    which chrome://tracing and https://ui.perfetto.dev open directly, showing
+    pipeline stages side by side per thread with their overlaps and stalls.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self._origin = time.perf_counter()
+        self._events: List[Dict] = []
+        self._threads: Dict[int, str] = {}
+        self._lock = threading.Lock()
+
+    def enable(self):
+        """Start recording trace events, discarding earlier ones"""
+        with self._lock:
+            self._origin = time.perf_counter()
+            self._events = []
+            self._threads = {}
+            self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+
+    def _timestamp_us(self, seconds: float) -> float:
+        return (seconds - self._origin) * 1e6
+
+    def _add(self, event: Dict):
+        thread = threading.current_thread()
+        event['pid'] = os.getpid()
+        event['tid'] = thread.ident
+        with self._lock:
+            self._threads.setdefault(thread.ident, thread.name)
+            self._events.append(event)
+
+    @contextmanager
+    def span(self, name: str, category: str = '', **args) -> Iterator[Span]:
+        """
+        Time a region of code
+        Args:
+            name: Span name (e.g. the stage)
+            category: Trace category (e.g. s3, image)
+            **args: Extra values shown with the span in the trace viewer
+        Yields:
+            Span whose duration (seconds) is set on exit
+        """
+        span = Span(name, time.perf_counter())
+        try:
+            yield span
+        finally:
+            span.duration = time.perf_counter() - span.start
+            if self.enabled:
+                self._add({
+                    'name': name,
+                    'cat': category,
+                    'ph': 'X',
+                    'ts': self._timestamp_us(span.start),
+                    'dur': span.duration * 1e6,
+                    'args': args
+                })
+
+    def counter(self, name: str, **values):
+        """Record counter values (e.g. bytes held) at the current time"""
+        if self.enabled:
+            self._add({'name': name, 'ph': 'C', 'ts': self._timestamp_us(time.perf_counter()), 'args': values})
+
+    def chrome_trace(self, metadata: Optional[Dict] = None) -> Dict:
+        """
+        Recorded events as a Chrome trace document
+        Args:
+            metadata: Extra information stored with the trace
+        Returns:
+            Dictionary ready to be serialized with json.dumps
+        """
+        with self._lock:
+            events = list(self._events)
+            threads = dict(self._threads)
+        pid = os.getpid()
+        names = [{'name': 'thread_name', 'ph': 'M', 'pid': pid, 'tid': tid, 'args': {'name': name}}
+                 for tid, name in threads.items()]
+        return {
+            'traceEvents': names + events,
+            'displayTimeUnit': 'ms',
+            'otherData': metadata or {}
+        }
+
+    def export(self, metadata: Optional[Dict] = None) -> bytes:
+        """Recorded events as Chrome trace JSON bytes"""
+        return json.dumps(self.chrome_trace(metadata), default=str).encode()
+
+
+# Process-wide tracer shared by the pipeline stages and storage operations
+tracer = Tracer()
\ No newline at end of file
@@ -1,20 +1,33 @@
-from config.s3_config_handler import ConfigHandler
-from s3_operations.s3_operations import S3Operations
+from dotenv import find_dotenv, load_dotenv
+from s3_operations.s3_client import S3Client
+import os
 import sys
 
+REQUIRED_VARIABLES = ('S3_ENDPOINT_URL', 'AWS_ACCESS_KEY_ID', 'AWS_SECRET_ACCESS_KEY', 'S3_BUCKET')
+
 def verify_s3():
     try:
+        # ConfigHandler would also set up logging; only its .env loading is needed (from the working directory)
         print("Loading configuration...")
-        config = ConfigHandler()
-        credentials = config.get_aws_credentials()
-        bucket_name = config.s3_bucket
+        load_dotenv(find_dotenv(usecwd=True))
+        missing = [name for name in REQUIRED_VARIABLES if not os.getenv(name)]
+        if missing:
+            raise ValueError(f"Missing required environment variables: {', '.join(missing)}")
+        credentials = {
+            'aws_endpoint_url': os.environ['S3_ENDPOINT_URL'],
+            'aws_access_key_id': os.environ['AWS_ACCESS_KEY_ID'],
+            'aws_secret_access_key': os.environ['AWS_SECRET_ACCESS_KEY']
+        }
+        bucket_name = os.environ['S3_BUCKET']
         print(f"Configuration loaded. Bucket: {bucket_name}")
         
-        print("Initializing S3 Operations...")
-        s3_ops = S3Operations(credentials, bucket_name)
+        # The bare client is enough to list a few keys; S3Operations would
+        # also load the storage backends, disk cache and transfer machinery
+        print("Initializing S3 client...")
+        s3_client = S3Client(credentials).client
         
         print("Testing connection by listing files...")
-        response = s3_ops.s3_client.list_objects_v2(Bucket=bucket_name, MaxKeys=5)
+        response = s3_client.list_objects_v2(Bucket=bucket_name, MaxKeys=5)
         
         if 'Contents' in response:
             print(f"Successfully listed {len(response['Contents'])} items.")